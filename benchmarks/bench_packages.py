@@ -0,0 +1,88 @@
+"""
+Measure how bumping many packages in one invocation scales compared with
+bumping each package in its own invocation.
+
+Usage: python3 benchmarks/bench_packages.py [--counts 1 10 300]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# pylint: disable=wrong-import-position
+import vup  # noqa: E402
+
+
+def make_package_repo(directory, count):
+    """Create a repository with count packages declared in .vup.yaml
+
+    :param directory: directory to create the repository in
+    :param count: number of packages to create
+
+    """
+    subprocess.run(['git', 'init', '-q', directory], check=True)
+    config_lines = ['packages:']
+    for number in range(count):
+        name = 'pkg-{}'.format(number)
+        os.makedirs(os.path.join(directory, name))
+        with open(os.path.join(directory, name, 'version.txt'), 'w') as a_file:
+            a_file.write('1.0.0\n')
+        config_lines.append('  {}:'.format(name))
+        config_lines.append('    version_files: [{}/version.txt]'.format(name))
+    with open(os.path.join(directory, '.vup.yaml'), 'w') as a_file:
+        a_file.write('\n'.join(config_lines) + '\n')
+    subprocess.run(['git', '-C', directory, 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', directory, 'commit', '-q', '-m', 'Packages'],
+                   check=True)
+
+
+def measure(count, is_combined):
+    """Return the wall time in seconds to bump count packages
+
+    :param count: number of packages
+    :param is_combined: bump all packages in one call instead of one call per
+        package
+
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        make_package_repo(directory, count)
+        os.chdir(directory)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                if is_combined:
+                    vup.bump(None, 'minor')
+                else:
+                    for number in range(count):
+                        vup.bump(
+                            None,
+                            'minor',
+                            package_names=['pkg-{}'.format(number)])
+                return time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counts', type=int, nargs='+', default=[1, 10, 300])
+    args = parser.parse_args()
+
+    row = '{:>8} {:>14} {:>14}'
+    print(row.format('packages', 'combined s', 'separate s'))
+    for count in args.counts:
+        print(
+            row.format(count, '{:.3f}'.format(measure(count, True)),
+                       '{:.3f}'.format(measure(count, False))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Compare the memory use and wall time of the streaming version scanner with
+reading the whole file and running the regex over all of it.
+
+Usage: python3 benchmarks/bench_scan.py [--sizes 1 50 500]
+
+The sizes are in MB. Each generated file has its only version number at the
+end so both approaches have to look at every byte.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# pylint: disable=wrong-import-position
+import vup  # noqa: E402
+import vup.scanner  # noqa: E402
+
+LINE = b'"some-generated-key": "some generated value",\n'
+
+
+def make_version_file(directory, size_mb):
+    """Create a file of roughly size_mb MB with one version number at the end
+
+    :param directory: directory to create the file in
+    :param size_mb: size of the file in MB
+
+    """
+    filename = os.path.join(directory, 'version_{}mb.txt'.format(size_mb))
+    block = LINE * (1024 * 1024 // len(LINE))
+    with open(filename, 'wb') as a_file:
+        for _ in range(size_mb):
+            a_file.write(block)
+        a_file.write(b'"version": "1.2.3-beta"\n')
+    return filename
+
+
+def full_read_scan(filename):
+    """The scan as it was done before the streaming scanner
+
+    :param filename: the file to scan
+
+    """
+    with open(filename, 'r') as a_file:
+        filedata = a_file.read()
+    return list(re.finditer(vup.REGEX, filedata))
+
+
+def streaming_scan(filename):
+    """
+    :param filename: the file to scan
+    """
+    return vup.scanner.scan_version(filename, vup.VERSION_PATTERN)
+
+
+def measure(function, filename):
+    """Return the wall time in seconds and peak traced memory in bytes
+
+    :param function: the scan function to measure
+    :param filename: the file to scan
+
+    """
+    start = time.perf_counter()
+    function(filename)
+    wall_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return wall_time, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 50, 500])
+    args = parser.parse_args()
+
+    row = '{:>8} {:>10} {:>10} {:>12}'
+    print(row.format('size MB', 'scanner', 'time s', 'peak MB'))
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in args.sizes:
+            filename = make_version_file(directory, size_mb)
+            for name, function in (('full', full_read_scan),
+                                   ('stream', streaming_scan)):
+                wall_time, peak = measure(function, filename)
+                print(
+                    row.format(size_mb, name, '{:.3f}'.format(wall_time),
+                               '{:.2f}'.format(peak / 1024 / 1024)))
+            os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
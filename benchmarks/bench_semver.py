@@ -0,0 +1,83 @@
+"""
+Compare parsing and sorting version strings with semantic_version and with
+vup.semver.
+
+Usage: python3 benchmarks/bench_semver.py [--count 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import operator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# pylint: disable=wrong-import-position
+import semantic_version  # noqa: E402
+import vup.semver  # noqa: E402
+
+
+def make_version_strings(count):
+    """Return count version strings, about a quarter of them pre-releases
+
+    :param count: the number of version strings
+
+    """
+    a_random = random.Random(0)
+    texts = []
+    for _ in range(count):
+        text = '{}.{}.{}'.format(
+            a_random.randrange(20), a_random.randrange(100),
+            a_random.randrange(1000))
+        if a_random.random() < 0.25:
+            text += '-{}.{}'.format(
+                a_random.choice(['alpha', 'beta', 'rc']),
+                a_random.randrange(10))
+        texts.append(text)
+    return texts
+
+
+def measure(function):
+    """Return the wall time of a call of function in seconds
+
+    :param function: the function to measure
+
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = make_version_strings(args.count)
+    semantic_versions = [semantic_version.Version(text) for text in texts]
+    vup.semver.parse.cache_clear()
+    versions = [vup.semver.parse(text) for text in texts]
+
+    row = '{:<28} {:>10}'
+    print(row.format('operation', 'seconds'))
+    results = [
+        ('semantic_version parse',
+         lambda: [semantic_version.Version(text) for text in texts]),
+        ('vup.semver parse', lambda: [
+            vup.semver.parse.__wrapped__(text) for text in texts
+        ]),
+        ('vup.semver parse cached',
+         lambda: [vup.semver.parse(text) for text in texts]),
+        ('semantic_version sort', lambda: sorted(semantic_versions)),
+        ('vup.semver sort', lambda: sorted(versions)),
+        ('vup.semver sort by key', lambda: sorted(
+            versions, key=operator.attrgetter('sort_key'))),
+    ]
+    for name, function in results:
+        print(row.format(name, '{:.4f}'.format(measure(function))))
+
+
+if __name__ == '__main__':
+    main()
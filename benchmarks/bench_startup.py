@@ -0,0 +1,108 @@
+"""
+Measure the start up cost of the command line.
+
+Each case is run in a new interpreter several times, the best wall time is
+reported along with the total import time reported by -X importtime and the
+slowest top level imports of the last run.
+
+Usage: python3 benchmarks/bench_startup.py [--repeat 5] [--top 5]
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+IMPORT_TIME_LINE = re.compile(
+    r'import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| (?P<name>.*)')
+
+CASES = [
+    ('--version', ['--version']),
+    ('--help', ['--help']),
+    ('--dry-run bump', ['--dry-run', '--no-daemon', 'bump', 'patch']),
+    ('bump', ['--no-daemon', 'bump', 'patch']),
+]
+
+
+def make_repo(directory):
+    """Create a repository with a version file and a config file
+
+    :param directory: directory to create the repository in
+
+    """
+    subprocess.run(['git', 'init', '-q', directory], check=True)
+    with open(os.path.join(directory, 'version.txt'), 'w') as a_file:
+        a_file.write('1.0.0\n')
+    with open(os.path.join(directory, '.vup.yaml'), 'w') as a_file:
+        a_file.write('version_files: [version.txt]\n')
+    subprocess.run(['git', '-C', directory, 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', directory, 'commit', '-q', '-m', 'Initial'],
+                   check=True)
+
+
+def run_case(args, directory):
+    """Run vup once and return the wall time and the import times
+
+    :param args: the command line arguments of vup
+    :param directory: the directory to run vup in
+
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'vup'] + args,
+        cwd=directory,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE)
+    wall_time = time.perf_counter() - start
+    imports = []
+    for line in result.stderr.decode().splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            imports.append((int(match.group('cumulative')),
+                            match.group('name')))
+    return wall_time, imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    row = '{:<16} {:>10} {:>12}  {}'
+    print(row.format('case', 'wall ms', 'imports ms', 'slowest imports'))
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, 'template')
+        make_repo(template)
+        for name, case_args in CASES:
+            wall_times = []
+            for number in range(args.repeat):
+                # the real bump changes the repository so each run gets a copy
+                repo = os.path.join(directory, '{}-{}'.format(
+                    name.replace(' ', '_'), number))
+                shutil.copytree(template, repo)
+                wall_time, imports = run_case(case_args, repo)
+                wall_times.append(wall_time)
+            top_level = sorted(
+                (imports_us, module) for imports_us, module in imports
+                if not module.startswith(' '))
+            slowest = ', '.join(
+                '{} {:.1f}'.format(module, imports_us / 1000)
+                for imports_us, module in reversed(top_level[-args.top:]))
+            print(
+                row.format(name, '{:.1f}'.format(min(wall_times) * 1000),
+                           '{:.1f}'.format(
+                               sum(imports_us for imports_us, _ in top_level)
+                               / 1000), slowest))
+
+
+if __name__ == '__main__':
+    main()
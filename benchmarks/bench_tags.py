@@ -0,0 +1,105 @@
+"""
+Compare the cost of checking if a tag exists through GitPython's list of tags
+with the direct lookup of vup.refs, for repositories with increasing numbers
+of packed tags. Also times building the vup.tags index, loading it from its
+cache and finding the latest version with it.
+
+Usage: python3 benchmarks/bench_tags.py [--counts 1000 10000 80000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# pylint: disable=wrong-import-position
+import git  # noqa: E402
+import vup.refs  # noqa: E402
+import vup.tags  # noqa: E402
+
+
+def make_repo_with_tags(directory, count):
+    """Create a repository with one commit and count packed tags on it
+
+    :param directory: directory to create the repository in
+    :param count: number of tags to create
+
+    """
+    subprocess.run(['git', 'init', '-q', directory], check=True)
+    subprocess.run(
+        ['git', '-C', directory, 'commit', '-q', '--allow-empty', '-m', 'A'],
+        check=True)
+    head = subprocess.run(['git', '-C', directory, 'rev-parse', 'HEAD'],
+                          check=True,
+                          stdout=subprocess.PIPE).stdout.decode().strip()
+    updates = ''.join(
+        'create refs/tags/{}.{}.{} {}\n'.format(number // 10000,
+                                                number // 100 % 100,
+                                                number % 100, head)
+        for number in range(count))
+    subprocess.run(['git', '-C', directory, 'update-ref', '--stdin'],
+                   input=updates.encode(),
+                   check=True)
+    subprocess.run(['git', '-C', directory, 'pack-refs', '--all'], check=True)
+    return git.Repo(directory)
+
+
+def measure(function, repeat=5):
+    """Return the best wall time of repeat calls of function in seconds
+
+    :param function: the function to measure
+    :param repeat: the number of times to call it (Default value = 5)
+
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--counts', type=int, nargs='+', default=[1000, 10000, 80000])
+    args = parser.parse_args()
+
+    row = '{:>8} {:>14} {:>14} {:>14} {:>14} {:>14}'
+    print(
+        row.format('tags', 'repo.tags s', 'tag_exists s', 'index build s',
+                   'index cached s', 'latest s'))
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as directory:
+            repo = make_repo_with_tags(directory, count)
+            missing = '99.99.99'
+            list_time = measure(lambda: missing in repo.tags, repeat=1)
+            lookup_time = measure(
+                lambda: vup.refs.tag_exists(repo.git_dir, missing))
+            cache_path = os.path.join(directory, 'tags-cache')
+            build_time = measure(
+                lambda: vup.tags.TagIndex.load(repo.git_dir, cache_path),
+                repeat=1)
+            # the cache isn't trusted while the refs are as new as it
+            time.sleep(0.01)
+            os.remove(cache_path)
+            vup.tags.TagIndex.load(repo.git_dir, cache_path)
+            cached_time = measure(
+                lambda: vup.tags.TagIndex.load(repo.git_dir, cache_path))
+            group = vup.tags.TagIndex.load(repo.git_dir,
+                                           cache_path).get_group()
+            latest_time = measure(lambda: group.latest(major=1))
+            print(
+                row.format(count, '{:.6f}'.format(list_time),
+                           '{:.6f}'.format(lookup_time),
+                           '{:.6f}'.format(build_time),
+                           '{:.6f}'.format(cached_time),
+                           '{:.6f}'.format(latest_time)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Benchmark suite for the phases of a bump on synthetic repositories.
+
+Each scenario builds a repository with a given number of tracked files,
+version files, tags, commits of history and size of version file, and then
+runs vup.bump with a prehook on a fresh copy of it while recording its
+timings. The total time of every phase vup records is reported, e.g.:
+
+repo_open, dirty_check, tracked_check, scan, prehook, tag_check, commit, tag,
+index_update (only when the commits don't update the index)
+
+The results are written as JSON and two result files can be compared to find
+regressions.
+
+Usage:
+    python3 benchmarks/suite.py run [--scenario NAME ...] [--output FILE]
+        [--commit-engine index|objects] [--git-backend gitpython|batch]
+    python3 benchmarks/suite.py compare OLD NEW [--threshold 0.2]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# pylint: disable=wrong-import-position
+import vup  # noqa: E402
+import vup.version  # noqa: E402
+from vup import backends  # noqa: E402
+from vup import commits  # noqa: E402
+from vup import configs  # noqa: E402
+from vup import session  # noqa: E402
+from vup import timings  # noqa: E402
+
+DEFAULT_PARAMETERS = {
+    'tracked_files': 100,
+    'version_files': 1,
+    'tags': 10,
+    'history': 10,
+    'version_file_size': 1024,
+}
+
+SCENARIOS = {
+    'small': {},
+    'many_tracked_files': {
+        'tracked_files': 100000
+    },
+    'many_version_files': {
+        'version_files': 500
+    },
+    'many_tags': {
+        'tags': 80000
+    },
+    'deep_history': {
+        'history': 20000
+    },
+    'large_version_file': {
+        'version_file_size': 50 * 1024 * 1024
+    },
+}
+
+START_VERSION = '1.0.0'
+FILES_PER_DIRECTORY = 1000
+
+
+def _git(directory, *args, stdin=None):
+    """
+    :param directory: the repository to run git in
+    :param args: the git arguments
+    :param stdin: bytes to pass on stdin (Default value = None)
+    """
+    subprocess.run(['git', '-C', directory] + list(args),
+                   input=stdin,
+                   stdout=subprocess.DEVNULL,
+                   check=True)
+
+
+def _write_history(directory, history):
+    """Create history commits with git fast-import
+
+    :param directory: the repository
+    :param history: the number of commits
+
+    """
+    # fast-import continues each commit from the previous one on the branch
+    stream = []
+    for number in range(history):
+        content = 'commit {}\n'.format(number).encode()
+        stream.append(b'commit refs/heads/master\n'
+                      b'committer vup <vup@example.com> 0 +0000\n'
+                      b'data 8\nhistory\n')
+        stream.append(b'M 644 inline history.txt\n'
+                      + 'data {}\n'.format(len(content)).encode() + content
+                      + b'\n')
+    _git(directory, 'fast-import', '--quiet', stdin=b''.join(stream))
+    _git(directory, 'reset', '-q', '--hard', 'master')
+
+
+def build_repo(directory,
+               parameters,
+               commit_engine='index',
+               git_backend='gitpython'):
+    """Create a synthetic repository
+
+    :param directory: directory to create the repository in
+    :param parameters: the scenario parameters, see DEFAULT_PARAMETERS
+    :param commit_engine: one of commits.COMMIT_ENGINES, written to the
+        config file (Default value = 'index')
+    :param git_backend: one of backends.BACKENDS, written to the config file
+        (Default value = 'gitpython')
+    :returns: the paths of the version files relative to the repository
+
+    """
+    subprocess.run(['git', 'init', '-q', directory], check=True)
+    _git(directory, 'symbolic-ref', 'HEAD', 'refs/heads/master')
+    # a background gc would repack the objects while the repository is copied
+    _git(directory, 'config', 'gc.auto', '0')
+    if parameters['history']:
+        _write_history(directory, parameters['history'])
+
+    for number in range(parameters['tracked_files']):
+        sub_directory = os.path.join(directory, 'src',
+                                     str(number // FILES_PER_DIRECTORY))
+        os.makedirs(sub_directory, exist_ok=True)
+        with open(os.path.join(sub_directory, '{}.txt'.format(number)),
+                  'w') as a_file:
+            a_file.write('file {}\n'.format(number))
+
+    version_files = []
+    filler = b'x' * 63 + b'\n'
+    for number in range(parameters['version_files']):
+        version_file = os.path.join('versions', '{}.txt'.format(number))
+        os.makedirs(os.path.join(directory, 'versions'), exist_ok=True)
+        with open(os.path.join(directory, version_file), 'wb') as a_file:
+            remaining = parameters['version_file_size']
+            while remaining > len(filler):
+                a_file.write(filler)
+                remaining -= len(filler)
+            a_file.write('version = "{}"\n'.format(START_VERSION).encode())
+        version_files.append(version_file)
+
+    with open(os.path.join(directory, configs.CONFIG_FILE), 'w') as a_file:
+        a_file.write('commit_engine: {}\ngit_backend: {}\n'.format(
+            commit_engine, git_backend))
+
+    _git(directory, 'add', '-A')
+    _git(directory, 'commit', '-q', '-m', 'Add files')
+
+    if parameters['tags']:
+        updates = ''.join(
+            'create refs/tags/0.{}.{} HEAD\n'.format(number // 1000,
+                                                     number % 1000)
+            for number in range(parameters['tags']))
+        _git(directory, 'update-ref', '--stdin', stdin=updates.encode())
+        _git(directory, 'pack-refs', '--all')
+    return version_files
+
+
+def time_bump(directory, version_files):
+    """Bump a repository and return the total time of each phase recorded by
+    vup
+
+    :param directory: the repository to bump
+    :param version_files: the paths of the version files
+
+    """
+    cwd = os.getcwd()
+    os.chdir(directory)
+    recorder = timings.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            vup.bump(version_files, 'minor', prehook='true',
+                     a_session=session.Session())
+    finally:
+        timings.stop()
+        os.chdir(cwd)
+    return {name: seconds for name, _, seconds in recorder.get_phases()}
+
+
+# pylint: disable=too-many-arguments
+def run_scenario(name,
+                 parameters,
+                 repeat,
+                 commit_engine='index',
+                 git_backend='gitpython'):
+    """Build the repository of a scenario and time bumps of copies of it
+
+    :param name: the name of the scenario
+    :param parameters: the scenario parameters
+    :param repeat: the number of bumps to time, the fastest time of each
+        phase is kept
+    :param commit_engine: one of commits.COMMIT_ENGINES (Default value =
+        'index')
+    :param git_backend: one of backends.BACKENDS (Default value =
+        'gitpython')
+
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, 'template')
+        version_files = build_repo(template, parameters, commit_engine,
+                                   git_backend)
+        phases = {}
+        for number in range(repeat):
+            repo = os.path.join(directory, 'run{}'.format(number))
+            shutil.copytree(template, repo, symlinks=True)
+            for phase, duration in time_bump(repo, version_files).items():
+                phases[phase] = min(duration, phases.get(phase, duration))
+            shutil.rmtree(repo)
+    return {'scenario': name, 'parameters': parameters, 'phases': phases}
+
+
+def run(args):
+    """
+    :param args: the parsed command line arguments
+    """
+    results = []
+    for name in args.scenario or sorted(SCENARIOS):
+        parameters = dict(DEFAULT_PARAMETERS, **SCENARIOS[name])
+        result = run_scenario(name, parameters, args.repeat,
+                              args.commit_engine, args.git_backend)
+        results.append(result)
+        print('{:<20} '.format(name) + ' '.join(
+            '{}={:.4f}'.format(phase, seconds)
+            for phase, seconds in result['phases'].items()))
+    report = {
+        'vup_version': vup.version.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit_engine': args.commit_engine,
+        'git_backend': args.git_backend,
+        'time': time.time(),
+        'results': results,
+    }
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    return 0
+
+
+def compare(args):
+    """Print the change of every phase between two result files
+
+    :param args: the parsed command line arguments
+    :returns: 1 if any phase got slower by more than the threshold
+
+    """
+    with open(args.old) as old_file:
+        old = {
+            result['scenario']: result
+            for result in json.load(old_file)['results']
+        }
+    with open(args.new) as new_file:
+        new = {
+            result['scenario']: result
+            for result in json.load(new_file)['results']
+        }
+    exit_code = 0
+    row = '{:<20} {:<14} {:>10} {:>10} {:>8}'
+    print(row.format('scenario', 'phase', 'old s', 'new s', 'change'))
+    for name in sorted(set(old) & set(new)):
+        new_phases = new[name]['phases']
+        for phase, old_time in old[name]['phases'].items():
+            new_time = new_phases.get(phase)
+            if new_time is None:
+                continue
+            change = (new_time - old_time) / old_time if old_time else 0
+            # ignore changes too small to be measured reliably
+            is_regression = (change > args.threshold
+                             and new_time - old_time > args.min_seconds)
+            if is_regression:
+                exit_code = 1
+            print(
+                row.format(name, phase, '{:.4f}'.format(old_time),
+                           '{:.4f}'.format(new_time), '{:+.0%}'.format(change))
+                + ('  REGRESSION' if is_regression else ''))
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub_parsers = parser.add_subparsers(dest='subcmd')
+
+    run_parser = sub_parsers.add_parser('run')
+    run_parser.add_argument(
+        '--scenario', action='append', choices=sorted(SCENARIOS))
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--output', default='bench_results.json')
+    run_parser.add_argument(
+        '--commit-engine',
+        choices=commits.COMMIT_ENGINES,
+        default=commits.DEFAULT_COMMIT_ENGINE)
+    run_parser.add_argument(
+        '--git-backend',
+        choices=backends.BACKENDS,
+        default=backends.DEFAULT_BACKEND)
+
+    compare_parser = sub_parsers.add_parser('compare')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.2)
+    compare_parser.add_argument('--min-seconds', type=float, default=0.005)
+
+    args = parser.parse_args()
+    if args.subcmd == 'run':
+        return run(args)
+    if args.subcmd == 'compare':
+        return compare(args)
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
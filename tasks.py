@@ -26,6 +26,7 @@ def get_files(is_list=False):
     """
     files = [
         'vup',
+        'benchmarks',
         'setup.py',
         'tasks.py',
     ]
@@ -121,6 +122,37 @@ def test(ctx):
     ctx.run(cmd, **RUN_ARGS)
 
 
+@task(iterable=['scenario'])
+def bench(ctx, scenario, output='bench_results.json', repeat=3):
+    """Run the benchmark suite on synthetic repositories
+
+    :param ctx: invoke context
+    :param scenario: scenarios to run, all of them when not given
+    :param output: file to write the JSON results to
+    :param repeat: the number of times to run each scenario
+
+    """
+    cmd = 'python3 benchmarks/suite.py run --output {output} --repeat {repeat}'
+    cmd = cmd.format(output=output, repeat=repeat)
+    cmd += ''.join(' --scenario ' + name for name in scenario)
+    ctx.run(cmd, **RUN_ARGS)
+
+
+@task
+def bench_compare(ctx, old, new, threshold=0.2):
+    """Compare two benchmark results and fail on regressions
+
+    :param ctx: invoke context
+    :param old: the baseline JSON results
+    :param new: the JSON results to check
+    :param threshold: the slowdown of a phase that counts as a regression
+
+    """
+    cmd = ('python3 benchmarks/suite.py compare {old} {new} '
+           '--threshold {threshold}')
+    ctx.run(cmd.format(old=old, new=new, threshold=threshold), **RUN_ARGS)
+
+
 # pylint: disable=redefined-builtin
 @task(test, reformat, lint, metrics, default=True)
 def all(ctx):
@@ -115,3 +115,69 @@ def dir_without_repo(tmpdir):
     """
     no_repo = NoRepo(tmpdir)
     return no_repo
+
+
+@pytest.fixture()
+def repo_with_docs(a_repo):
+    """A test repository with the version file in a subdirectory and a
+    committed docs directory next to it
+
+    :param a_repo: fixture of a test repository
+    """
+    for directory in ['pkg/sub', 'docs']:
+        os.makedirs(os.path.join(a_repo.dir, directory))
+    with open(os.path.join(a_repo.dir, 'docs', 'index.txt'), 'w') as a_file:
+        a_file.write('docs')
+    a_repo.init('1.0.0', ('pkg/sub/version.txt', ))
+    a_repo.repo.index.add([os.path.join(a_repo.dir, 'docs', 'index.txt')])
+    a_repo.repo.index.commit('Docs Commit')
+    return a_repo
+
+
+@pytest.fixture()
+def repo_with_spaced_dir(a_repo):
+    """A test repository with the version file in a directory with a space in
+    its name
+
+    :param a_repo: fixture of a test repository
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'pkg', 'sub dir'))
+    a_repo.init('1.0.0', ('pkg/sub dir/version.txt', ))
+    return a_repo
+
+
+@pytest.fixture()
+def repo_with_package_dir(a_repo):
+    """A test repository with the version file in a package directory, which
+    has an empty subdirectory
+
+    :param a_repo: fixture of a test repository
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'pkg', 'sub'))
+    a_repo.init('1.0.0', ('pkg/version.txt', ))
+    return a_repo
+
+
+@pytest.fixture()
+def repo_with_packages(a_repo):
+    """A test repository with a version file in each of the packages a, b and
+    c/d in the packages directory
+
+    :param a_repo: fixture of a test repository
+    """
+    for name in ['a', 'b', 'c/d']:
+        os.makedirs(os.path.join(a_repo.dir, 'packages', name))
+    a_repo.init('1.0.0', ('packages/a/version.py', 'packages/b/version.py',
+                          'packages/c/d/version.py'))
+    # an ignored build directory and an untracked file with a version in them
+    os.makedirs(os.path.join(a_repo.dir, 'packages', 'a', 'build'))
+    for a_file in ['packages/a/build/version.py', 'packages/new/version.py']:
+        os.makedirs(os.path.dirname(os.path.join(a_repo.dir, a_file)),
+                    exist_ok=True)
+        with open(os.path.join(a_repo.dir, a_file), 'w') as file_handle:
+            file_handle.write('1.0.0')
+    with open(os.path.join(a_repo.dir, '.gitignore'), 'w') as file_handle:
+        file_handle.write('build/\n')
+    a_repo.repo.index.add(['.gitignore'])
+    a_repo.repo.index.commit('Ignore Commit')
+    return a_repo
@@ -0,0 +1,149 @@
+import os
+import pytest
+import vup
+import vup.backends
+import vup.error
+import util
+
+# pylint: disable=invalid-name
+
+
+@pytest.fixture()
+def backend(repo_with_spaced_dir):
+    """A batch backend of the repository with a spaced directory
+
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    """
+    a_backend = vup.backends.BatchBackend(repo_with_spaced_dir.repo)
+    yield a_backend
+    a_backend.close()
+
+
+def write_version(repo_with_spaced_dir, version):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param version: the version to write to the version file
+    """
+    with open(repo_with_spaced_dir.version_files[0], 'w') as version_file:
+        version_file.write(version)
+
+
+@pytest.mark.parametrize('git_backend', vup.backends.BACKENDS)
+def test_backends_bump_the_same(repo_with_spaced_dir, git_backend):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param git_backend: the name of the backend to bump with
+    """
+    repo = repo_with_spaced_dir.repo
+    util.write_config({'git_backend': git_backend})
+    repo.index.add(['.vup.yaml'])
+    repo.index.commit('Config Commit')
+    vup.bump(repo_with_spaced_dir.version_files, 'minor')
+
+    prerelease_commit = repo.head.commit
+    release_commit = prerelease_commit.parents[0]
+    assert release_commit.message == 'Increment version from 1.0.0 to 1.1.0'
+    assert prerelease_commit.message == \
+        'Increment version from 1.1.0 to 1.1.1-beta'
+    assert (prerelease_commit.tree / 'pkg/sub dir/version.txt'
+            ).data_stream.read() == b'1.1.1-beta'
+    tag = repo.tags['1.1.0']
+    assert tag.commit == release_commit
+    assert tag.tag.message.strip() == 'Version 1.1.0'
+    assert tag.tag.tagger.email == release_commit.committer.email
+    assert not repo.is_dirty()
+
+
+def test_are_tracked(repo_with_spaced_dir, backend):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param backend: fixture of a batch backend
+    """
+    untracked_file = os.path.join(repo_with_spaced_dir.dir, 'untracked.txt')
+    with open(untracked_file, 'w') as a_file:
+        a_file.write('untracked')
+    files = [
+        repo_with_spaced_dir.version_files[0], repo_with_spaced_dir.other_file, untracked_file,
+        os.path.join(repo_with_spaced_dir.dir, 'pkg'),
+        os.path.join(repo_with_spaced_dir.dir, 'missing\nfile')
+    ]
+    assert backend.are_tracked(files) == [True, True, False, False, False]
+    assert vup.is_file_in_repo(repo_with_spaced_dir.repo, repo_with_spaced_dir.other_file,
+                               backend)
+
+
+def test_refs_change_together_on_finish(repo_with_spaced_dir, backend):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param backend: fixture of a batch backend
+    """
+    repo = repo_with_spaced_dir.repo
+    head = repo.head.commit
+    write_version(repo_with_spaced_dir, '1.0.1')
+    release_commit = backend.commit_files(repo_with_spaced_dir.version_files, 'One')
+    backend.create_tag('1.0.1', 'Version 1.0.1')
+    write_version(repo_with_spaced_dir, '1.0.2-beta')
+    backend.commit_files(repo_with_spaced_dir.version_files, 'Two')
+    assert repo.head.commit == head
+    assert not repo.tags
+
+    backend.finish()
+    assert repo.head.commit.message == 'Two'
+    assert repo.head.commit.parents[0].hexsha == release_commit
+    assert repo.tags['1.0.1'].commit.hexsha == release_commit
+
+
+def test_abort_changes_no_refs(repo_with_spaced_dir, backend):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param backend: fixture of a batch backend
+    """
+    repo = repo_with_spaced_dir.repo
+    head = repo.head.commit
+    write_version(repo_with_spaced_dir, '1.0.1')
+    backend.commit_files(repo_with_spaced_dir.version_files, 'One')
+    backend.create_tag('1.0.1', 'Version 1.0.1')
+    backend.abort()
+    backend.finish()
+    assert repo.head.commit == head
+    assert not repo.tags
+
+
+def test_conflicts_change_no_refs(repo_with_spaced_dir, backend):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    :param backend: fixture of a batch backend
+    """
+    repo = repo_with_spaced_dir.repo
+    write_version(repo_with_spaced_dir, '1.0.1')
+    backend.commit_files(repo_with_spaced_dir.version_files, 'One')
+    backend.create_tag('1.0.1', 'Version 1.0.1')
+    repo.git.commit('--allow-empty', '-m', 'Concurrent Commit')
+    with pytest.raises(vup.error.VupErrorHeadChanged):
+        backend.finish()
+    assert repo.head.commit.message.strip() == 'Concurrent Commit'
+    assert not repo.tags
+
+    backend.commit_files(repo_with_spaced_dir.version_files, 'One')
+    backend.create_tag('1.0.1', 'Version 1.0.1')
+    repo.create_tag('1.0.1')
+    with pytest.raises(vup.error.VupErrorRefUpdateFailed):
+        backend.finish()
+    assert repo.head.commit.message.strip() == 'Concurrent Commit'
+
+
+def test_invalid_backend(repo_with_spaced_dir):
+    """
+    :param repo_with_spaced_dir: fixture of a repository with the version
+        file in a directory with a space in its name
+    """
+    util.write_config({'git_backend': 'libgit2'})
+    with pytest.raises(vup.error.VupErrorGitBackendIsInvalid):
+        vup.bump(repo_with_spaced_dir.version_files, 'patch')
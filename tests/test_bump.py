@@ -1,3 +1,4 @@
+import os
 import pytest
 import vup.error
 import vup
@@ -69,6 +70,53 @@ def test_dirty_bump(a_repo):
         version_file.version) == util.DEFAULT_INPUT_VERSION + 'modifications')
 
 
+@pytest.mark.parametrize("dirty_check", ['full', 'paths', 'index-stat'])
+def test_dirty_bump_with_dirty_check_mode(a_repo, dirty_check):
+    """
+    :param a_repo: fixture of a test repository
+    :param dirty_check: the dirty check mode
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    util.append_to_file(a_repo.version_files[0], 'modifications')
+    with pytest.raises(vup.error.VupErrorRepositoryHasUncommitedChanges):
+        vup.bump([a_repo.version_files[0]], 'major', dirty_check=dirty_check)
+
+
+def test_paths_dirty_check_ignores_other_files(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    util.append_to_file(a_repo.other_file, 'modifications')
+    vup.bump([a_repo.version_files[0]], 'major', dirty_check='paths')
+
+    version_file = vup.VersionFile(a_repo.version_files[0])
+    assert str(version_file.version) == util.DEFAULT_OUTPUT_VERSION_MAJOR
+
+
+def test_paths_dirty_check_rejects_staged_changes(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    util.append_to_file(a_repo.other_file, 'modifications')
+    a_repo.repo.index.add([a_repo.other_file])
+    with pytest.raises(vup.error.VupErrorRepositoryHasUncommitedChanges):
+        vup.bump([a_repo.version_files[0]], 'major', dirty_check='paths')
+
+    version_file = vup.VersionFile(a_repo.version_files[0])
+    assert str(version_file.version) == util.DEFAULT_INPUT_VERSION
+
+
+def test_invalid_dirty_check_mode(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    with pytest.raises(vup.error.VupErrorDirtyCheckModeIsInvalid):
+        vup.bump([a_repo.version_files[0]], 'major', dirty_check='asdf')
+
+
 def test_with_version_file_that_isnt_under_git(
         repo_without_version_file_commited):
     """
@@ -192,6 +240,66 @@ def test_bump_with_multiple_version_files(a_repo):
     assert str(version_file_2.version) == util.DEFAULT_OUTPUT_VERSION_MAJOR
 
 
+def test_bump_with_more_version_files_than_load_workers(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    version_files = [
+        'version_{}.txt'.format(number)
+        for number in range(vup.MAX_LOAD_WORKERS * 2)
+    ]
+    a_repo.init(util.DEFAULT_INPUT_VERSION, version_files)
+    vup.bump(a_repo.version_files, 'major')
+
+    for a_file in a_repo.version_files:
+        version_file = vup.VersionFile(a_file)
+        assert str(version_file.version) == util.DEFAULT_OUTPUT_VERSION_MAJOR
+
+
+def test_bump_where_a_later_version_file_does_not_match(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    version_files = ['version_{}.txt'.format(number) for number in range(20)]
+    a_repo.init(util.DEFAULT_INPUT_VERSION, version_files)
+
+    with open(a_repo.version_files[-1], 'w') as file_handle:
+        file_handle.write(util.DEFAULT_OUTPUT_VERSION_MAJOR)
+    a_repo.repo.git.add(A=True)
+    a_repo.repo.index.commit("Change the last version file")
+
+    with pytest.raises(vup.error.VupErrorFilesDontHaveMatchingVersions):
+        vup.bump(a_repo.version_files + ['asdf'], 'major')
+
+
+def test_bump_with_version_files_in_subdirectories(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'sub', 'dir'))
+    a_repo.init(util.DEFAULT_INPUT_VERSION,
+                ('version.txt', os.path.join('sub', 'dir', 'version.txt')))
+    vup.bump(a_repo.version_files, 'major')
+
+    for a_file in a_repo.version_files:
+        version_file = vup.VersionFile(a_file)
+        assert str(version_file.version) == util.DEFAULT_OUTPUT_VERSION_MAJOR
+
+
+def test_repo_snapshot_tracked_paths(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'sub'))
+    a_repo.init(util.DEFAULT_INPUT_VERSION,
+                (os.path.join('sub', 'version.txt'), ))
+    repo_snapshot = vup.snapshot.RepoSnapshot(a_repo.repo)
+
+    assert repo_snapshot.tracked_paths == {'other.txt', 'sub/version.txt'}
+    assert repo_snapshot.are_tracked(
+        [a_repo.version_files[0], 'sub', 'asdf']) == [True, False, False]
+
+
 def test_bump_where_version_files_dont_have_matching_versions(a_repo):
     """
     :param a_repo: fixture of a test repository
@@ -224,7 +332,6 @@ def test_bump_where_the_repo_already_has_version_tag(a_repo):
 # TODO test bump pre-release version
 # TODO stdout of run_hook
 # TODO run_hook passing
-# TODO version file is not at the root of git repo
 # TODO using a config file
 # TODO test multi line files bump
 # TODO test multiple version files
@@ -0,0 +1,132 @@
+import os
+import pytest
+import vup
+import vup.commits
+import vup.error
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_bump_without_the_index(repo_with_docs):
+    """
+    :param repo_with_docs: fixture of a repository with a nested version
+        file and a docs directory
+    """
+    repo = repo_with_docs.repo
+    old_tree = repo.head.commit.tree
+    util.write_config({'commit_engine': 'objects'})
+    vup.bump(repo_with_docs.version_files, 'minor')
+
+    prerelease_commit = repo.head.commit
+    release_commit = prerelease_commit.parents[0]
+    assert release_commit.parents[0].tree == old_tree
+    assert release_commit.message == 'Increment version from 1.0.0 to 1.1.0'
+    assert (release_commit.tree / 'pkg/sub/version.txt').data_stream.read() \
+        == b'1.1.0'
+    assert (prerelease_commit.tree / 'pkg/sub/version.txt'
+            ).data_stream.read() == b'1.1.1-beta'
+    # untouched subtrees are reused as they are
+    assert (prerelease_commit.tree / 'docs') == (old_tree / 'docs')
+    assert str(repo.tags[0].commit) == release_commit.hexsha
+    assert 'commit: Increment version from 1.1.0 to 1.1.1-beta' in \
+        repo.git.reflog('-1')
+
+    # the index matches the new commit
+    assert repo.git.write_tree() == prerelease_commit.tree.hexsha
+    assert not repo.is_dirty()
+
+
+def test_index_is_left_alone(repo_with_docs):
+    """
+    :param repo_with_docs: fixture of a repository with a nested version
+        file and a docs directory
+    """
+    repo = repo_with_docs.repo
+    old_index_tree = repo.git.write_tree()
+    util.write_config({'commit_engine': 'objects', 'update_index': False})
+    vup.bump(repo_with_docs.version_files, 'patch')
+    assert repo.git.write_tree() == old_index_tree
+    assert repo.head.commit.tree.hexsha != old_index_tree
+
+
+def test_head_moved_while_committing(repo_with_docs, monkeypatch):
+    """
+    :param repo_with_docs: fixture of a repository with a nested version
+        file and a docs directory
+    :param monkeypatch: fixture to move HEAD in the middle of a commit
+    """
+    import git.objects.commit  # pylint: disable=import-outside-toplevel
+    repo = repo_with_docs.repo
+    create_from_tree = git.objects.commit.Commit.create_from_tree
+
+    def create_and_move_head(*args, **kwargs):
+        commit = create_from_tree(*args, **kwargs)
+        repo.git.commit('--allow-empty', '-m', 'Concurrent Commit')
+        return commit
+
+    monkeypatch.setattr(git.objects.commit.Commit, 'create_from_tree',
+                        create_and_move_head)
+    with pytest.raises(vup.error.VupErrorHeadChanged):
+        vup.commits.commit_files(repo, repo_with_docs.version_files, 'Bump')
+    assert repo.head.commit.message.strip() == 'Concurrent Commit'
+
+
+@pytest.mark.parametrize('commit_engine, git_backend', [
+    ('index', 'gitpython'),
+    ('objects', 'gitpython'),
+    ('objects', 'batch'),
+])
+def test_bump_symlinked_version_file(a_repo, commit_engine, git_backend):
+    """
+    :param a_repo: fixture of a test repository
+    :param commit_engine: the commit engine setting
+    :param git_backend: the git backend setting
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'real'))
+    a_repo.init('1.0.0', ('real/version.txt', ))
+    os.symlink(os.path.join('real', 'version.txt'), 'version.txt')
+    a_repo.repo.index.add(['version.txt'])
+    a_repo.repo.index.commit('Link Commit')
+    util.write_config({
+        'commit_engine': commit_engine,
+        'git_backend': git_backend
+    })
+    vup.bump(['version.txt'], 'patch')
+
+    repo = a_repo.repo
+    release_commit = repo.head.commit.parents[0]
+    link = repo.head.commit.tree / 'version.txt'
+    assert link.mode == 0o120000
+    assert link.data_stream.read() == b'real/version.txt'
+    assert (release_commit.tree / 'real/version.txt').data_stream.read() \
+        == b'1.0.1'
+    assert (repo.head.commit.tree / 'real/version.txt').data_stream.read() \
+        == b'1.0.2-beta'
+    assert not repo.is_dirty()
+
+
+def test_untracked_file_is_rejected(repo_with_docs):
+    """
+    :param repo_with_docs: fixture of a repository with a nested version
+        file and a docs directory
+    """
+    untracked_file = os.path.join(repo_with_docs.dir, 'pkg', 'new.txt')
+    with open(untracked_file, 'w') as a_file:
+        a_file.write('1.0.0')
+    with pytest.raises(vup.error.VupErrorFileIsNotNotUnderRevisionControl) \
+            as excinfo:
+        vup.commits.commit_files(repo_with_docs.repo, [untracked_file], 'Bump')
+    assert 'pkg/new.txt' in str(excinfo.value)
+
+
+def test_invalid_commit_engine(repo_with_docs):
+    """
+    :param repo_with_docs: fixture of a repository with a nested version
+        file and a docs directory
+    """
+    util.write_config({'commit_engine': 'fast'})
+    with pytest.raises(vup.error.VupErrorCommitEngineIsInvalid):
+        vup.bump(repo_with_docs.version_files, 'patch')
+    with open(repo_with_docs.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.0'
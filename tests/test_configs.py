@@ -0,0 +1,131 @@
+import os
+import pytest
+import vup
+import vup.configs
+import vup.error
+import vup.session
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_configs_are_merged(repo_with_package_dir):
+    """
+    :param repo_with_package_dir: fixture of a repository with a package
+        directory
+    """
+    util.write_config(
+        {
+            'prehook': 'true',
+            'dirty_check': 'full',
+            'packages': {
+                'top': {
+                    'version_files': ['version.txt']
+                }
+            }
+        }, repo_with_package_dir.dir)
+    pkg_dir = os.path.join(repo_with_package_dir.dir, 'pkg')
+    util.write_config(
+        {
+            'version_files': ['version.txt', {
+                'path': 'sub/setup.py'
+            }],
+            'dirty_check': 'paths',
+            'dirty_check_paths': ['*.txt'],
+            'packages': {
+                'pkg': {
+                    'tag_prefix': 'pkg-'
+                }
+            }
+        }, pkg_dir)
+    os.chdir(os.path.join(pkg_dir, 'sub'))
+    config = vup.configs.ConfigLoader().load()
+    assert config == {
+        'prehook': 'true',
+        'dirty_check': 'paths',
+        'version_files': ['../version.txt', {
+            'path': 'setup.py'
+        }],
+        'dirty_check_paths': ['pkg/*.txt'],
+        'packages': {
+            'top': {
+                'version_files': ['../../version.txt']
+            },
+            'pkg': {
+                'tag_prefix': 'pkg-'
+            }
+        }
+    }
+
+    util.write_config({'version_files': ['version.txt']}, pkg_dir)
+    os.chdir(pkg_dir)
+    vup.bump([], 'patch')
+    with open(repo_with_package_dir.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.2-beta'
+    assert [tag.name for tag in repo_with_package_dir.repo.tags] == ['1.0.1']
+
+
+def test_unchanged_config_is_not_parsed(repo_with_package_dir, monkeypatch):
+    """
+    :param repo_with_package_dir: fixture of a repository with a package
+        directory
+    :param monkeypatch: fixture to fail parsing the config files
+    """
+    util.write_config({'prehook': 'true'}, repo_with_package_dir.dir)
+    assert vup.session.load_yaml_config() == {'prehook': 'true'}
+    assert os.path.exists(
+        os.path.join(repo_with_package_dir.dir, '.git', 'vup',
+                     vup.configs.CONFIG_CACHE_FILE))
+
+    def fail_parse(*_):
+        raise AssertionError('config was parsed again')
+
+    monkeypatch.setattr(vup.configs, 'parse_config_file', fail_parse)
+    # the stat data was written within the timestamp of the cache, the file
+    # has to be hashed but not parsed
+    assert vup.session.load_yaml_config() == {'prehook': 'true'}
+    config_file = os.path.join(repo_with_package_dir.dir, '.vup.yaml')
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**10))
+    assert vup.session.load_yaml_config() == {'prehook': 'true'}
+    monkeypatch.setattr(vup.configs, '_read_hash', fail_parse)
+    assert vup.session.load_yaml_config() == {'prehook': 'true'}
+
+
+def test_changed_config_is_loaded_again(repo_with_package_dir):
+    """
+    :param repo_with_package_dir: fixture of a repository with a package
+        directory
+    """
+    pkg_dir = os.path.join(repo_with_package_dir.dir, 'pkg')
+    os.chdir(pkg_dir)
+    a_session = vup.session.Session()
+    util.write_config({'prehook': 'true'}, repo_with_package_dir.dir)
+    assert a_session.get_yaml_config() == {'prehook': 'true'}
+    util.write_config({'prehook': 'make test'}, repo_with_package_dir.dir)
+    assert a_session.get_yaml_config() == {'prehook': 'make test'}
+    util.write_config({'prehook': 'make check'}, pkg_dir)
+    assert a_session.get_yaml_config() == {'prehook': 'make check'}
+    os.remove(os.path.join(pkg_dir, '.vup.yaml'))
+    assert vup.session.load_yaml_config() == {'prehook': 'make test'}
+
+
+@pytest.mark.parametrize('content', [
+    'version_files: [a',
+    '- version.txt',
+    'version_files: version.txt',
+    'packages: [pkg]',
+    'packages: {pkg: [version.txt]}',
+])
+def test_invalid_config(repo_with_package_dir, content):
+    """
+    :param repo_with_package_dir: fixture of a repository with a package
+        directory
+    :param content: the contents of the invalid config file
+    """
+    config_path = os.path.join(repo_with_package_dir.dir, '.vup.yaml')
+    with open(config_path, 'w') as config_file:
+        config_file.write(content)
+    with pytest.raises(vup.error.VupErrorConfigIsInvalid) as excinfo:
+        vup.bump([], 'patch')
+    assert '.vup.yaml' in str(excinfo.value)
@@ -0,0 +1,83 @@
+import os
+import pytest
+import vup
+import vup.error
+import vup.globs
+import util
+
+# pylint: disable=invalid-name
+
+
+@pytest.mark.parametrize('pattern, path, is_match', [
+    ('packages/*/version.py', 'packages/a/version.py', True),
+    ('packages/*/version.py', 'packages/c/d/version.py', False),
+    ('packages/**/version.py', 'packages/c/d/version.py', True),
+    ('packages/**/version.py', 'packages/version.py', True),
+    ('**/version.py', 'version.py', True),
+    ('packages/**', 'packages/c/d/version.py', True),
+    ('packages/?/version.py', 'packages/a/version.py', True),
+    ('packages/[ab]/version.py', 'packages/c/version.py', False),
+    ('packages/[!ab]/version.py', 'packages/c/version.py', True),
+    ('packages/a*', 'packages/a/version.py', False),
+    ('version.py+', 'version.py', False),
+])
+def test_compile_pattern(pattern, path, is_match):
+    """
+    :param pattern: the glob pattern
+    :param path: the path to match
+    :param is_match: if the path matches
+    """
+    assert bool(vup.globs.compile_pattern(pattern).match(path)) == is_match
+
+
+def test_globs_match_tracked_files(repo_with_packages):
+    """
+    :param repo_with_packages: fixture of a repository with three packages
+    """
+    util.write_config({
+        'version_files': [
+            'packages/a/version.py', {
+                'path': 'packages/**/version.py',
+                'locator': 'line:1'
+            }
+        ]
+    })
+    vup.bump([], 'minor')
+
+    for a_file in repo_with_packages.version_files:
+        with open(a_file) as version_file:
+            assert version_file.read() == '1.1.1-beta'
+    for a_file in ['packages/a/build/version.py', 'packages/new/version.py']:
+        with open(os.path.join(repo_with_packages.dir, a_file)) as version_file:
+            assert version_file.read() == '1.0.0'
+    assert sorted(repo_with_packages.repo.head.commit.stats.files) == [
+        'packages/a/version.py', 'packages/b/version.py',
+        'packages/c/d/version.py'
+    ]
+
+
+def test_globs_are_relative_to_the_current_directory(repo_with_packages):
+    """
+    :param repo_with_packages: fixture of a repository with three packages
+    """
+    tracked_paths = repo_with_packages.repo.git.ls_files().split('\n')
+    os.chdir(os.path.join(repo_with_packages.dir, 'packages', 'c'))
+    assert not vup.globs.match('../../../*', tracked_paths, repo_with_packages.dir)
+    expanded = vup.globs.expand([('../[ab]/*.py', None),
+                                 ('d/*.py', 'line:1')], tracked_paths,
+                                repo_with_packages.dir)
+    assert expanded == [
+        (os.path.join('..', 'a', 'version.py'), None),
+        (os.path.join('..', 'b', 'version.py'), None),
+        (os.path.join('d', 'version.py'), 'line:1'),
+    ]
+
+
+def test_glob_matching_no_files(repo_with_packages):
+    """
+    :param repo_with_packages: fixture of a repository with three packages
+    """
+    with pytest.raises(vup.error.VupErrorPatternMatchesNoFiles):
+        vup.bump(['packages/new/*.py'], 'patch')
+    with open(repo_with_packages.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.0'
@@ -0,0 +1,98 @@
+import os
+import pytest
+import vup
+import vup.error
+import vup.history
+
+# pylint: disable=invalid-name
+
+
+def commit(a_repo, message):
+    """
+    :param a_repo: fixture of a test repository
+    :param message: the commit message
+    """
+    with open(os.path.join(a_repo.dir, 'other.txt'), 'a') as a_file:
+        a_file.write('.')
+    a_repo.repo.index.add(['other.txt'])
+    return a_repo.repo.index.commit(message).hexsha
+
+
+@pytest.mark.parametrize('message, bump_type', [
+    ('feat: add a thing', 'minor'),
+    ('fix(parser): handle empty input', 'patch'),
+    ('perf: cache the tags', 'patch'),
+    ('Feat: add a thing', 'minor'),
+    ('feat(api)!: drop the old endpoint', 'major'),
+    ('refactor: move code\n\nBREAKING CHANGE: the module moved', 'major'),
+    ('docs: fix a typo', None),
+    ('Fix the build', None),
+    ('feat:missing space', None),
+])
+def test_get_commit_bump_type(message, bump_type):
+    """
+    :param message: the commit message
+    :param bump_type: the expected bump type
+    """
+    assert vup.history.get_commit_bump_type(message) == bump_type
+
+
+def test_bump_auto(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture to capture the output
+    """
+    a_repo.init('1.0.0')
+    a_repo.repo.create_tag('1.0.0')
+    commit(a_repo, 'docs: explain things')
+    with pytest.raises(vup.error.VupErrorNoReleasableCommits):
+        vup.bump(a_repo.version_files, 'auto')
+    commit(a_repo, 'fix: a bug')
+    commit(a_repo, 'chore: tidy up')
+    vup.bump(a_repo.version_files, 'auto')
+    assert 'patch bump since 1.0.0' in capsys.readouterr().out
+    assert a_repo.repo.tags['1.0.1']
+    with open(a_repo.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.2-beta'
+
+    # a patch bump of the pre-release left by the previous bump
+    commit(a_repo, 'fix: another bug')
+    vup.bump(a_repo.version_files, 'auto')
+    assert 'patch bump since 1.0.1' in capsys.readouterr().out
+    assert a_repo.repo.tags['1.0.2']
+    with open(a_repo.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.3-beta'
+
+    commit(a_repo, 'feat: a feature')
+    vup.bump(a_repo.version_files, 'auto')
+    assert 'minor bump since 1.0.2' in capsys.readouterr().out
+    assert a_repo.repo.tags['1.1.0']
+
+
+def test_history_cache_only_reads_new_commits(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('1.0.0')
+    git_dir = a_repo.repo.git_dir
+    tag_sha = a_repo.repo.head.commit.hexsha
+    commit(a_repo, 'fix: a bug')
+    head_sha = commit(a_repo, 'docs: explain things')
+
+    cache = vup.history.HistoryCache.for_repo(a_repo.repo)
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == ('patch', 2)
+    cache.save()
+    cache = vup.history.HistoryCache.for_repo(a_repo.repo)
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == ('patch', 0)
+
+    head_sha = commit(a_repo, 'feat: a feature')
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == ('minor', 1)
+    head_sha = commit(a_repo, 'feat!: a breaking feature')
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == ('major', 1)
+    head_sha = commit(a_repo, 'fix: a bug')
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == ('major', 0)
+
+    # after a reset the cached HEAD is no longer an ancestor
+    a_repo.repo.head.reset(tag_sha, index=True, working_tree=True)
+    head_sha = commit(a_repo, 'docs: explain things')
+    assert cache.get_bump_type(git_dir, head_sha, tag_sha) == (None, 1)
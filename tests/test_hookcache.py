@@ -0,0 +1,86 @@
+import os
+import pytest
+import yaml
+import vup
+import vup.__main__
+import vup.error
+import vup.hookcache
+import vup.hooks
+
+# pylint: disable=invalid-name
+
+HOOK = vup.hooks.Hook('make test', 'make test', None)
+
+
+def test_recorded_hooks_pass_for_the_same_tree(tmpdir, monkeypatch):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param monkeypatch: fixture to change the environment
+    """
+    path = str(tmpdir.join('hook-cache'))
+    monkeypatch.setenv('PYTHON', '3.11')
+    hook_cache = vup.hookcache.HookCache(path, 'a' * 40, ['PYTHON'])
+    assert not hook_cache.has_passed(HOOK)
+    hook_cache.record(HOOK, 1.5)
+    hook_cache.save()
+
+    assert vup.hookcache.HookCache(path, 'a' * 40,
+                                   ['PYTHON']).has_passed(HOOK)
+    assert not vup.hookcache.HookCache(path, 'b' * 40,
+                                       ['PYTHON']).has_passed(HOOK)
+    assert not vup.hookcache.HookCache(path, 'a' * 40).has_passed(HOOK)
+    monkeypatch.setenv('PYTHON', '3.12')
+    assert not vup.hookcache.HookCache(path, 'a' * 40,
+                                       ['PYTHON']).has_passed(HOOK)
+
+    assert vup.hookcache.clear(path) == 1
+    assert not vup.hookcache.HookCache(path, 'a' * 40,
+                                       ['PYTHON']).has_passed(HOOK)
+
+
+def test_least_recently_used_keys_are_evicted(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    path = str(tmpdir.join('hook-cache'))
+    trees = ['{:040x}'.format(number) for number in range(3)]
+    for tree in trees:
+        hook_cache = vup.hookcache.HookCache(path, tree, max_entries=2)
+        hook_cache.record(HOOK, 1)
+        hook_cache.save()
+    # using the second one makes the third the least recently used
+    hook_cache = vup.hookcache.HookCache(path, trees[1], max_entries=2)
+    assert hook_cache.has_passed(HOOK)
+    hook_cache.save()
+
+    assert [
+        vup.hookcache.HookCache(path, tree).has_passed(HOOK)
+        for tree in trees
+    ] == [False, True, True]
+
+
+def test_retried_bump_skips_the_prehook(a_repo, tmpdir):
+    """
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_repo.init('1.0.0')
+    runs = tmpdir.join('runs')
+    with open('.vup.yaml', 'w') as file_handle:
+        yaml.dump({
+            'hook_cache': True,
+            'prehook': ['echo run >> "{}"'.format(runs), 'true']
+        }, file_handle)
+    a_repo.repo.create_tag('1.0.1')
+
+    for _ in range(2):
+        with pytest.raises(vup.error.VupErrorVersionTagAlreadyExists):
+            vup.bump(a_repo.version_files, 'patch')
+    assert runs.read().count('run') == 1
+
+    assert vup.__main__.main(['--no-daemon', 'cache', 'clear']) == 0
+    assert not os.path.exists(
+        vup.hookcache.get_hook_cache_path(a_repo.repo))
+    with pytest.raises(vup.error.VupErrorVersionTagAlreadyExists):
+        vup.bump(a_repo.version_files, 'patch')
+    assert runs.read().count('run') == 2
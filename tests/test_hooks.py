@@ -0,0 +1,148 @@
+import time
+import pytest
+import vup
+import vup.error
+import vup.hooks
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_get_hooks():
+    hooks = vup.hooks.get_hooks(
+        ['make lint', {
+            'cmd': 'make test',
+            'name': 'tests',
+            'timeout': 60
+        }], default_timeout=5)
+    assert hooks == [
+        vup.hooks.Hook('make lint', 'make lint', 5),
+        vup.hooks.Hook('make test', 'tests', 60)
+    ]
+    assert vup.hooks.get_hooks('make') == [
+        vup.hooks.Hook('make', 'make', None)
+    ]
+    assert vup.hooks.get_hooks(None) == []
+    with pytest.raises(vup.error.VupErrorHookIsInvalid):
+        vup.hooks.get_hooks([{'name': 'no command'}])
+
+
+def test_hooks_run_at_the_same_time(capsys):
+    """
+    :param capsys: fixture capturing the output
+    """
+    hooks = vup.hooks.get_hooks([{
+        'cmd': 'echo first; sleep 0.5; echo done',
+        'name': 'a'
+    }, {
+        'cmd': 'sleep 0.5; echo second',
+        'name': 'b'
+    }])
+    start = time.monotonic()
+    results = vup.hooks.run_hooks(hooks)
+    assert time.monotonic() - start < 0.9
+    assert [result.returncode for result in results] == [0, 0]
+    assert results[0].output == ['first', 'done']
+    output = capsys.readouterr().out.splitlines()
+    assert '[a] first' in output
+    assert '[b] second' in output
+    assert output.index('[a] first') < output.index('[a] done')
+
+
+def test_jobs_limit_the_hooks_running_at_once():
+    hooks = vup.hooks.get_hooks(['sleep 0.3', 'sleep 0.3'])
+    start = time.monotonic()
+    vup.hooks.run_hooks(hooks, jobs=1)
+    assert time.monotonic() - start >= 0.6
+
+
+def test_failure_cancels_the_other_hooks():
+    hooks = vup.hooks.get_hooks(['sleep 10', 'exit 3', 'sleep 10'])
+    start = time.monotonic()
+    results = vup.hooks.run_hooks(hooks, jobs=2)
+    assert time.monotonic() - start < 5
+    assert results[1].returncode == 3
+    assert results[0].is_cancelled
+    assert results[2].is_cancelled and results[2].returncode is None
+    assert vup.hooks.describe_failure(results[1]) == 'exit 3 (exit code 3)'
+
+
+def test_timeout():
+    failed_hook = vup.hooks.run_hook_setting([{
+        'cmd': 'sleep 10',
+        'name': 'slow'
+    }], False, default_timeout=0.2)
+    assert failed_hook.is_timed_out
+    assert vup.hooks.describe_failure(failed_hook) == \
+        'slow (timed out after 0.2s)'
+
+
+def test_dry_run_only_prints(capsys):
+    """
+    :param capsys: fixture capturing the output
+    """
+    assert vup.run_hook(['exit 1', 'exit 2'], True)
+    assert capsys.readouterr().out == 'exit 1\nexit 2\n'
+
+
+def test_bump_with_failing_prehook_list(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('1.0.0')
+    with pytest.raises(vup.error.VupErrorPrehookFailed) as excinfo:
+        vup.bump(a_repo.version_files, 'patch', prehook=['true', 'false'])
+    assert 'false (exit code 1)' in str(excinfo.value)
+    assert str(vup.VersionFile(a_repo.version_files[0]).version) == '1.0.0'
+
+
+def test_failed_validation_stops_the_prehook(a_repo, tmpdir):
+    """
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_repo.init('1.0.0')
+    ran = tmpdir.join('ran')
+    start = time.monotonic()
+    with pytest.raises(vup.error.VupErrorVersionFileDoesNotExist):
+        vup.bump(a_repo.version_files + ['missing.txt'],
+                 'patch',
+                 prehook='sleep 10; touch "{}"'.format(ran))
+    assert time.monotonic() - start < 5
+    assert not ran.check()
+
+
+def test_prehook_starts_after_the_dirty_check(a_repo, tmpdir):
+    """
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_repo.init('1.0.0')
+    ran = tmpdir.join('ran')
+    util.append_to_file(a_repo.other_file, 'modifications')
+    with pytest.raises(vup.error.VupErrorRepositoryHasUncommitedChanges):
+        vup.bump(a_repo.version_files,
+                 'patch',
+                 prehook='touch "{}"'.format(ran))
+    assert not ran.check()
+
+
+def test_prehook_after_validation_when_not_pipelined(a_repo, tmpdir):
+    """
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_repo.init('1.0.0')
+    ran = tmpdir.join('ran')
+    with open('.vup.yaml', 'w') as file_handle:
+        file_handle.write('pipelined_prehook: false\n')
+    with pytest.raises(vup.error.VupErrorVersionFileDoesNotExist):
+        vup.bump(a_repo.version_files + ['missing.txt'],
+                 'patch',
+                 prehook='touch "{}"'.format(ran))
+    assert not ran.check()
+
+    vup.bump(a_repo.version_files, 'patch', prehook='touch "{}"'.format(ran))
+    assert ran.check()
+    assert str(vup.VersionFile(a_repo.version_files[0]).version) == \
+        '1.0.2-beta'
@@ -0,0 +1,67 @@
+import os
+import vup
+import vup.index
+
+# pylint: disable=invalid-name
+
+
+def make_old_version_file(tmpdir, contents):
+    """Create a version file with a modification time in the past
+
+    :param tmpdir: temporary directory unique to the test invocation
+    :param contents: contents of the version file
+
+    """
+    a_file = tmpdir.join('version.txt')
+    a_file.write_binary(contents)
+    os.utime(str(a_file), ns=(10**9, 10**9))
+    return str(a_file)
+
+
+def test_index_entry_is_used_when_stat_matches(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_file = make_old_version_file(tmpdir, b'version 1.2.3\n')
+    index_path = str(tmpdir.join('index'))
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    vup.VersionFile(a_file, version_index=version_index)
+    version_index.save()
+
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    assert tuple(version_index.lookup(a_file, None)) == (8, 13, '1.2.3')
+    assert version_index.lookup(a_file, 'line:1') is None
+
+
+def test_index_entry_is_not_used_when_file_changed(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_file = make_old_version_file(tmpdir, b'version 1.2.3\n')
+    index_path = str(tmpdir.join('index'))
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    vup.VersionFile(a_file, version_index=version_index)
+    version_index.save()
+
+    # same size and modification time but a different version
+    make_old_version_file(tmpdir, b'version 4.5.6\n')
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    assert version_index.lookup(a_file, None) is None
+    assert str(vup.VersionFile(a_file, version_index=version_index).version
+               ) == '4.5.6'
+
+
+def test_index_entry_modified_after_index_was_written_is_not_used(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_file = make_old_version_file(tmpdir, b'version 1.2.3\n')
+    index_path = str(tmpdir.join('index'))
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    vup.VersionFile(a_file, version_index=version_index)
+    version_index.save()
+    os.utime(a_file, ns=(4 * 10**18, 4 * 10**18))
+
+    version_index = vup.index.VersionIndex(index_path, str(tmpdir))
+    version_index.entries['version.txt']['stat'][0] = 4 * 10**18
+    assert version_index.lookup(a_file, None) is None
@@ -0,0 +1,134 @@
+import os
+import pytest
+import vup
+import vup.error
+
+# pylint: disable=invalid-name
+
+JSON_DOCUMENT = b'''{
+  "name": "a-package",
+  "dependencies": {"other": {"version": "9.9.9"}, "list": [1, "2", {}]},
+  "version": "1.2.3",
+  "packages": [{"version": "4.5.6"}]
+}
+'''
+
+TOML_DOCUMENT = b'''[tool.other]
+version = "9.9.9"
+
+[project]
+name = "a-package"
+version = "1.2.3"
+'''
+
+YAML_DOCUMENT = b'''dependencies:
+  other:
+    version: 9.9.9
+package:
+  name: a-package
+  version: "1.2.3"  # the release
+'''
+
+
+@pytest.mark.parametrize("contents,locator,expected", [
+    (JSON_DOCUMENT, 'json:$.version', '1.2.3'),
+    (JSON_DOCUMENT, 'json:$.packages[0].version', '4.5.6'),
+    (JSON_DOCUMENT, 'json:$.dependencies.other.version', '9.9.9'),
+    (TOML_DOCUMENT, 'toml:project.version', '1.2.3'),
+    (TOML_DOCUMENT, 'toml:tool.other.version', '9.9.9'),
+    (YAML_DOCUMENT, 'yaml:package.version', '1.2.3'),
+    (YAML_DOCUMENT, 'line:3', '9.9.9'),
+    (TOML_DOCUMENT, r'regex:^version = "(?P<version>[^"]+)"', '9.9.9'),
+])
+def test_locator(tmpdir, contents, locator, expected):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param contents: contents of the version file
+    :param locator: the locator string to find the version with
+    :param expected: the version that should be found
+    """
+    a_file = tmpdir.join('version_file')
+    a_file.write_binary(contents)
+    version_file = vup.VersionFile(str(a_file), locator=locator)
+    assert str(version_file.version) == expected
+
+    version_file.replace_version('10.0.0-beta')
+    assert str(vup.VersionFile(str(a_file),
+                               locator=locator).version) == '10.0.0-beta'
+
+
+@pytest.mark.parametrize("locator", [
+    'json:$.missing', 'toml:project.missing', 'yaml:missing', 'line:100'
+])
+def test_locator_without_a_match(tmpdir, locator):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param locator: the locator string to find the version with
+    """
+    a_file = tmpdir.join('version_file')
+    a_file.write_binary(JSON_DOCUMENT)
+    with pytest.raises(vup.error.VupErrorFileDoesNotHaveAVersionNumber):
+        vup.VersionFile(str(a_file), locator=locator)
+
+
+@pytest.mark.parametrize("locator", ['xml:version', 'line:x', 'regex:('])
+def test_invalid_locator(tmpdir, locator):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param locator: the invalid locator string
+    """
+    a_file = tmpdir.join('version_file')
+    a_file.write_binary(JSON_DOCUMENT)
+    with pytest.raises(vup.error.VupErrorInvalidLocator):
+        vup.VersionFile(str(a_file), locator=locator)
+
+
+def test_bump_with_a_locator(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('{"version": "1.2.3-beta", "dependency": "0.1.0"}',
+                ('package.json', ))
+    vup.bump([{
+        'path': a_repo.version_files[0],
+        'locator': 'json:$.version'
+    }], 'minor')
+
+    version_file = vup.VersionFile(
+        a_repo.version_files[0], locator='json:$.version')
+    assert str(version_file.version) == '1.3.1-beta'
+
+
+def test_bump_two_locators_in_one_file(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('a 1.0.0\nb 1.0.0\n')
+    vup.bump([{
+        'path': 'version.txt',
+        'locator': 'line:1'
+    }, {
+        'path': 'version.txt',
+        'locator': 'line:2'
+    }], 'minor')
+
+    with open(a_repo.version_files[0]) as version_file:
+        assert version_file.read() == 'a 1.1.1-beta\nb 1.1.1-beta\n'
+    release_commit = a_repo.repo.head.commit.parents[0]
+    assert release_commit.tree['version.txt'].data_stream.read() == \
+        b'a 1.1.0\nb 1.1.0\n'
+
+
+def test_bump_version_file_and_symlink_to_it(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('1.0.0')
+    os.symlink('version.txt', 'link.txt')
+    a_repo.repo.index.add(['link.txt'])
+    a_repo.repo.index.commit('Add link')
+    vup.bump(['version.txt', 'link.txt'], 'patch')
+
+    with open(a_repo.version_files[0]) as version_file:
+        assert version_file.read() == '1.0.2-beta'
+    assert os.readlink('link.txt') == 'version.txt'
@@ -0,0 +1,52 @@
+import os
+import sys
+import subprocess
+import vup.__main__
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_main_query(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture capturing the output
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    exit_code = vup.__main__.main(
+        ['--no-daemon', 'query', '-f', a_repo.version_files[0]])
+    assert exit_code == 0
+    assert capsys.readouterr().out == util.DEFAULT_INPUT_VERSION + '\n'
+
+
+def test_main_error(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture capturing the output
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    assert vup.__main__.main(['--no-daemon', 'query', '-f', 'asdf']) == 1
+    assert 'asdf does not exist' in capsys.readouterr().err
+
+
+def test_main_without_a_subcommand(capsys):
+    """
+    :param capsys: fixture capturing the output
+    """
+    assert vup.__main__.main([]) == 1
+    assert capsys.readouterr().out.startswith('usage: vup')
+
+
+def test_startup_does_not_import_heavy_modules():
+    """The version and help options shouldn't load git, yaml or
+    semantic_version
+    """
+    code = ('import sys, vup.__main__; vup.__main__.create_parser(); '
+            'print(sorted(set(sys.modules) & '
+            '{"git", "yaml", "semantic_version"}))')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', code],
+                            cwd=root,
+                            stdout=subprocess.PIPE,
+                            check=True).stdout
+    assert output.decode().strip() == '[]'
@@ -0,0 +1,96 @@
+import pytest
+import vup
+import vup.error
+
+# pylint: disable=invalid-name
+
+CONFIG = '''
+packages:
+  pkg-a:
+    version_files:
+      - packages/a/version.py
+  pkg-b:
+    version_files:
+      - packages/b/version.py
+      - {path: packages/b/package.json, locator: 'json:$.version'}
+    tag_prefix: b-v
+'''
+
+
+@pytest.fixture()
+def package_repo(repo_with_packages):
+    """A test repository with two of its packages in its config file
+
+    :param repo_with_packages: fixture of a repository with three packages
+
+    """
+    with open('packages/b/version.py', 'w') as file_handle:
+        file_handle.write('2.0.0-beta')
+    with open('packages/b/package.json', 'w') as file_handle:
+        file_handle.write('{"version": "2.0.0-beta", "dependency": "1.0.0"}')
+    with open('.vup.yaml', 'w') as file_handle:
+        file_handle.write(CONFIG)
+    repo_with_packages.repo.index.add(
+        ['packages/b/version.py', 'packages/b/package.json', '.vup.yaml'])
+    repo_with_packages.repo.index.commit("Add packages")
+    return repo_with_packages
+
+
+def get_version(a_file, locator=None):
+    """
+    :param a_file: the version file
+    :param locator: the locator of the version file (Default value = None)
+    """
+    return str(vup.VersionFile(a_file, locator=locator).version)
+
+
+def test_bump_all_packages(package_repo):
+    """
+    :param package_repo: fixture of a repository with packages
+    """
+    vup.bump(None, 'minor')
+
+    assert get_version('packages/a/version.py') == '1.1.1-beta'
+    assert get_version('packages/b/version.py') == '2.0.1-beta'
+    assert get_version('packages/b/package.json',
+                       'json:$.version') == '2.0.1-beta'
+    assert {str(tag) for tag in package_repo.repo.tags} == {
+        'pkg-a@1.1.0', 'b-v2.0.0'
+    }
+    commits = list(package_repo.repo.iter_commits(max_count=2))
+    assert commits[1].message == ('Increment versions of 2 packages\n\n'
+                                  'pkg-a: 1.0.0 to 1.1.0\n'
+                                  'pkg-b: 2.0.0-beta to 2.0.0')
+    assert str(package_repo.repo.tags['b-v2.0.0'].commit) == str(commits[1])
+    assert package_repo.repo.tags['pkg-a@1.1.0'].tag.message == \
+        'pkg-a version 1.1.0'
+    assert package_repo.repo.tags['b-v2.0.0'].tag.message == \
+        'pkg-b version 2.0.0'
+
+
+def test_bump_one_package(package_repo):
+    """
+    :param package_repo: fixture of a repository with packages
+    """
+    vup.bump(None, 'patch', package_names=['pkg-a'])
+
+    assert get_version('packages/a/version.py') == '1.0.2-beta'
+    assert get_version('packages/b/version.py') == '2.0.0-beta'
+    assert package_repo.repo.head.commit.message == (
+        'Increment pkg-a version from 1.0.1 to 1.0.2-beta')
+
+
+def test_bump_package_tag_already_exists(package_repo):
+    """
+    :param package_repo: fixture of a repository with packages
+    """
+    package_repo.repo.create_tag('b-v2.0.0')
+    with pytest.raises(vup.error.VupErrorVersionTagAlreadyExists):
+        vup.bump(None, 'major')
+    assert get_version('packages/a/version.py') == '1.0.0'
+
+
+@pytest.mark.usefixtures('package_repo')
+def test_bump_package_that_does_not_exist():
+    with pytest.raises(vup.error.VupErrorPackageDoesNotExist):
+        vup.bump(None, 'major', package_names=['pkg-c'])
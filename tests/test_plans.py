@@ -0,0 +1,153 @@
+import json
+import hashlib
+import pytest
+import vup
+import vup.__main__
+import vup.error
+import vup.plans
+import vup.scanner
+
+# pylint: disable=invalid-name
+
+
+@pytest.fixture()
+def planned_repo(a_repo, tmpdir):
+    """A test repository with a plan for a minor bump
+
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+
+    """
+    a_repo.init('version = "1.2.3-beta"\n')
+    a_repo.plan_file = str(tmpdir.join('plan.json'))
+    vup.plan('minor', a_repo.plan_file, a_repo.version_files)
+    return a_repo
+
+
+def test_plan_contents(planned_repo):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    """
+    with open(planned_repo.plan_file) as plan_file:
+        data = json.load(plan_file)
+    assert data['repo_state']['head'] == planned_repo.repo.head.commit.hexsha
+    assert data['repo_state']['tree'] == \
+        planned_repo.repo.head.commit.tree.hexsha
+    assert data['tags'] == ['1.3.0']
+    assert data['release_commit_message'] == \
+        'Increment version from 1.2.3-beta to 1.3.0'
+    assert data['prerelease_commit_message'] == \
+        'Increment version from 1.3.0 to 1.3.1-beta'
+    assert data['packages'][0]['files'] == [{
+        'path': 'version.txt',
+        'locator': None,
+        'start': 11,
+        'end': 21,
+        'size': 23,
+        'version': '1.2.3-beta',
+        'sha256': hashlib.sha256(b'version = "1.2.3-beta"\n').hexdigest()
+    }]
+    # planning doesn't change anything
+    assert not planned_repo.repo.is_dirty()
+    assert not planned_repo.repo.tags
+
+
+def test_apply_without_scanning(planned_repo, monkeypatch):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    :param monkeypatch: fixture to replace the scanner
+    """
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the version files were searched')
+
+    monkeypatch.setattr(vup.scanner, 'scan_version', fail)
+    assert vup.__main__.main(
+        ['--no-daemon', 'apply', planned_repo.plan_file]) == 0
+
+    with open(planned_repo.version_files[0]) as version_file:
+        assert version_file.read() == 'version = "1.3.1-beta"\n'
+    assert [str(tag) for tag in planned_repo.repo.tags] == ['1.3.0']
+    assert planned_repo.repo.head.commit.message == \
+        'Increment version from 1.3.0 to 1.3.1-beta'
+    assert planned_repo.repo.head.commit.parents[0].message == \
+        'Increment version from 1.2.3-beta to 1.3.0'
+
+
+def test_apply_stale_head(planned_repo):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    """
+    with open(planned_repo.other_file, 'a') as other_file:
+        other_file.write('more')
+    planned_repo.repo.index.add([planned_repo.other_file])
+    planned_repo.repo.index.commit('Another commit')
+    with pytest.raises(vup.error.VupErrorPlanIsStale) as excinfo:
+        vup.apply(planned_repo.plan_file)
+    assert 'head changed' in str(excinfo.value)
+
+
+def test_apply_stale_index(planned_repo):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    """
+    with open(planned_repo.other_file, 'a') as other_file:
+        other_file.write('more')
+    planned_repo.repo.index.add([planned_repo.other_file])
+    with pytest.raises(vup.error.VupErrorPlanIsStale) as excinfo:
+        vup.apply(planned_repo.plan_file)
+    assert 'index changed' in str(excinfo.value)
+
+
+def test_apply_stale_version_file(planned_repo):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    """
+    with open(planned_repo.version_files[0], 'w') as version_file:
+        version_file.write('version = "1.2.4-beta"\n')
+    with pytest.raises(vup.error.VupErrorPlanIsStale) as excinfo:
+        vup.apply(planned_repo.plan_file)
+    assert 'version.txt changed' in str(excinfo.value)
+
+
+def test_apply_same_size_change_in_version_file(planned_repo):
+    """
+    :param planned_repo: fixture of a repository with a plan
+    """
+    with open(planned_repo.version_files[0], 'w') as version_file:
+        version_file.write('versioN = "1.2.3-beta"\n')
+    with pytest.raises(vup.error.VupErrorPlanIsStale) as excinfo:
+        vup.apply(planned_repo.plan_file)
+    assert 'version.txt changed' in str(excinfo.value)
+    assert not planned_repo.repo.tags
+
+
+def test_apply_invalid_plan(tmpdir, a_repo):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init('1.0.0')
+    plan_file = tmpdir.join('plan.json')
+    plan_file.write('{"format": 1}')
+    with pytest.raises(vup.error.VupErrorPlanIsInvalid):
+        vup.apply(str(plan_file))
+    with pytest.raises(vup.error.VupErrorPlanIsInvalid):
+        vup.apply(str(tmpdir.join('missing.json')))
+
+
+def test_bump_doesnt_hash_the_version_files(a_repo, monkeypatch):
+    """
+    :param a_repo: fixture of a test repository
+    :param monkeypatch: fixture to replace the hashing
+    """
+    a_repo.init('1.0.0')
+    expected = vup.plans.hash_file(a_repo.version_files[0])
+    assert vup.plans.hash_file(a_repo.version_files[0], chunk_size=2) == \
+        expected
+
+    def fail(*args, **kwargs):
+        raise AssertionError('a version file was hashed')
+
+    monkeypatch.setattr(vup.plans, 'hash_file', fail)
+    vup.bump(a_repo.version_files, 'minor')
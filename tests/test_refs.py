@@ -0,0 +1,50 @@
+import pytest
+import vup.refs
+
+# pylint: disable=invalid-name
+
+SHA = 'a' * 40
+PEELED_SHA = 'b' * 40
+TAGS = ['0.1.0', '1.0.0', '1.0.0-beta', '1.10.0', '1.2.0', '2.0.0', 'v3']
+
+
+def write_packed_refs(tmpdir, header, tags):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param header: the first line of the packed-refs file
+    :param tags: the tag names to write in the order to write them
+    """
+    lines = [header] if header else []
+    lines.append('{} refs/heads/master'.format(SHA))
+    for tag in tags:
+        lines.append('{} refs/tags/{}'.format(SHA, tag))
+        lines.append('^{}'.format(PEELED_SHA))
+    tmpdir.join('packed-refs').write('\n'.join(lines) + '\n')
+
+
+@pytest.mark.parametrize("header,tags", [
+    ('# pack-refs with: peeled fully-peeled sorted ', sorted(TAGS)),
+    ('# pack-refs with: peeled ', list(reversed(TAGS))),
+    (None, sorted(TAGS)),
+])
+def test_packed_tags(tmpdir, header, tags):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param header: the first line of the packed-refs file
+    :param tags: the tag names to write in the order to write them
+    """
+    write_packed_refs(tmpdir, header, tags)
+    for tag in TAGS:
+        assert vup.refs.tag_exists(str(tmpdir), tag)
+    for tag in ['0.0.1', '1.0', '1.0.0-alpha', '1.3.0', '9.0.0', 'master']:
+        assert not vup.refs.tag_exists(str(tmpdir), tag)
+
+
+def test_loose_tag(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    tmpdir.join('refs', 'tags', 'release', '1.0.0').write(SHA, ensure=True)
+    assert vup.refs.tag_exists(str(tmpdir), 'release/1.0.0')
+    assert not vup.refs.tag_exists(str(tmpdir), 'release')
+    assert not vup.refs.tag_exists(str(tmpdir), '1.0.0')
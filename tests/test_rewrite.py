@@ -0,0 +1,43 @@
+import os
+import stat
+import pytest
+import vup.rewrite
+import vup.scanner
+
+# pylint: disable=invalid-name
+
+
+@pytest.mark.parametrize("replacement", [b'1.2.4', b'1.2.4-beta.10'])
+def test_replace_span_keeps_the_rest_of_the_file(tmpdir, replacement):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param replacement: the version to write over the old one
+    """
+    a_file = tmpdir.join('version.txt')
+    a_file.write_binary(b'line 1\r\nversion = "1.2.3"\r\nline 3\r\n')
+    span = vup.scanner.VersionMatch(19, 24, '1.2.3')
+
+    vup.rewrite.replace_span(str(a_file), span, replacement, chunk_size=4)
+    vup.rewrite.sync_files([str(a_file)])
+
+    assert a_file.read_binary() == (
+        b'line 1\r\nversion = "' + replacement + b'"\r\nline 3\r\n')
+    assert tmpdir.listdir() == [a_file]
+
+
+def test_replace_span_of_a_symlink(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    target = tmpdir.join('real', 'version.txt')
+    target.write_binary(b'version = "1.2.3"\n', ensure=True)
+    target.chmod(0o751)
+    link = tmpdir.join('version.txt')
+    link.mksymlinkto(target)
+    span = vup.scanner.scan_version(str(link), vup.VERSION_PATTERN)[0]
+    vup.rewrite.replace_span(str(link), span, b'1.2.30')
+    vup.rewrite.sync_files([str(link)])
+
+    assert os.path.islink(str(link))
+    assert target.read_binary() == b'version = "1.2.30"\n'
+    assert stat.S_IMODE(os.stat(str(target)).st_mode) == 0o751
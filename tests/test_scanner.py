@@ -0,0 +1,65 @@
+import re
+import pytest
+import vup
+import vup.scanner
+
+# pylint: disable=invalid-name
+
+
+def scan_text(tmpdir, text, chunk_size, limit=2):
+    """Write text to a file and scan it
+
+    :param tmpdir: temporary directory unique to the test invocation
+    :param text: the bytes to write to the file
+    :param chunk_size: number of bytes the scanner reads at a time
+    :param limit: the maximum number of matches to find
+
+    """
+    a_file = tmpdir.join('version.txt')
+    a_file.write_binary(text)
+    return vup.scanner.scan_version(
+        str(a_file), vup.VERSION_PATTERN, limit=limit, chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize("text", [
+    b'version = "1.2.3-beta.1+build.5"\n',
+    b'12.34.56',
+    b'x01.2.3 y',
+    b'first 1.2.3, second 4.5.6-rc.1\n',
+    b'no version here',
+    b'',
+])
+def test_scan_matches_full_text_regex(tmpdir, text, chunk_size):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param text: the contents of the scanned file
+    :param chunk_size: number of bytes the scanner reads at a time
+    """
+    expected = [(match.start(), match.end(), match.group(0).decode('ascii'))
+                for match in re.finditer(vup.VERSION_PATTERN, text)]
+    found = scan_text(tmpdir, text, chunk_size, limit=len(expected) + 1)
+    assert [tuple(a_match) for a_match in found] == expected
+
+
+def test_scan_stops_at_limit(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    found = scan_text(tmpdir, b'1.0.0 2.0.0 3.0.0', chunk_size=4)
+    assert [a_match.text for a_match in found] == ['1.0.0', '2.0.0']
+
+
+@pytest.mark.parametrize("chunk_size", [3, 64, 4096, 1024 * 1024])
+def test_scan_skips_long_token_runs(tmpdir, chunk_size):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    :param chunk_size: number of bytes the scanner reads at a time
+    """
+    text = (b'1.0.0\n' + b'a' * vup.scanner.MAX_TOKEN_SIZE + b'9.9.9'
+            + b'b' * 10000 + b'\n3.0.0' + b'c' * vup.scanner.MAX_TOKEN_SIZE
+            + b'\n2.0.0')
+    found = scan_text(tmpdir, text, chunk_size, limit=3)
+    assert [tuple(a_match) for a_match in found] == [
+        (0, 5, '1.0.0'), (len(text) - 5, len(text), '2.0.0')
+    ]
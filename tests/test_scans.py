@@ -0,0 +1,78 @@
+import os
+import re
+import vup
+import vup.scans
+
+# pylint: disable=invalid-name
+
+FILES = {
+    'setup.py': b'name = "a"\nversion = "1.0.0"\n'
+    b'other = "11.0.0 1.0.0-beta"\n',
+    'docs/index.txt': b'Version 1.0.0\n\nSee 1.0.0 notes.\n',
+    'image.png': b'\x89PNG\0\0 1.0.0',
+    'large.txt': b'1.0.0\n' + b'x' * 4096,
+}
+
+
+def add_files(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    os.makedirs(os.path.join(a_repo.dir, 'docs'))
+    for path, content in FILES.items():
+        with open(os.path.join(a_repo.dir, path), 'wb') as a_file:
+            a_file.write(content)
+    a_repo.repo.index.add(list(FILES))
+    a_repo.repo.index.commit('Files Commit')
+    with open(os.path.join(a_repo.dir, 'untracked.txt'), 'w') as a_file:
+        a_file.write('1.0.0')
+
+
+def test_scan_reports_stray_versions(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture to capture the output
+    """
+    a_repo.init('1.0.0')
+    add_files(a_repo)
+    vup.scan(a_repo.version_files, propose=True, max_size=1024)
+    assert capsys.readouterr().out.split('\n') == [
+        'docs/index.txt:1: 1.0.0',
+        'docs/index.txt:3: 1.0.0',
+        'setup.py:2: 1.0.0',
+        'Found 3 other occurrences of the current version',
+        'Proposed additions to the version_files in .vup.yaml:',
+        'version_files:',
+        '- path: setup.py',
+        '  locator: line:2',
+        '',
+    ]
+
+    os.chdir(os.path.join(a_repo.dir, 'docs'))
+    vup.scan([os.path.join(os.pardir, 'version.txt')], max_size=1024 * 1024)
+    assert capsys.readouterr().out.split('\n')[:4] == [
+        'index.txt:1: 1.0.0',
+        'index.txt:3: 1.0.0',
+        os.path.join(os.pardir, 'large.txt') + ':1: 1.0.0',
+        os.path.join(os.pardir, 'setup.py') + ':2: 1.0.0',
+    ]
+
+
+def test_search_on_a_process_pool(a_repo, monkeypatch):
+    """
+    :param a_repo: fixture of a test repository
+    :param monkeypatch: fixture to put each file in its own batch
+    """
+    a_repo.init('1.0.0')
+    add_files(a_repo)
+    repo = a_repo.repo
+    pattern = re.compile(vup.REGEX.encode('ascii'))
+    hits = vup.scans.search(repo, repo.head.commit.hexsha, ['1.0.0'], pattern)
+    monkeypatch.setattr(vup.scans, 'get_batches',
+                        lambda blobs: ([blob] for blob in blobs))
+    assert vup.scans.search(repo, repo.head.commit.hexsha, ['1.0.0'],
+                            pattern, jobs=2) == hits
+    assert [hit.path for hit in hits] == [
+        'docs/index.txt', 'docs/index.txt', 'large.txt', 'setup.py',
+        'version.txt'
+    ]
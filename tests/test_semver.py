@@ -0,0 +1,117 @@
+import pickle
+import operator
+import pytest
+import semantic_version
+import vup.semver
+
+# pylint: disable=invalid-name
+
+
+@pytest.mark.parametrize("text", [
+    '0.0.0',
+    '1.2.3',
+    '10.20.30-beta',
+    '1.2.3-beta.1+build.5',
+    '1.2.3+001',
+    '1.0.0-0.3.7',
+    '1.0.0-x-y-z.--',
+])
+def test_parse_round_trips(text):
+    """
+    :param text: a valid version string
+    """
+    assert str(vup.semver.parse(text)) == text
+
+
+@pytest.mark.parametrize("text", [
+    '1.2',
+    '1.2.3.4',
+    '01.2.3',
+    '1.2.3-01',
+    '1.2.3-',
+    '1.2.3+',
+    '1.2.3-beta..1',
+    '1.2.3-bet@',
+    'v1.2.3',
+    '１.2.3',
+])
+def test_parse_invalid(text):
+    """
+    :param text: an invalid version string
+    """
+    with pytest.raises(ValueError):
+        vup.semver.parse(text)
+
+
+def test_parse_is_cached():
+    assert vup.semver.parse('1.2.3') is vup.semver.parse('1.2.3')
+
+
+def test_version_is_immutable():
+    version = vup.semver.parse('1.2.3')
+    with pytest.raises(AttributeError):
+        version.prerelease = ('beta', )
+    with pytest.raises(AttributeError):
+        version.label = 'not a slot'
+
+
+def test_sort_order_matches_semantic_version():
+    texts = [
+        '1.0.0', '1.0.0-alpha', '1.0.0-alpha.1', '1.0.0-alpha.beta',
+        '1.0.0-beta', '1.0.0-beta.2', '1.0.0-beta.11', '1.0.0-rc.1', '0.9.9',
+        '2.0.0', '1.10.0', '1.2.0'
+    ]
+    expected = [str(version) for version in sorted(
+        semantic_version.Version(text) for text in texts)]
+    versions = [vup.semver.parse(text) for text in texts]
+    assert [str(version) for version in sorted(versions)] == expected
+    assert [
+        str(version)
+        for version in sorted(versions, key=operator.attrgetter('sort_key'))
+    ] == expected
+
+
+def test_equality_and_hash():
+    assert vup.semver.parse('1.2.3') == vup.semver.Version(1, 2, 3)
+    assert vup.semver.parse('1.2.3') != vup.semver.parse('1.2.3-beta')
+    assert vup.semver.parse('1.2.3+a') != vup.semver.parse('1.2.3+b')
+    assert len({vup.semver.parse('1.2.3'), vup.semver.Version(1, 2, 3)}) == 1
+
+
+@pytest.mark.parametrize("text,next_major,next_minor,next_patch", [
+    ('1.2.3', '2.0.0', '1.3.0', '1.2.4'),
+    ('1.2.3-beta', '2.0.0', '1.3.0', '1.2.3'),
+    ('1.2.0-beta', '2.0.0', '1.2.0', '1.2.0'),
+    ('2.0.0-beta', '2.0.0', '2.0.0', '2.0.0'),
+    ('1.2.3+build', '2.0.0', '1.3.0', '1.2.4'),
+])
+def test_next_versions_match_semantic_version(text, next_major, next_minor,
+                                              next_patch):
+    """
+    :param text: the version string
+    :param next_major: the expected next major version
+    :param next_minor: the expected next minor version
+    :param next_patch: the expected next patch version
+    """
+    version = vup.semver.parse(text)
+    expected = semantic_version.Version(text)
+    assert str(version.next_major()) == next_major
+    assert str(version.next_minor()) == next_minor
+    assert str(version.next_patch()) == next_patch
+    assert str(expected.next_major()) == next_major
+    assert str(expected.next_minor()) == next_minor
+    assert str(expected.next_patch()) == next_patch
+
+
+def test_semantic_version_conversion():
+    version = vup.semver.parse('1.2.3-beta.1+build.5')
+    converted = version.to_semantic_version()
+    assert converted == semantic_version.Version('1.2.3-beta.1+build.5')
+    assert vup.semver.Version.from_semantic_version(converted) == version
+
+
+def test_replace_and_pickle():
+    version = vup.semver.parse('1.2.3')
+    assert str(version.replace(prerelease=('beta', ))) == '1.2.3-beta'
+    assert str(version) == '1.2.3'
+    assert pickle.loads(pickle.dumps(version)) == version
@@ -0,0 +1,108 @@
+import os
+import stat
+import vup
+import vup.server
+import vup.session
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_check(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture capturing the output
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    vup.check([a_repo.version_files[0]])
+    assert capsys.readouterr().out.endswith(util.DEFAULT_INPUT_VERSION + '\n')
+
+
+def test_requests_share_a_session(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    a_session = vup.session.Session()
+    options = {'version_files': [a_repo.version_files[0]]}
+
+    response = vup.server.handle_request({
+        'subcmd': 'query',
+        'options': options
+    }, a_session)
+    assert response == {
+        'stdout': util.DEFAULT_INPUT_VERSION + '\n',
+        'stderr': '',
+        'exit_code': 0
+    }
+    repo = a_session.get_repo()
+
+    response = vup.server.handle_request({
+        'subcmd': 'bump',
+        'options': dict(options, type='major')
+    }, a_session)
+    assert response['exit_code'] == 0
+    assert a_session.get_repo() is repo
+
+    response = vup.server.handle_request({
+        'subcmd': 'query',
+        'options': options
+    }, a_session)
+    assert response['stdout'] == util.DEFAULT_OUTPUT_VERSION_MAJOR + '\n'
+
+
+def test_request_error(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    response = vup.server.handle_request({
+        'subcmd': 'bump',
+        'options': {
+            'version_files': ['asdf'],
+            'type': 'major'
+        }
+    }, vup.session.Session())
+    assert response['exit_code'] == 1
+    assert 'asdf does not exist' in response['stderr']
+
+
+def test_request_runs_in_the_client_directory(a_repo, tmpdir):
+    """
+    :param a_repo: fixture of a test repository
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    a_session = vup.session.Session()
+    a_session.get_repo()
+    # the daemon was started elsewhere
+    os.chdir(str(tmpdir.mkdir('daemon')))
+    response = vup.server.handle_request({
+        'subcmd': 'query',
+        'options': {
+            'version_files': ['version.txt']
+        },
+        'cwd': a_repo.dir
+    }, a_session)
+    assert response['stdout'] == util.DEFAULT_INPUT_VERSION + '\n'
+    assert os.getcwd() == str(tmpdir.join('daemon'))
+
+
+def test_send_request_without_a_daemon(a_repo):
+    """
+    :param a_repo: fixture of a test repository
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    assert vup.server.send_request('query', {}) is None
+
+
+def test_socket_is_private(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    socket_path = str(tmpdir.join('daemon.sock'))
+    server = vup.server.bind(socket_path)
+    try:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0
+    finally:
+        server.close()
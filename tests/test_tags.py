@@ -0,0 +1,143 @@
+import os
+import pytest
+import vup
+import vup.__main__
+import vup.error
+import vup.semver
+import vup.tags
+
+# pylint: disable=invalid-name
+
+SHA = 'a' * 40
+TAGS = [
+    '0.9.0', '1.0.0-beta', '1.0.0', '1.0.1-beta.1', '1.0.1-beta.2',
+    '1.0.1-beta.10', '1.1.0', '1.2.0-rc.1', '2.0.0-beta', 'pkg@3.0.0',
+    'pkg@3.1.0-beta.1', 'v4.0.0', 'release', '1.0'
+]
+
+
+def write_tags(git_dir, packed_tags, loose_tags=()):
+    """
+    :param git_dir: the directory to write the refs in
+    :param packed_tags: names of the tags to write to packed-refs
+    :param loose_tags: names of the tags to write as loose refs
+    """
+    git_dir.join('packed-refs').write(''.join(
+        '{} refs/tags/{}\n'.format(SHA, tag) for tag in packed_tags))
+    for tag in loose_tags:
+        git_dir.join('refs', 'tags', *tag.split('/')).write(SHA, ensure=True)
+
+
+@pytest.fixture
+def tag_index(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    write_tags(tmpdir, TAGS[:6], TAGS[6:])
+    return vup.tags.TagIndex.load(str(tmpdir))
+
+
+def test_groups_by_prefix(tag_index):
+    """
+    :param tag_index: fixture of the TagIndex of TAGS
+    """
+    assert sorted(tag_index.groups) == ['', 'pkg@', 'v']
+    assert [str(version) for version in tag_index.get_group('pkg@')
+            ] == ['3.0.0', '3.1.0-beta.1']
+    assert not tag_index.get_group('other@')
+
+
+@pytest.mark.parametrize("major,minor,include_prereleases,expected", [
+    (None, None, False, '1.1.0'),
+    (None, None, True, '2.0.0-beta'),
+    (1, None, False, '1.1.0'),
+    (1, None, True, '1.2.0-rc.1'),
+    (1, 0, False, '1.0.0'),
+    (1, 0, True, '1.0.1-beta.10'),
+    (0, None, False, '0.9.0'),
+    (2, None, False, None),
+    (3, None, True, None),
+])
+def test_latest(tag_index, major, minor, include_prereleases, expected):
+    """
+    :param tag_index: fixture of the TagIndex of TAGS
+    :param major: the major line to limit the query to
+    :param minor: the minor line to limit the query to
+    :param include_prereleases: if pre-releases can be returned
+    :param expected: the expected version string or None
+    """
+    latest = tag_index.get_group().latest(major, minor, include_prereleases)
+    assert (str(latest) if latest else None) == expected
+
+
+def test_prerelease_queries(tag_index):
+    """
+    :param tag_index: fixture of the TagIndex of TAGS
+    """
+    group = tag_index.get_group()
+    parse = vup.semver.parse
+    assert str(group.latest_prerelease(parse('1.0.1'))) == '1.0.1-beta.10'
+    assert str(group.latest_prerelease(parse('1.0.0'))) == '1.0.0-beta'
+    assert group.latest_prerelease(parse('1.1.0')) is None
+    assert str(group.next_prerelease(parse('1.0.1'))) == '1.0.1-beta.11'
+    assert str(group.next_prerelease(parse('1.0.1'), 'rc')) == '1.0.1-rc.1'
+    assert str(group.next_prerelease(parse('5.0.0'))) == '5.0.0-beta.1'
+
+
+def test_exists(tag_index):
+    """
+    :param tag_index: fixture of the TagIndex of TAGS
+    """
+    group = tag_index.get_group()
+    for tag in ['0.9.0', '1.0.0-beta', '1.0.1-beta.10', '2.0.0-beta']:
+        assert group.exists(vup.semver.parse(tag))
+    for tag in ['1.0.1', '1.0.1-beta.3', '3.0.0', '2.0.0']:
+        assert not group.exists(vup.semver.parse(tag))
+
+
+def test_cache_is_used_until_a_tag_changes(tmpdir):
+    """
+    :param tmpdir: temporary directory unique to the test invocation
+    """
+    write_tags(tmpdir, ['1.0.0'])
+    cache_path = str(tmpdir.join('vup', 'tags'))
+    # make the refs older than the cache so they are not racily clean
+    os.utime(str(tmpdir.join('packed-refs')), ns=(0, 0))
+    tag_index = vup.tags.TagIndex.load(str(tmpdir), cache_path)
+    assert str(tag_index.get_group().latest()) == '1.0.0'
+
+    with open(cache_path, 'rb') as cache_file:
+        cached = cache_file.read()
+    assert vup.tags.TagIndex.load(str(tmpdir), cache_path).get_group().texts \
+        == ['1.0.0']
+    with open(cache_path, 'rb') as cache_file:
+        assert cache_file.read() == cached
+
+    write_tags(tmpdir, ['1.0.0'], ['2.0.0'])
+    tag_index = vup.tags.TagIndex.load(str(tmpdir), cache_path)
+    assert str(tag_index.get_group().latest()) == '2.0.0'
+
+
+def test_query_subcommand(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture capturing the output
+    """
+    a_repo.init('1.0.1-beta')
+    for tag in ['1.0.0', '1.0.1-beta.1', '1.0.1-beta.2']:
+        a_repo.repo.create_tag(tag)
+
+    def run_query(*args):
+        assert vup.__main__.main(['--no-daemon', 'query'] + list(args)) == 0
+        return capsys.readouterr().out
+
+    assert run_query('latest') == '1.0.0\n'
+    assert run_query('latest', '--prereleases') == '1.0.1-beta.2\n'
+    assert run_query('next-prerelease', '1.0.1') == '1.0.1-beta.3\n'
+    assert run_query('exists', '1.0.1-beta.1') == 'true\n'
+    assert run_query('exists', '1.0.1') == 'false\n'
+
+    with pytest.raises(vup.error.VupErrorQueryNeedsAVersion):
+        vup.query('exists')
+    with pytest.raises(vup.error.VupErrorNoVersionTagFound):
+        vup.query('latest', major=2)
@@ -0,0 +1,52 @@
+import os
+import json
+import yaml
+import vup.__main__
+import vup.timings
+import util
+
+# pylint: disable=invalid-name
+
+
+def test_spans_do_nothing_without_a_recording():
+    """Spans are the shared null span while nothing is recorded"""
+    assert vup.timings.span('phase') is vup.timings.NULL_SPAN
+    with vup.timings.span('phase', detail=1) as a_span:
+        a_span.end(more=2)
+
+
+def test_timings_and_trace(a_repo, capsys):
+    """
+    :param a_repo: fixture of a test repository
+    :param capsys: fixture capturing the output
+    """
+    a_repo.init(util.DEFAULT_INPUT_VERSION)
+    with open('.vup.yaml', 'w') as file_handle:
+        yaml.dump({'prehook': [{'cmd': 'exit 0', 'name': 'check'}]},
+                  file_handle)
+    trace_file = os.path.join(a_repo.dir, 'trace.json')
+    assert vup.__main__.main([
+        '--no-daemon', '--timings', '--trace-file', 'trace.json', 'bump',
+        '-f', a_repo.version_files[0], 'minor'
+    ]) == 0
+    assert vup.timings.span('phase') is vup.timings.NULL_SPAN
+
+    table = capsys.readouterr().err.split('\n')
+    assert table[0].split() == ['Phase', 'Calls', 'Seconds']
+    phases = {line.split()[0]: line.split()[1] for line in table[1:-2]}
+    assert phases['bump'] == '1'
+    assert phases['commit'] == '2'
+    assert phases['hook'] == '1'
+    assert table[-2].startswith('Peak RSS: ')
+
+    with open(trace_file) as a_file:
+        events = json.load(a_file)['traceEvents']
+    spans = {event['name']: event for event in events if event['ph'] == 'X'}
+    assert {'repo_open', 'dirty_check', 'tracked_check', 'scan', 'tag_check',
+            'commit', 'tag'} <= set(spans)
+    assert spans['hook']['args']['hook'] == 'check'
+    assert spans['hook']['args']['returncode'] == 0
+    assert spans['hook']['dur'] > 0
+    assert spans['bump']['dur'] >= spans['commit']['dur']
+    assert any(event['ph'] == 'C' and event['args']['vup'] > 0
+               for event in events)
@@ -2,6 +2,9 @@
 Contains utility functions used during testing
 """
 
+import os
+import yaml
+
 DEFAULT_INPUT_VERSION = '1.2.3-beta'
 DEFAULT_RELEASED_VERSION_MAJOR = '2.0.0'
 DEFAULT_OUTPUT_VERSION_MAJOR = '2.0.1-beta'
@@ -15,3 +18,13 @@ def append_to_file(a_file, a_str):
     """
     with open(a_file, 'a') as file_handle:
         file_handle.write(a_str)
+
+
+def write_config(config, directory='.'):
+    """
+    :param config: the settings of the config file
+    :param directory: the directory to write the config file to (Default
+        value = '.')
+    """
+    with open(os.path.join(directory, '.vup.yaml'), 'w') as file_handle:
+        yaml.dump(config, file_handle)
@@ -1,11 +1,24 @@
 import re
 import os
-import subprocess
-import git
-import semantic_version
-import yaml
+import collections
 
+from . import backends
+from . import commits
+from . import dirty
 from . import error
+from . import globs
+from . import history
+from . import hookcache
+from . import hooks
+from . import locators
+from . import plans
+from . import refs
+from . import rewrite
+from . import scanner
+from . import scans
+from . import semver
+from . import session
+from . import timings
 
 BUILD_META_DATA_REGEX = r'\+(?P<BuildMetadataTag>[\dA-Za-z-]+(\.[\dA-Za-z-]*)*)'
 
@@ -21,48 +34,81 @@ REGEX = (
     r')?'
     r'(?P<BuildMetadataTagWithSeparator>' + BUILD_META_DATA_REGEX + r')?')
 
+VERSION_PATTERN = re.compile(REGEX.encode('ascii'))
+
+MAX_LOAD_WORKERS = 16
+
+TAG_QUERIES = ('latest', 'latest-prerelease', 'next-prerelease', 'exists')
+
 
 # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-arguments
 class Config():
     """Opens and reads the YAML config file."""
 
-    def __init__(self, version_files, bump_type, prehook, posthook,
-                 is_dry_run):
+    def __init__(self,
+                 version_files,
+                 bump_type,
+                 prehook,
+                 posthook,
+                 is_dry_run,
+                 dirty_check=None,
+                 yaml_config=None):
 
         self.version_files = version_files
         self.prehook = prehook
         self.posthook = posthook
+        self.dirty_check = dirty_check
 
         self.bump_type = bump_type
         self.is_dry_run = is_dry_run
 
-        try:
-            with open('.vup.yaml') as yaml_file:
-                self.yaml_config = yaml.safe_load(yaml_file)
-
-                if not self.version_files:
-                    self.version_files = self.yaml_config.get(
-                        'version_files', [])
-                if not self.prehook:
-                    self.prehook = self.yaml_config.get('prehook', None)
-                if not self.posthook:
-                    self.posthook = self.yaml_config.get('posthook', None)
-
-        # TODO handle the case where file is empty
-        # TODO handle permission error permission
-        except FileNotFoundError:
-            pass
+        if yaml_config is None:
+            yaml_config = session.load_yaml_config()
+        self.yaml_config = yaml_config
+
+        if not self.version_files:
+            self.version_files = self.yaml_config.get('version_files', [])
+        if not self.prehook:
+            self.prehook = self.yaml_config.get('prehook', None)
+        if not self.posthook:
+            self.posthook = self.yaml_config.get('posthook', None)
+        if not self.dirty_check:
+            self.dirty_check = self.yaml_config.get(
+                'dirty_check', dirty.DEFAULT_DIRTY_CHECK_MODE)
+        self.dirty_check_paths = self.yaml_config.get('dirty_check_paths', [])
+        self.hook_jobs = self.yaml_config.get('hook_jobs', None)
+        self.hook_timeout = self.yaml_config.get('hook_timeout', None)
+        self.hook_cache = self.yaml_config.get('hook_cache', False)
+        self.pipelined_prehook = self.yaml_config.get('pipelined_prehook',
+                                                      True)
+        self.hook_cache_env = self.yaml_config.get('hook_cache_env', [])
+        self.hook_cache_size = self.yaml_config.get(
+            'hook_cache_size', hookcache.DEFAULT_MAX_ENTRIES)
+        self.packages = self.yaml_config.get('packages', {})
+        self.commit_engine = self.yaml_config.get(
+            'commit_engine', commits.DEFAULT_COMMIT_ENGINE)
+        self.update_index = self.yaml_config.get('update_index', True)
+        self.git_backend = self.yaml_config.get('git_backend',
+                                                backends.DEFAULT_BACKEND)
 
 
 # pylint: disable=too-few-public-methods
 class VersionFile():
     """Maintains the state of the version file."""
 
-    def __init__(self, filename, is_dry_run=False):
+    def __init__(self,
+                 filename,
+                 is_dry_run=False,
+                 locator=None,
+                 version_index=None):
         self.filename = filename
         self.is_dry_run = is_dry_run
+        self.locator_spec = locator
+        self.locator = locators.get_locator(locator, VERSION_PATTERN)
+        self.version_index = version_index
         self.version = None
+        self.span = None
         self._get_version()
 
     def replace_version(self, new_version):
@@ -71,24 +117,141 @@ class VersionFile():
         :param new_version: new version to update the version in the file to
 
         """
-        filedata_to_write = re.sub(
-            REGEX, str(new_version), self.filedata, count=1)
-        if not self.is_dry_run:
-            with open(self.filename, 'w') as a_file:
-                a_file.write(filedata_to_write)
-        self._get_version()
+        if self.is_dry_run:
+            return
+        replace_versions([self], new_version)
 
     def _get_version(self):
-        with open(self.filename, 'r') as a_file:
-            self.filedata = a_file.read()
-        found_versions = list(re.finditer(REGEX, self.filedata))
+        span = None
+        if self.version_index:
+            span = self.version_index.lookup(self.filename,
+                                             self.locator_spec)
+        if span:
+            found_versions = [span]
+        else:
+            found_versions = self.locator(self.filename)
         if not found_versions:
             raise error.VupErrorFileDoesNotHaveAVersionNumber(
                 'bump', self.filename)
         if len(found_versions) != 1:
             raise error.VupErrorFileContainsMultipleVersionNumbers(
                 'bump', self.filename)
-        self.version = semantic_version.Version(found_versions[0][0])
+        self.version = semver.parse(found_versions[0].text)
+        if self.version_index and not span:
+            self.version_index.update(self.filename, self.locator_spec,
+                                      found_versions[0])
+        self.span = found_versions[0]
+
+
+class Package():
+    """Version files that share a version number and a tag."""
+
+    def __init__(self, name, version_files, tag_prefix=''):
+        self.name = name
+        self.version_file_entries = [
+            split_version_file_entry(entry) for entry in version_files
+        ]
+        self.version_file_paths = [
+            a_file for a_file, _ in self.version_file_entries
+        ]
+        self.tag_prefix = tag_prefix
+        self.version_files = []
+        self.current_version = None
+        self.release_version = None
+        self.prerelease_version = None
+
+    @classmethod
+    def from_config(cls, name, package_config):
+        """Create a package from its entry in the packages of the config file
+
+        :param name: the name of the package
+        :param package_config: the mapping of the package in the config file
+
+        """
+        package_config = package_config or {}
+        return cls(name, package_config.get('version_files', []),
+                   package_config.get('tag_prefix', name + '@'))
+
+    def expand_globs(self, repo_snapshot):
+        """Replace the version files with a glob pattern by the tracked files
+        they match
+
+        :param repo_snapshot: RepoSnapshot of the repo to match the tracked
+            files of, only used when there is a pattern
+        :raises VupErrorPatternMatchesNoFiles: when a pattern matches no
+            tracked file
+
+        """
+        if not any(globs.has_magic(a_file)
+                   for a_file in self.version_file_paths):
+            return
+        self.version_file_entries = globs.expand(
+            self.version_file_entries, repo_snapshot.tracked_paths,
+            repo_snapshot.work_tree)
+        self.version_file_paths = [
+            a_file for a_file, _ in self.version_file_entries
+        ]
+
+    def get_tag_name(self, version):
+        """Return the name of the tag of a version of the package
+
+        :param version: the version to tag
+
+        """
+        return self.tag_prefix + str(version)
+
+    def replace_version(self, new_version):
+        """Replace the version in all of the version files of the package
+
+        :param new_version: new version to update the version files to
+
+        """
+        if any(version_file.is_dry_run for version_file in self.version_files):
+            return
+        replace_versions(self.version_files, new_version)
+
+
+def replace_versions(version_files, new_version):
+    """Replace the version of version files, the version files of the same
+    file are rewritten at once.
+
+    :param version_files: the VersionFile objects to update
+    :param new_version: new version to update the version files to
+
+    """
+    new_text = str(new_version)
+    files = collections.OrderedDict()
+    for version_file in version_files:
+        files.setdefault(os.path.realpath(version_file.filename),
+                         []).append(version_file)
+    for filename, file_version_files in files.items():
+        new_spans = rewrite.replace_spans(
+            filename, [(version_file.span, new_text.encode('ascii'))
+                       for version_file in file_version_files])
+        for version_file, new_span in zip(file_version_files, new_spans):
+            version_file.span = new_span
+            version_file.version = semver.parse(new_text)
+            if version_file.version_index:
+                version_file.version_index.update(
+                    version_file.filename, version_file.locator_spec,
+                    new_span)
+
+
+def split_version_file_entry(entry):
+    """Return the path and locator of an entry of the version files list.
+
+    Entries are either a path or a mapping with a 'path' and an optional
+    'locator' key.
+
+    :param entry: the version files list entry
+    :raises VupErrorInvalidLocator: when a mapping entry has no path
+
+    """
+    if isinstance(entry, dict):
+        if 'path' not in entry:
+            raise error.VupErrorInvalidLocator('bump', entry)
+        return entry['path'], entry.get('locator')
+    return entry, None
 
 
 def get_bumped_version(version, bump_type):
@@ -98,18 +261,16 @@ def get_bumped_version(version, bump_type):
     :param bump_type: The type of bump either 'major', 'minor', 'patch'
 
     """
-    bumped_version = None
     if bump_type == 'major':
         bumped_version = version.next_major()
     elif bump_type == 'minor':
         bumped_version = version.next_minor()
     elif bump_type == 'patch':
-        if not version.prerelease:
-            bumped_version = version.next_patch()
+        # the patch bump of a pre-release is the version without it
+        bumped_version = version.next_patch()
     else:
         raise error.VupErrorBumpTypeIsInvalid('bump')
-    bumped_version.prerelease = None
-    return bumped_version
+    return bumped_version.replace(prerelease=())
 
 
 def get_bumped_prerelease_version(version):
@@ -118,31 +279,93 @@ def get_bumped_prerelease_version(version):
     :param version: version to get the pre-release version of
 
     """
-    prerelease_version = version.next_patch()
-    prerelease_version.prerelease = ('beta', )
-    return prerelease_version
+    return version.next_patch().replace(prerelease=('beta', ))
 
 
-def _get_repo():
+def _get_repo(dirty_check=dirty.DEFAULT_DIRTY_CHECK_MODE,
+              version_files=(),
+              dirty_check_paths=(),
+              a_session=None):
     """Return the repo of the current directory.
 
-
+    :param dirty_check: the mode of the check for uncommited changes, one of
+        dirty.DIRTY_CHECK_MODES (Default value = 'full')
+    :param version_files: the version files, checked by the 'paths' mode
+        (Default value = ())
+    :param dirty_check_paths: extra glob patterns checked by the 'paths' mode
+        (Default value = ())
+    :param a_session: the Session to get the repo from (Default value = None)
     :raises VupErrorCurrentDirectoryIsNotAGitRepository: when the current
         directory is not a git repository
     :raises VupErrorRepositoryHasUncommitedChanges: when the repository has
         uncommited changes
 
     """
-    try:
-        repo = git.Repo('.')
-    except git.exc.InvalidGitRepositoryError:
-        raise error.VupErrorCurrentDirectoryIsNotAGitRepository('bump')
-    if repo.is_dirty():
+    repo = (a_session or session.Session()).get_repo()
+    with timings.span('dirty_check', mode=dirty_check):
+        result = dirty.check_dirty(repo, dirty_check, version_files,
+                                   dirty_check_paths)
+    if result.is_dirty:
         raise error.VupErrorRepositoryHasUncommitedChanges('bump')
     return repo
 
 
-def commit_version_changes(repo, files, old_version, new_version, is_dry_run):
+def get_version_commit_message(changes):
+    """Return the commit message for a change of versions.
+
+    :param changes: list of (package name, old version, new version) tuples,
+        the package name is None for the version files given without a package
+
+    """
+    if len(changes) == 1:
+        name, old_version, new_version = changes[0]
+        if name is None:
+            commit_message = 'Increment version from {old_version} to '
+        else:
+            commit_message = 'Increment {name} version from {old_version} to '
+        commit_message += '{new_version}'
+        return commit_message.format(
+            name=name, new_version=new_version, old_version=old_version)
+    lines = ['Increment versions of {} packages'.format(len(changes)), '']
+    for name, old_version, new_version in changes:
+        lines.append('{name}: {old_version} to {new_version}'.format(
+            name=name, old_version=old_version, new_version=new_version))
+    return '\n'.join(lines)
+
+
+def commit_changes(repo,
+                   files,
+                   commit_message,
+                   is_dry_run,
+                   commit_engine=commits.DEFAULT_COMMIT_ENGINE,
+                   backend=None):
+    """Add and commit changes to files.
+
+    :param repo: The repo to commit to
+    :param files: files to commit
+    :param commit_message: the message of the commit
+    :param is_dry_run: if this function will actually make changes or just print
+        what it would do
+    :param commit_engine: one of commits.COMMIT_ENGINES, 'objects' writes the
+        commit without the index (Default value = 'index')
+    :param backend: the git backend to commit with (Default value = None,
+        which uses GitPython)
+
+    """
+    print(commit_message)
+    if not is_dry_run:
+        files = commits.resolve_files(repo, files)
+        backend = backend or backends.GitPythonBackend(repo)
+        with timings.span('commit', files=len(files)):
+            backend.commit_files(files, commit_message, commit_engine)
+
+
+def commit_version_changes(repo,
+                           files,
+                           old_version,
+                           new_version,
+                           is_dry_run,
+                           backend=None):
     """Add and commits changes to a version file.
 
     This function assumes changes have already been made to the version file.
@@ -153,130 +376,1070 @@ def commit_version_changes(repo, files, old_version, new_version, is_dry_run):
     :param new_version: the new version after it was modified
     :param is_dry_run: if this function will actually make changes or just print
         what it would do
+    :param backend: the git backend to commit with (Default value = None)
 
     """
-    if not is_dry_run:
-        repo.index.add(files)
-    commit_message = 'Increment version from {old_version} to {new_version}'
-    commit_message = commit_message.format(
-        new_version=new_version, old_version=old_version)
-    print(commit_message)
-    if not is_dry_run:
-        repo.index.commit(commit_message)
+    commit_message = get_version_commit_message(
+        [(None, old_version, new_version)])
+    commit_changes(repo, files, commit_message, is_dry_run, backend=backend)
 
 
-def tag_version_file_change(repo, version, is_dry_run):
+def tag_version_file_change(repo,
+                            version,
+                            is_dry_run,
+                            tag_prefix='',
+                            backend=None,
+                            package_name=None):
     """
 
     :param repo: The repo to add the tag to
     :param version: the version to use as the tag name
     :param is_dry_run: if this function will actually make changes or just print
     what it would do
+    :param tag_prefix: prefix of the tag name (Default value = '')
+    :param backend: the git backend to create the tag with (Default value =
+        None, which uses GitPython)
+    :param package_name: the name of the package the version is of, it's
+        part of the tag message (Default value = None)
 
     """
-    tag_message = 'Version {version}'.format(version=version)
+    if package_name is None:
+        tag_message = 'Version {version}'
+    else:
+        tag_message = '{name} version {version}'
+    tag_message = tag_message.format(name=package_name, version=version)
     if not is_dry_run:
-        repo.create_tag(version, message=tag_message)
+        backend = backend or backends.GitPythonBackend(repo)
+        with timings.span('tag', tag=tag_prefix + str(version)):
+            backend.create_tag(tag_prefix + str(version), tag_message)
 
 
 def run_hook(cmd, is_dry_run):
     """
 
-    :param cmd: The command line command to run
+    :param cmd: The command line command to run, or a list of hooks as
+        accepted by hooks.get_hooks
     :param is_dry_run: if this function will actually make changes or just print
     what it would do
 
     """
-    print(cmd)
-    if not is_dry_run:
-        result = subprocess.run(cmd, shell=True)
-        if result.stdout:
-            print(result.stdout)
-        return result.returncode == 0
-    return True
+    return hooks.run_hook_setting(cmd, is_dry_run) is None
+
+
+def _load_version_file(a_file, locator, is_dry_run, version_index):
+    """Return the VersionFile of a file or None if the file does not exist.
+
+    :param a_file: the version file
+    :param locator: the locator string of the version file
+    :param is_dry_run: if the version file will actually be modified
+    :param version_index: the VersionIndex to use
+
+    """
+    with timings.span('scan', file=a_file):
+        if not os.path.isfile(a_file):
+            return None
+        return VersionFile(a_file, is_dry_run, locator, version_index)
+
 
+def _submit_version_files(executor, version_file_entries, is_dry_run,
+                          version_index):
+    """Start loading version files on an executor.
 
-# pylint: disable=too-many-branches
+    :param executor: the concurrent.futures executor to load the files on
+    :param version_file_entries: list of (path, locator) of the version files
+    :param is_dry_run: if the version files will actually be modified
+    :param version_index: the VersionIndex to use
+    :returns: list of futures of _load_version_file in the order of the files
+
+    """
+    return [
+        executor.submit(_load_version_file, a_file, locator, is_dry_run,
+                        version_index)
+        for a_file, locator in version_file_entries
+    ]
+
+
+def _check_version_files(repo_snapshot, version_file_paths, futures):
+    """Validate the loaded version files in order.
+
+    :param repo_snapshot: RepoSnapshot or git backend of the repo the version
+        files must be tracked in
+    :param version_file_paths: paths of the version files
+    :param futures: the futures returned by _submit_version_files
+    :returns: the list of VersionFile objects and their version
+
+    """
+    version_file_list = []
+    current_version = None
+    with timings.span('tracked_check', files=len(version_file_paths)):
+        tracked = repo_snapshot.are_tracked(version_file_paths)
+    for a_file, future, is_tracked in zip(version_file_paths, futures,
+                                          tracked):
+        if not future.exception() and future.result() is None:
+            raise error.VupErrorVersionFileDoesNotExist('bump', a_file)
+
+        if not is_tracked:
+            raise error.VupErrorFileIsNotNotUnderRevisionControl(
+                'bump', a_file)
+        version_file = future.result()
+
+        # check that all the versions match
+        if current_version:
+            if current_version != version_file.version:
+                raise error.VupErrorFilesDontHaveMatchingVersions(
+                    'bump', version_file_paths)
+        current_version = version_file.version
+        version_file_list.append(version_file)
+    return version_file_list, current_version
+
+
+def _get_executor(count):
+    """Return a thread pool to load count version files on
+
+    :param count: the number of version files
+
+    """
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+    return concurrent.futures.ThreadPoolExecutor(
+        max(1, min(MAX_LOAD_WORKERS, count)))
+
+
+def _shutdown_executor(executor, futures):
+    """Cancel the futures that haven't started and shut down the executor
+
+    :param executor: the executor to shut down
+    :param futures: the futures submitted to the executor
+
+    """
+    for future in futures:
+        future.cancel()
+    executor.shutdown()
+
+
+def load_version_files(repo_snapshot,
+                       version_file_entries,
+                       is_dry_run,
+                       version_index=None):
+    """Load and validate the version files.
+
+    The files are read on a thread pool, the checks are done in the order of
+    the version files so the error raised is the same as when the files are
+    loaded one at a time.
+
+    :param repo_snapshot: RepoSnapshot or git backend of the repo the version
+        files must be tracked in
+    :param version_file_entries: list of (path, locator) of the version files
+    :param is_dry_run: if the version files will actually be modified
+    :param version_index: the VersionIndex to use (Default value = None)
+    :returns: the list of VersionFile objects and their version
+
+    """
+    executor = _get_executor(len(version_file_entries))
+    futures = []
+    try:
+        futures = _submit_version_files(executor, version_file_entries,
+                                        is_dry_run, version_index)
+        return _check_version_files(
+            repo_snapshot, [a_file for a_file, _ in version_file_entries],
+            futures)
+    finally:
+        _shutdown_executor(executor, futures)
+
+
+def load_packages(repo_snapshot, packages, is_dry_run, version_index=None):
+    """Load and validate the version files of packages.
+
+    The version files of all the packages are read on one thread pool and
+    validated in the order of the packages.
+
+    :param repo_snapshot: RepoSnapshot or git backend of the repo the version
+        files must be tracked in
+    :param packages: the Package objects to load
+    :param is_dry_run: if the version files will actually be modified
+    :param version_index: the VersionIndex to use (Default value = None)
+
+    """
+    executor = _get_executor(
+        sum(len(package.version_file_entries) for package in packages))
+    futures = []
+    try:
+        package_futures = []
+        for package in packages:
+            package_futures.append(
+                _submit_version_files(executor, package.version_file_entries,
+                                      is_dry_run, version_index))
+            futures.extend(package_futures[-1])
+        for package, a_package_futures in zip(packages, package_futures):
+            package.version_files, package.current_version = \
+                _check_version_files(repo_snapshot,
+                                     package.version_file_paths,
+                                     a_package_futures)
+    finally:
+        _shutdown_executor(executor, futures)
+
+
+def get_packages(config, package_names=None):
+    """Return the packages to bump.
+
+    The packages named in package_names are taken from the packages in the
+    config file. When no names are given and no version files are given
+    either, all of the packages in the config file are bumped. Otherwise
+    the version files are bumped as a single package without a name.
+
+    :param config: the Config
+    :param package_names: names of the packages to bump (Default value = None)
+    :raises VupErrorPackageDoesNotExist: when a package is not in the config
+        file
+    :raises VupErrorNoVersionFilesProvided: when a package has no version
+        files
+
+    """
+    if not package_names and config.version_files:
+        packages = [Package(None, config.version_files)]
+    elif not package_names:
+        packages = [
+            Package.from_config(name, package_config)
+            for name, package_config in config.packages.items()
+        ]
+    else:
+        packages = []
+        for name in package_names:
+            if name not in config.packages:
+                raise error.VupErrorPackageDoesNotExist('bump', name)
+            packages.append(
+                Package.from_config(name, config.packages[name]))
+
+    if not packages or not all(package.version_file_entries
+                               for package in packages):
+        raise error.VupErrorNoVersionFilesProvided('bump')
+    return packages
+
+
+def _get_changes(packages, old_attribute, new_attribute):
+    """
+    :param packages: the packages that changed
+    :param old_attribute: name of the Package attribute with the old version
+    :param new_attribute: name of the Package attribute with the new version
+    """
+    return [(package.name, getattr(package, old_attribute),
+             getattr(package, new_attribute)) for package in packages]
+
+
+def _get_version_file_paths(packages):
+    """
+    :param packages: the packages to get the version file paths of
+    """
+    return [
+        a_file for package in packages for a_file in package.version_file_paths
+    ]
+
+
+def _check_repo(config, packages, a_session, do_dirty_check=True):
+    """Open the repository, expand the glob patterns of the packages and check
+    for uncommited changes.
+
+    :param config: the Config
+    :param packages: the packages to bump
+    :param a_session: the Session to get the repository state from
+    :param do_dirty_check: if the repository is checked for uncommited
+        changes (Default value = True)
+    :returns: the repository
+
+    """
+    repo_snapshot = a_session.get_snapshot()
+    with timings.span('glob_expand'):
+        for package in packages:
+            package.expand_globs(repo_snapshot)
+    if do_dirty_check:
+        return _get_repo(config.dirty_check,
+                         _get_version_file_paths(packages),
+                         config.dirty_check_paths, a_session)
+    return a_session.get_repo()
+
+
+def _load_packages(config, packages, is_dry_run, a_session):
+    """Load the version files of the packages.
+
+    :param config: the Config
+    :param packages: the packages to load
+    :param is_dry_run: if the version files will actually be modified
+    :param a_session: the Session to get the repository state from
+    :returns: the VersionIndex
+
+    """
+    with timings.span('index_load'):
+        version_index = a_session.get_version_index()
+
+    load_packages(
+        a_session.get_backend(config.git_backend), packages, is_dry_run,
+        version_index)
+    return version_index
+
+
+def _load(config, packages, is_dry_run, a_session, do_dirty_check=True):
+    """Open the repository and load the version files of the packages.
+
+    :param config: the Config
+    :param packages: the packages to load
+    :param is_dry_run: if the version files will actually be modified
+    :param a_session: the Session to get the repository state from
+    :param do_dirty_check: if the repository is checked for uncommited
+        changes (Default value = True)
+    :returns: the repository and the VersionIndex
+
+    """
+    repo = _check_repo(config, packages, a_session, do_dirty_check)
+    return repo, _load_packages(config, packages, is_dry_run, a_session)
+
+
+def _print_version(name, version):
+    """
+    :param name: the name of the package or None
+    :param version: the version to print
+    """
+    if name is None:
+        print(version)
+    else:
+        print('{name} {version}'.format(name=name, version=version))
+
+
+def _print_versions(packages, attribute):
+    """
+    :param packages: the packages to print the version of
+    :param attribute: name of the Package attribute with the version to print
+    """
+    for package in packages:
+        _print_version(package.name, getattr(package, attribute))
+
+
+def check(version_files=None,
+          dirty_check=None,
+          package_names=None,
+          a_session=None):
+    """Check that a bump would be able to start and print the versions.
+
+    Runs the same checks on the repository and the version files that bump
+    does before running the prehook.
+
+    :param version_files: The version files to check (Default value = None)
+    :param dirty_check: the mode of the check for uncommited changes (Default
+        value = None)
+    :param package_names: names of the packages from the config file to check
+        (Default value = None)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+
+    """
+    a_session = a_session or session.Session()
+    config = Config(version_files, None, None, None, True, dirty_check,
+                    a_session.get_yaml_config())
+    packages = get_packages(config, package_names)
+    _load(config, packages, True, a_session)
+    _print_versions(packages, 'current_version')
+
+
+def _get_tag_prefixes(config, package_names=None):
+    """Return the name and tag prefix of the packages to query the tags of.
+
+    Without package names these are the packages in the config file, when
+    there are none, or version files are given, the tags without a prefix
+    are queried.
+
+    :param config: the Config
+    :param package_names: names of the packages to query (Default value =
+        None)
+    :raises VupErrorPackageDoesNotExist: when a package is not in the config
+        file
+
+    """
+    if not package_names and (config.version_files or not config.packages):
+        return [(None, '')]
+    prefixes = []
+    for name in package_names or config.packages:
+        if name not in config.packages:
+            raise error.VupErrorPackageDoesNotExist('query', name)
+        package = Package.from_config(name, config.packages[name])
+        prefixes.append((name, package.tag_prefix))
+    return prefixes
+
+
+def _parse_query_version(what, version):
+    """
+    :param what: the query the version is for
+    :param version: the version string given to the query
+    :raises VupErrorQueryNeedsAVersion: when version is None
+    :raises VupErrorVersionIsInvalid: when version is not a semantic version
+    """
+    if version is None:
+        raise error.VupErrorQueryNeedsAVersion('query', what)
+    try:
+        return semver.parse(version)
+    except ValueError:
+        raise error.VupErrorVersionIsInvalid('query', version)
+
+
+def query_tags(tag_group, what, version=None, major=None, minor=None,
+               include_prereleases=False, label='beta'):
+    """Answer a query about the version tags with one prefix.
+
+    :param tag_group: the tags.TagGroup of the tag prefix
+    :param what: one of 'latest', 'latest-prerelease', 'next-prerelease' or
+        'exists'
+    :param version: the version string 'latest-prerelease',
+        'next-prerelease' and 'exists' are about (Default value = None)
+    :param major: the major line 'latest' is limited to (Default value =
+        None)
+    :param minor: the minor line of the major line 'latest' is limited to
+        (Default value = None)
+    :param include_prereleases: if 'latest' can be a pre-release (Default
+        value = False)
+    :param label: the pre-release label of 'next-prerelease' (Default value =
+        'beta')
+    :returns: a semver.Version, a bool for 'exists' or None when no tag
+        matches
+    :raises VupErrorQueryIsInvalid: when the query is not valid
+
+    """
+    if what == 'latest':
+        return tag_group.latest(major, minor, include_prereleases)
+    if what not in TAG_QUERIES:
+        raise error.VupErrorQueryIsInvalid('query', what)
+    version = _parse_query_version(what, version)
+    if what == 'latest-prerelease':
+        return tag_group.latest_prerelease(version)
+    if what == 'next-prerelease':
+        return tag_group.next_prerelease(version, label)
+    return tag_group.exists(version)
+
+
+def query(what='current',
+          version_files=None,
+          package_names=None,
+          a_session=None,
+          version=None,
+          major=None,
+          minor=None,
+          include_prereleases=False,
+          label='beta'):
+    """Print information about the versions of the repository.
+
+    :param what: the query, 'current' prints the version in the version files,
+        the others are the TAG_QUERIES answered by query_tags (Default value =
+        'current')
+    :param version_files: The version files to read (Default value = None)
+    :param package_names: names of the packages from the config file to read
+        (Default value = None)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+    :param version: the version of the tag queries that need one (Default
+        value = None)
+    :param major: see query_tags (Default value = None)
+    :param minor: see query_tags (Default value = None)
+    :param include_prereleases: see query_tags (Default value = False)
+    :param label: see query_tags (Default value = 'beta')
+    :raises VupErrorQueryIsInvalid: when the query is not valid
+    :raises VupErrorNoVersionTagFound: when no tag matches the query
+
+    """
+    if what != 'current' and what not in TAG_QUERIES:
+        raise error.VupErrorQueryIsInvalid('query', what)
+    a_session = a_session or session.Session()
+    config = Config(version_files, None, None, None, True, None,
+                    a_session.get_yaml_config())
+    if what == 'current':
+        packages = get_packages(config, package_names)
+        _load(config, packages, True, a_session, do_dirty_check=False)
+        _print_versions(packages, 'current_version')
+        return
+
+    tag_index = a_session.get_tag_index()
+    for name, tag_prefix in _get_tag_prefixes(config, package_names):
+        result = query_tags(
+            tag_index.get_group(tag_prefix), what, version, major, minor,
+            include_prereleases, label)
+        if result is None:
+            raise error.VupErrorNoVersionTagFound('query', tag_prefix)
+        if isinstance(result, bool):
+            result = 'true' if result else 'false'
+        _print_version(name, result)
+
+
+def scan(version_files=None,
+         package_names=None,
+         propose=False,
+         max_size=scans.DEFAULT_MAX_SIZE,
+         jobs=None,
+         a_session=None):
+    """Print where the current versions are in tracked files other than the
+    version files.
+
+    :param version_files: The version files to read the versions of (Default
+        value = None)
+    :param package_names: names of the packages from the config file to read
+        the versions of (Default value = None)
+    :param propose: if version file entries are printed for the files with
+        one of the versions on a single line (Default value = False)
+    :param max_size: files larger than this many bytes are skipped (Default
+        value = scans.DEFAULT_MAX_SIZE)
+    :param jobs: the number of processes to search with (Default value =
+        None, which is the number of CPUs)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+
+    """
+    a_session = a_session or session.Session()
+    config = Config(version_files, None, None, None, True, None,
+                    a_session.get_yaml_config())
+    packages = get_packages(config, package_names)
+    repo, _ = _load(config, packages, True, a_session, do_dirty_check=False)
+    repo_snapshot = a_session.get_snapshot()
+    known_paths = set(
+        repo_snapshot.get_relative_path(a_file)
+        for a_file in _get_version_file_paths(packages))
+    with timings.span('search'):
+        hits = [
+            hit for hit in scans.search(
+                repo, repo_snapshot.head_hexsha,
+                [str(package.current_version) for package in packages],
+                VERSION_PATTERN, max_size, jobs)
+            if hit.path not in known_paths
+        ]
+    for hit in hits:
+        print('{path}:{line}: {version}'.format(
+            path=_get_display_path(repo_snapshot, hit.path),
+            line=hit.line,
+            version=hit.version))
+    print('Found {count} other occurrences of the current version'.format(
+        count=len(hits)))
+    proposals = scans.propose_version_files(hits)
+    if propose and proposals:
+        import yaml  # pylint: disable=import-outside-toplevel
+        for proposal in proposals:
+            proposal['path'] = _get_display_path(repo_snapshot,
+                                                 proposal['path'])
+        print('Proposed additions to the version_files in .vup.yaml:')
+        print(
+            yaml.safe_dump({'version_files': proposals},
+                           default_flow_style=False,
+                           sort_keys=False).rstrip())
+
+
+def _get_display_path(repo_snapshot, path):
+    """Return the path of a file relative to the current directory
+
+    :param repo_snapshot: the RepoSnapshot of the repository
+    :param path: the path of the file relative to the work tree
+
+    """
+    return os.path.relpath(os.path.join(repo_snapshot.work_tree, path))
+
+
+def _get_hook_cache(config, repo, a_session):
+    """Return the HookCache for the prehook or None when it isn't used.
+
+    The cache is only used when it's enabled in the config file and the dirty
+    check covers all the tracked files, otherwise the tree of HEAD might not
+    be what the hooks run on.
+
+    :param config: the Config
+    :param repo: the repository
+    :param a_session: the Session
+
+    """
+    if (not config.hook_cache or config.is_dry_run
+            or config.dirty_check == 'paths'):
+        return None
+    head_commit = a_session.get_snapshot().head_commit
+    if head_commit is None:
+        return None
+    return hookcache.HookCache.for_repo(repo, head_commit.tree.hexsha,
+                                        config.hook_cache_env,
+                                        config.hook_cache_size)
+
+
+def _check_prehook(failed_hook):
+    """
+    :param failed_hook: the HookResult of the prehook that failed or None
+    :raises VupErrorPrehookFailed: when a prehook failed
+    """
+    if failed_hook:
+        raise error.VupErrorPrehookFailed('bump',
+                                          hooks.describe_failure(failed_hook))
+
+
+def _load_and_run_prehook(config, packages, a_session):
+    """Load the packages while the prehook runs.
+
+    The prehook starts once the repository passed the dirty check, since a
+    prehook may change tracked files or run git itself. It runs while the
+    version files are scanned and checked, when those checks fail it is
+    stopped. Neither changes any files, those are only modified after both
+    finished.
+
+    :param config: the Config
+    :param packages: the packages to load
+    :param a_session: the Session to get the repository state from
+    :returns: the repository and the VersionIndex
+    :raises VupErrorPrehookFailed: when a prehook failed
+
+    """
+    repo = _check_repo(config, packages, a_session)
+    background_hooks = hooks.BackgroundHooks(
+        config.prehook, config.is_dry_run, config.hook_jobs,
+        config.hook_timeout, _get_hook_cache(config, repo, a_session))
+    background_hooks.start()
+    try:
+        version_index = _load_packages(config, packages, config.is_dry_run,
+                                       a_session)
+        with timings.span('prehook_wait'):
+            failed_hook = background_hooks.wait()
+    except BaseException:
+        background_hooks.cancel()
+        raise
+    _check_prehook(failed_hook)
+    return repo, version_index
+
+
+def clear_cache(a_session=None):
+    """Remove the results of the hooks that passed and print how many.
+
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+
+    """
+    a_session = a_session or session.Session()
+    count = hookcache.clear(
+        hookcache.get_hook_cache_path(a_session.get_repo()))
+    print('Removed {count} cached hook results'.format(count=count))
+
+
+# pylint: disable=too-many-branches,too-many-locals
 def bump(version_files,
          bump_type='patch',
          prehook=None,
          posthook=None,
-         is_dry_run=False):
+         is_dry_run=False,
+         dirty_check=None,
+         package_names=None,
+         a_session=None):
     """
-    :param version_files: The version files to bump
-    :param bump_type: The type of bump either 'major', 'minor', 'patch' (Default
+    :param version_files: The version files to bump, either paths or mappings
+        with a 'path' and a 'locator' key
+    :param bump_type: The type of bump either 'major', 'minor', 'patch' or
+        'auto' to infer it from the commits since the last release (Default
         value = 'patch')
     :param prehook: the command to run before bumping. If this command fails the
-        bump will not be processed (Default value = None)
-    :param posthook: the command to run after bumping. (Default value = None)
+        bump will not be processed. May be a list of hooks, see
+        hooks.get_hooks (Default value = None)
+    :param posthook: the command to run after bumping, or a list of hooks.
+        (Default value = None)
     :param is_dry_run: if this function will actually make changes or just print
     what it would do (Default value = False)
+    :param dirty_check: the mode of the check for uncommited changes, one of
+        dirty.DIRTY_CHECK_MODES (Default value = None, which uses the config
+        file or 'full')
+    :param package_names: names of the packages from the config file to bump,
+        all of their version changes go in one release commit and one
+        pre-release commit (Default value = None)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
     """
 
     # TODO Validate bump_type
 
-    if not version_files:
-        raise error.VupErrorNoVersionFilesProvided('bump')
+    a_session = a_session or session.Session()
+    config = Config(version_files, bump_type, prehook, posthook, is_dry_run,
+                    dirty_check, a_session.get_yaml_config())
 
-    config = Config(version_files, bump_type, prehook, posthook, is_dry_run)
+    packages = get_packages(config, package_names)
+    if config.prehook and config.pipelined_prehook:
+        repo, version_index = _load_and_run_prehook(config, packages,
+                                                    a_session)
+    else:
+        repo, version_index = _load(config, packages, is_dry_run, a_session)
+        if config.prehook:
+            with timings.span('prehook'):
+                failed_hook = hooks.run_hook_setting(
+                    config.prehook, is_dry_run, config.hook_jobs,
+                    config.hook_timeout,
+                    _get_hook_cache(config, repo, a_session))
+            _check_prehook(failed_hook)
 
-    repo = _get_repo()
+    if not is_dry_run:
+        with timings.span('index_save'):
+            version_index.save()
+
+    if bump_type == history.AUTO:
+        bump_type = _get_auto_bump_types(repo, packages, a_session)
+    bump_plan = _make_plan(repo, packages, bump_type)
+    _apply_plan(repo, bump_plan, is_dry_run, version_index,
+                config.commit_engine, config.update_index,
+                a_session.get_backend(config.git_backend))
+    _run_posthook(config.posthook, is_dry_run, config.hook_jobs,
+                  config.hook_timeout)
+
+
+def _get_auto_bump_types(repo, packages, a_session, subcmd='bump'):
+    """Infer the bump type of each package from the conventional commit
+    messages since its latest release tag.
+
+    :param repo: the repository
+    :param packages: the packages to bump
+    :param a_session: the Session
+    :param subcmd: the subcommand for the error message (Default value =
+        'bump')
+    :returns: dict of package name to bump type
+    :raises VupErrorNoReleasableCommits: when no commit since the release of
+        a package calls for a bump
 
-    version_file_set = set()
-    current_version = None
+    """
+    head_sha = a_session.get_snapshot().head_hexsha
+    tag_index = a_session.get_tag_index()
+    history_cache = history.HistoryCache.for_repo(repo)
+    bump_types = {}
+    for package in packages:
+        latest_version = tag_index.get_group(package.tag_prefix).latest()
+        tag_name = (package.get_tag_name(latest_version)
+                    if latest_version else None)
+        history_span = timings.span('history', tag=tag_name)
+        bump_type, count = None, 0
+        if head_sha is not None:
+            tag_sha = (history.get_commit_sha(repo.git_dir,
+                                              'refs/tags/' + tag_name)
+                       if tag_name else None)
+            bump_type, count = history_cache.get_bump_type(
+                repo.git_dir, head_sha, tag_sha)
+        history_span.end(commits=count, bump_type=bump_type)
+        if bump_type is None:
+            raise error.VupErrorNoReleasableCommits(subcmd, tag_name)
+        _print_version(package.name, '{bump_type} bump since {since}'.format(
+            bump_type=bump_type,
+            since=tag_name if tag_name else 'the first commit'))
+        bump_types[package.name] = bump_type
+    history_cache.save()
+    return bump_types
+
+
+def _run_posthook(posthook, is_dry_run, hook_jobs, hook_timeout):
+    """
+    :param posthook: the posthook setting
+    :param is_dry_run: only print the commands
+    :param hook_jobs: the maximum number of hooks running at once
+    :param hook_timeout: the timeout of the hooks that don't have one
+    :raises VupErrorPosthookFailed: when a posthook failed
+    """
+    if posthook:
+        with timings.span('posthook'):
+            failed_hook = hooks.run_hook_setting(posthook, is_dry_run,
+                                                 hook_jobs, hook_timeout)
+        if failed_hook:
+            raise error.VupErrorPosthookFailed(
+                'bump', hooks.describe_failure(failed_hook))
 
-    for a_file in config.version_files:
-        if not os.path.isfile(a_file):
-            raise error.VupErrorVersionFileDoesNotExist('bump', a_file)
 
-        if not is_file_in_repo(repo, os.path.abspath(a_file)):
-            raise error.VupErrorFileIsNotNotUnderRevisionControl(
-                'bump', a_file)
-        version_file = VersionFile(a_file, is_dry_run)
+def _check_tags(repo, tag_names, subcmd='bump'):
+    """
+    :param repo: the repository
+    :param tag_names: the names of the tags that will be created
+    :param subcmd: the subcommand for the error message (Default value =
+        'bump')
+    :raises VupErrorVersionTagAlreadyExists: when one of the tags exists
+    """
+    for tag_name in tag_names:
+        if refs.tag_exists(repo.git_dir, tag_name):
+            raise error.VupErrorVersionTagAlreadyExists(subcmd, tag_name)
 
-        # check that all the versions match
-        if current_version:
-            if current_version != version_file.version:
-                raise error.VupErrorFilesDontHaveMatchingVersions(
-                    'bump', config.version_files)
-        current_version = version_file.version
-        version_file_set.add(version_file)
 
-    if config.prehook:
-        if not run_hook(config.prehook, is_dry_run):
-            raise error.VupErrorPrehookFailed('bump', config.prehook)
+def _get_work_tree_path(work_tree, a_file):
+    """Return the path of a file relative to the work tree separated by /
+
+    :param work_tree: the work tree of the repository
+    :param a_file: path to the file
+
+    """
+    relative_file = os.path.relpath(os.path.abspath(a_file), work_tree)
+    return relative_file.replace(os.path.sep, '/')
+
+
+def _make_plan(repo, packages, bump_type, repo_state=None,
+               hook_settings=None):
+    """Compute the versions of loaded packages and return the plan to bump
+    them.
+
+    :param repo: the repository
+    :param packages: the packages with their version files loaded
+    :param bump_type: The type of bump either 'major', 'minor', 'patch', or a
+        dict of package name to bump type
+    :param repo_state: see plan.get_repo_state (Default value = None)
+    :param hook_settings: the hooks to run when the plan is applied (Default
+        value = None)
+    :raises VupErrorVersionTagAlreadyExists: when the tag of a release version
+        already exists
+
+    """
+    work_tree = repo.working_tree_dir
+    package_plans = []
+    for package in packages:
+        package.release_version = get_bumped_version(
+            package.current_version,
+            bump_type[package.name] if isinstance(bump_type, dict) else
+            bump_type)
+        package.prerelease_version = get_bumped_prerelease_version(
+            package.release_version)
+        with timings.span('tag_check'):
+            _check_tags(repo,
+                        [package.get_tag_name(package.release_version)])
+        package_plans.append(
+            plans.PackagePlan(
+                package.name, package.tag_prefix,
+                str(package.current_version), str(package.release_version),
+                str(package.prerelease_version), [
+                    plans.FileEdit(
+                        _get_work_tree_path(work_tree, version_file.filename),
+                        version_file.locator_spec, version_file.span.start,
+                        version_file.span.end,
+                        os.path.getsize(version_file.filename),
+                        version_file.span.text, None)
+                    for version_file in package.version_files
+                ]))
+    return plans.Plan(
+        package_plans,
+        get_version_commit_message(
+            _get_changes(packages, 'current_version', 'release_version')),
+        get_version_commit_message(
+            _get_changes(packages, 'release_version', 'prerelease_version')),
+        repo_state, hook_settings)
+
+
+def _replace_plan_versions(work_tree, a_plan, old_attribute, new_attribute,
+                           version_index):
+    """Replace one version of each package of a plan with another
+
+    :param work_tree: the work tree of the repository
+    :param a_plan: the plan.Plan
+    :param old_attribute: the PackagePlan attribute of the version in the
+        files, current_version is at the position of the FileEdit and the
+        others start there
+    :param new_attribute: the PackagePlan attribute of the version to write
+    :param version_index: the VersionIndex to update or None
 
-    release_version = get_bumped_version(current_version, bump_type)
-    prerelease_version = get_bumped_prerelease_version(release_version)
+    """
+    # the edits of each file, also of symlinks to it, are made at once, the
+    # offsets of the plan are those of the current versions
+    files = collections.OrderedDict()
+    for package in a_plan.packages:
+        for edit in package.files:
+            filename = os.path.join(work_tree, edit.path)
+            files.setdefault(os.path.realpath(filename), []).append(
+                (filename, edit, getattr(package, old_attribute),
+                 getattr(package, new_attribute)))
+    for real_filename, edits in files.items():
+        shifts = {}
+        shift = 0
+        for _, edit, old_text, _ in sorted(edits,
+                                           key=lambda item: item[1].start):
+            if edit.start not in shifts:
+                shifts[edit.start] = shift
+                shift += len(old_text) - len(edit.version)
+        new_spans = rewrite.replace_spans(real_filename, [
+            (scanner.VersionMatch(edit.start + shifts[edit.start],
+                                  edit.start + shifts[edit.start]
+                                  + len(old_text), old_text),
+             new_text.encode('ascii'))
+            for _, edit, old_text, new_text in edits
+        ])
+        if version_index:
+            for (filename, edit, _, _), new_span in zip(edits, new_spans):
+                version_index.update(filename, edit.locator, new_span)
+
+
+def _apply_plan(repo,
+                a_plan,
+                is_dry_run,
+                version_index=None,
+                commit_engine=commits.DEFAULT_COMMIT_ENGINE,
+                update_index=True,
+                backend=None):
+    """Commit and tag the release version of a plan and commit its
+    pre-release version.
+
+    :param repo: the repository
+    :param a_plan: the plan.Plan
+    :param is_dry_run: if this function will actually make changes or just
+        print what it would do
+    :param version_index: the VersionIndex to update (Default value = None)
+    :param commit_engine: see commit_changes (Default value = 'index')
+    :param update_index: if the index entries of the version files are
+        refreshed after committing without the index (Default value = True)
+    :param backend: the git backend to commit and tag with (Default value =
+        None, which uses GitPython)
+    :raises VupErrorCommitEngineIsInvalid: when the commit engine is not valid
 
-    if str(release_version) in repo.tags:
-        raise error.VupErrorVersionTagAlreadyExists('bump',
-                                                    str(release_version))
+    """
+    if commit_engine not in commits.COMMIT_ENGINES:
+        raise error.VupErrorCommitEngineIsInvalid('bump', commit_engine)
+    backend = backend or backends.GitPythonBackend(repo)
+    try:
+        _commit_plan(repo, a_plan, is_dry_run, version_index, commit_engine,
+                     backend)
+    except BaseException:
+        backend.abort()
+        raise
+    if not is_dry_run:
+        with timings.span('ref_update'):
+            backend.finish()
+        if update_index and not backend.uses_index(commit_engine):
+            with timings.span('index_update'):
+                commits.update_index(
+                    repo,
+                    commits.resolve_files(repo, [
+                        os.path.join(repo.working_tree_dir, path)
+                        for path in a_plan.file_paths
+                    ]))
+
+
+def _commit_plan(repo, a_plan, is_dry_run, version_index, commit_engine,
+                 backend):
+    """Make the commits and tags of a plan with a backend
+
+    :param repo: the repository
+    :param a_plan: the plan.Plan
+    :param is_dry_run: if this function will actually make changes or just
+        print what it would do
+    :param version_index: the VersionIndex to update or None
+    :param commit_engine: see commit_changes
+    :param backend: the git backend to commit and tag with
 
-    for a_file in version_file_set:
-        a_file.replace_version(release_version)
-    commit_version_changes(repo, config.version_files, current_version,
-                           release_version, is_dry_run)
-    tag_version_file_change(repo, release_version, is_dry_run)
+    """
+    work_tree = repo.working_tree_dir
+    file_paths = [os.path.join(work_tree, path) for path in a_plan.file_paths]
+    if not is_dry_run:
+        with timings.span('write', version='release'):
+            _replace_plan_versions(work_tree, a_plan, 'current_version',
+                                   'release_version', version_index)
+    commit_changes(repo, file_paths, a_plan.release_commit_message,
+                   is_dry_run, commit_engine, backend)
+    for package in a_plan.packages:
+        tag_version_file_change(repo, package.release_version, is_dry_run,
+                                package.tag_prefix, backend, package.name)
 
-    for a_file in version_file_set:
-        a_file.replace_version(prerelease_version)
-    commit_version_changes(repo, config.version_files, release_version,
-                           prerelease_version, is_dry_run)
-    if config.posthook:
-        if not run_hook(config.posthook, is_dry_run):
-            raise error.VupErrorPosthookFailed('bump', config.posthook)
+    if not is_dry_run:
+        with timings.span('write', version='prerelease'):
+            _replace_plan_versions(work_tree, a_plan, 'release_version',
+                                   'prerelease_version', version_index)
+        with timings.span('sync'):
+            rewrite.sync_files(file_paths)
+        if version_index:
+            with timings.span('index_save'):
+                version_index.save()
+    commit_changes(repo, file_paths, a_plan.prerelease_commit_message,
+                   is_dry_run, commit_engine, backend)
+
+
+def plan(bump_type,
+         output,
+         version_files=None,
+         prehook=None,
+         posthook=None,
+         dirty_check=None,
+         package_names=None,
+         a_session=None):
+    """Compute a bump without changing anything and write it as JSON.
+
+    :param bump_type: The type of bump either 'major', 'minor', 'patch' or
+        'auto'
+    :param output: the file to write the plan to
+    :param version_files: The version files to bump (Default value = None)
+    :param prehook: the command to run before the plan is applied (Default
+        value = None)
+    :param posthook: the command to run after the plan is applied (Default
+        value = None)
+    :param dirty_check: the mode of the check for uncommited changes (Default
+        value = None)
+    :param package_names: names of the packages from the config file to bump
+        (Default value = None)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+    :returns: the plan.Plan
 
+    """
+    a_session = a_session or session.Session()
+    config = Config(version_files, bump_type, prehook, posthook, True,
+                    dirty_check, a_session.get_yaml_config())
+    packages = get_packages(config, package_names)
+    repo, version_index = _load(config, packages, True, a_session)
+    version_index.save()
+    if bump_type == history.AUTO:
+        bump_type = _get_auto_bump_types(repo, packages, a_session, 'plan')
+    a_plan = _make_plan(
+        repo, packages, bump_type, plans.get_repo_state(repo), {
+            'prehook': config.prehook,
+            'posthook': config.posthook,
+            'hook_jobs': config.hook_jobs,
+            'hook_timeout': config.hook_timeout,
+        })
+    a_plan.record_hashes(repo.working_tree_dir)
+    a_plan.save(output)
+    print(a_plan.release_commit_message)
+    print('Wrote the plan to {output}'.format(output=output))
+    return a_plan
+
+
+def apply(plan_file, is_dry_run=False, a_session=None):
+    """Apply a plan written by plan.
+
+    Only the SHAs recorded in the plan and the hashes of the contents of the
+    version files are checked, the version files aren't searched again.
+
+    :param plan_file: the JSON file of the plan
+    :param is_dry_run: if this function will actually make changes or just
+        print what it would do (Default value = False)
+    :param a_session: the Session to reuse the repository state of (Default
+        value = None)
+    :raises VupErrorPlanIsInvalid: when the file is not a plan
+    :raises VupErrorPlanIsStale: when the repository changed since the plan
+        was made
 
-def is_file_in_repo(repo, a_file):
+    """
+    a_session = a_session or session.Session()
+    a_plan = plans.Plan.load(plan_file)
+    repo = a_session.get_repo()
+    a_plan.check(repo)
+    hook_settings = a_plan.hook_settings
+    if hook_settings.get('prehook'):
+        _check_prehook(
+            hooks.run_hook_setting(hook_settings['prehook'], is_dry_run,
+                                   hook_settings.get('hook_jobs'),
+                                   hook_settings.get('hook_timeout')))
+    _check_tags(repo, a_plan.tag_names, 'apply')
+    yaml_config = a_session.get_yaml_config()
+    _apply_plan(
+        repo, a_plan, is_dry_run, a_session.get_version_index(),
+        yaml_config.get('commit_engine', commits.DEFAULT_COMMIT_ENGINE),
+        yaml_config.get('update_index', True),
+        a_session.get_backend(
+            yaml_config.get('git_backend', backends.DEFAULT_BACKEND)))
+    _run_posthook(hook_settings.get('posthook'), is_dry_run,
+                  hook_settings.get('hook_jobs'),
+                  hook_settings.get('hook_timeout'))
+
+
+def is_file_in_repo(repo, a_file, backend=None):
     """Check if a file is in a repo
 
+    To check more than one file use snapshot.RepoSnapshot which lists the
+    tracked files once, or the are_tracked method of a git backend.
+
     :param repo: The repo to use in the check
     :param a_file: the file to check
+    :param backend: the git backend to check with (Default value = None,
+        which walks the trees of HEAD with GitPython)
     :returns: True if file is found in the repo at the specified path, False
         otherwise
 
     """
+    if backend is not None:
+        return backend.is_tracked(a_file)
     relative_file = os.path.relpath(a_file, repo.working_tree_dir)
 
     pathdir = os.path.dirname(relative_file)
@@ -6,8 +6,12 @@ The entry point when called as a module
 import sys
 import argparse
 from . import version
-from . import bump
+from . import dirty
 from . import error
+from . import scans
+
+SUBCMDS = ('bump', 'check', 'query', 'plan', 'apply', 'cache', 'scan',
+           'serve')
 
 
 def create_parser():
@@ -25,38 +29,203 @@ def create_parser():
         action='store_true',
         help='show what would be done without doing it')
 
+    parser.add_argument(
+        '--no-daemon',
+        dest='no_daemon',
+        action='store_true',
+        help="run in this process even when a daemon is running")
+
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='print how long each phase of the subcommand took')
+
+    parser.add_argument(
+        '--trace-file',
+        help='write the phases as a Chrome trace to this file')
+
     sub_parsers = parser.add_subparsers(dest="subcmd")
 
     bump_parser = sub_parsers.add_parser('bump')
+    add_version_file_arguments(bump_parser)
     bump_parser.add_argument(
-        '--version-file',
-        '-f',
-        action='append',
-        dest='version_files',
-        help='file containing version number')
-    bump_parser.add_argument('type', help='major, minor, or patch')
+        'type', help='major, minor, patch, or auto to infer it from the '
+        'conventional commits since the last release')
     bump_parser.add_argument(
         '--prehook', help='script to run before bumping version')
     bump_parser.add_argument(
         '--posthook', help='script to run after bumping version')
+    add_dirty_check_argument(bump_parser)
+
+    check_parser = sub_parsers.add_parser(
+        'check', help='check that the version files can be bumped')
+    add_version_file_arguments(check_parser)
+    add_dirty_check_argument(check_parser)
+
+    query_parser = sub_parsers.add_parser(
+        'query', help='print information about the versions')
+    add_version_file_arguments(query_parser)
+    query_parser.add_argument(
+        'what',
+        nargs='?',
+        default='current',
+        choices=[
+            'current', 'latest', 'latest-prerelease', 'next-prerelease',
+            'exists'
+        ],
+        help=('current: the version in the version files, '
+              'latest: the highest version tag, '
+              'latest-prerelease: the highest pre-release tag of VERSION, '
+              'next-prerelease: the next free numbered pre-release of '
+              'VERSION, exists: if VERSION has a tag'))
+    query_parser.add_argument(
+        'version', nargs='?', help='the version the query is about')
+    query_parser.add_argument(
+        '--major', type=int, help='limit latest to a major line')
+    query_parser.add_argument(
+        '--minor', type=int, help='limit latest to a minor line of --major')
+    query_parser.add_argument(
+        '--prereleases',
+        dest='include_prereleases',
+        action='store_true',
+        help='let latest be a pre-release')
+    query_parser.add_argument(
+        '--label',
+        default='beta',
+        help='the pre-release label of next-prerelease')
+
+    plan_parser = sub_parsers.add_parser(
+        'plan', help='compute a bump and write it as JSON to apply later')
+    add_version_file_arguments(plan_parser)
+    plan_parser.add_argument(
+        'type', help='major, minor, patch, or auto to infer it from the '
+        'conventional commits since the last release')
+    plan_parser.add_argument(
+        '--prehook', help='script to run before applying the plan')
+    plan_parser.add_argument(
+        '--posthook', help='script to run after applying the plan')
+    add_dirty_check_argument(plan_parser)
+    plan_parser.add_argument(
+        '--output',
+        '-o',
+        default='vup-plan.json',
+        help='file to write the plan to (default: vup-plan.json)')
+
+    apply_parser = sub_parsers.add_parser(
+        'apply', help='bump as planned by vup plan')
+    apply_parser.add_argument('plan_file', help='the JSON file of the plan')
+
+    cache_parser = sub_parsers.add_parser(
+        'cache', help='manage the results of the hooks that passed')
+    cache_parser.add_argument(
+        'action',
+        choices=['clear'],
+        help='clear: forget all the hooks that passed')
+
+    scan_parser = sub_parsers.add_parser(
+        'scan', help='find the current version in other tracked files')
+    add_version_file_arguments(scan_parser)
+    scan_parser.add_argument(
+        '--propose',
+        action='store_true',
+        help='print version_files entries for the files that were found')
+    scan_parser.add_argument(
+        '--max-size',
+        type=int,
+        default=scans.DEFAULT_MAX_SIZE,
+        help='skip files larger than this many bytes (default: 1 MiB)')
+    scan_parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        help='number of processes to search with (default: one per CPU)')
+
+    sub_parsers.add_parser(
+        'serve', help='keep the repository loaded and serve requests')
     return parser
 
 
-SUBCMD_MAP = {
-    'bump': bump,
-}
-PARSER = create_parser()
-ARGS = PARSER.parse_args()
+def add_version_file_arguments(parser):
+    """Add the arguments selecting the version files to a subcommand
+
+    :param parser: the parser of the subcommand
+
+    """
+    parser.add_argument(
+        '--version-file',
+        '-f',
+        action='append',
+        dest='version_files',
+        help=('file containing version number or a glob pattern matching '
+              'tracked files, may be repeated'))
+    parser.add_argument(
+        '--package',
+        '-p',
+        action='append',
+        dest='package_names',
+        help='package from the config file, may be repeated')
+
+
+def add_dirty_check_argument(parser):
+    """Add the dirty check mode argument to a subcommand
+
+    :param parser: the parser of the subcommand
+
+    """
+    parser.add_argument(
+        '--dirty-check',
+        choices=dirty.DIRTY_CHECK_MODES,
+        help='how to check the repository for uncommited changes')
 
-if ARGS.subcmd in SUBCMD_MAP:
+
+def run_subcmd(args):
+    """Run the subcommand of the parsed arguments
+
+    Subcommands are forwarded to the daemon when one is running.
+
+    :param args: the parsed command line arguments
+    :returns: the exit code
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from . import server
+    if args.subcmd == 'serve':
+        server.serve()
+        return 0
+
+    options = vars(args)
+    if not args.no_daemon:
+        response = server.send_request(args.subcmd, options)
+        if response is not None:
+            sys.stdout.write(response['stdout'])
+            sys.stderr.write(response['stderr'])
+            return response['exit_code']
+
+    from . import commands
+    commands.run(args.subcmd, options)
+    return 0
+
+
+def main(argv=None):
+    """The command line entry point
+
+    :param argv: the command line arguments (Default value = None, which uses
+        sys.argv)
+    :returns: the exit code
+
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if args.subcmd not in SUBCMDS:
+        parser.print_help()
+        return 1
     try:
-        SUBCMD = SUBCMD_MAP[ARGS.subcmd]
-        SUBCMD(ARGS.version_files, ARGS.type, ARGS.prehook, ARGS.posthook,
-               ARGS.is_dry_run)
+        return run_subcmd(args)
     except error.VupError as err:
         print(err, file=sys.stderr)
-        sys.exit(1)
+        return 1
+
 
-else:
-    PARSER.print_help()
-    sys.exit(1)
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,448 @@
+"""
+The ways vup reads from and writes to a git repository.
+
+A backend checks if files are tracked in HEAD, commits files and creates the
+annotated tags of a bump. The changes to the references are only final once
+finish is called, abort undoes what hasn't been finished yet.
+
+The gitpython backend goes through GitPython, which starts a git process or
+parses the repository files in Python for most operations.
+
+The batch backend keeps one ``git cat-file --batch-check`` and one ``git
+cat-file --batch`` process running for as long as it is used and sends them
+one line per object, so looking up a path or reading a tree doesn't start a
+process. Commits and tags are written to the object database directly, the
+references are updated by a single ``git update-ref --stdin`` process that
+gets the tags as they are created and the move of HEAD when the bump is
+finished. The whole bump is applied as one transaction, either all the
+references change or none do. Commits are always made without the index.
+"""
+
+import io
+import os
+import time
+import binascii
+import subprocess
+
+from . import commits
+from . import error
+from . import snapshot
+
+BACKENDS = ('gitpython', 'batch')
+DEFAULT_BACKEND = 'gitpython'
+REFLOG_MESSAGE = 'vup bump'
+# objects queried before the answers are read, so neither pipe fills up
+MAX_PENDING_QUERIES = 256
+MAX_CACHED_TREES = 4096
+
+
+def get_backend(name, repo, subcmd='bump'):
+    """Return a new backend
+
+    :param name: one of BACKENDS
+    :param repo: the repository
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :raises VupErrorGitBackendIsInvalid: when the name is not a backend
+
+    """
+    if name == 'gitpython':
+        return GitPythonBackend(repo)
+    if name == 'batch':
+        return BatchBackend(repo, subcmd)
+    raise error.VupErrorGitBackendIsInvalid(subcmd, name)
+
+
+class GitPythonBackend():
+    """Git access through GitPython.
+
+    :param repo: the repository
+    :param repo_snapshot: the RepoSnapshot to check for tracked files with
+        (Default value = None, which creates one)
+
+    """
+
+    def __init__(self, repo, repo_snapshot=None):
+        self.repo = repo
+        self.repo_snapshot = repo_snapshot
+
+    def is_tracked(self, a_file):
+        """Check if a file is in the HEAD commit
+
+        :param a_file: path to the file
+
+        """
+        return self.are_tracked([a_file])[0]
+
+    def are_tracked(self, files):
+        """Check if each of the files is in the HEAD commit
+
+        :param files: paths to the files
+        :returns: list of booleans in the order of the files
+
+        """
+        if self.repo_snapshot is None:
+            self.repo_snapshot = snapshot.RepoSnapshot(self.repo)
+        return self.repo_snapshot.are_tracked(files)
+
+    @staticmethod
+    def uses_index(commit_engine):
+        """Check if commits update the index
+
+        :param commit_engine: one of commits.COMMIT_ENGINES
+
+        """
+        return commit_engine == 'index'
+
+    def commit_files(self, files, commit_message, commit_engine):
+        """Commit the current contents of files on top of HEAD
+
+        :param files: paths to the files to commit
+        :param commit_message: the message of the commit
+        :param commit_engine: one of commits.COMMIT_ENGINES
+
+        """
+        if commit_engine == 'objects':
+            commits.commit_files(self.repo, files, commit_message)
+        else:
+            self.repo.index.add(files)
+            self.repo.index.commit(commit_message)
+
+    def create_tag(self, name, message):
+        """Create an annotated tag of HEAD
+
+        :param name: the name of the tag
+        :param message: the message of the tag
+
+        """
+        self.repo.create_tag(name, message=message)
+
+    def finish(self):
+        """Make the changes final, they already are."""
+
+    def abort(self):
+        """Stop making changes, the ones made so far are kept."""
+
+
+def _start(repo, args, stderr=subprocess.DEVNULL):
+    """Start a git process reading from and writing to pipes
+
+    :param repo: the repository to run git in
+    :param args: the arguments of git
+    :param stderr: where the errors of git go (Default value =
+        subprocess.DEVNULL)
+
+    """
+    return subprocess.Popen(['git'] + list(args),
+                            cwd=repo.working_tree_dir or repo.git_dir,
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE,
+                            stderr=stderr)
+
+
+def _get_signature(config_reader, role):
+    """Return the identity and time of an author or committer as written in
+    commits and tags, the same way GitPython does.
+
+    :param config_reader: the config reader of the repository
+    :param role: 'author' or 'committer'
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from git.util import Actor
+    from git.objects.util import altz_to_utctz_str, parse_date
+    actor = getattr(Actor, role)(config_reader)
+    date = os.environ.get('GIT_{role}_DATE'.format(role=role.upper()))
+    if date:
+        timestamp, offset = parse_date(date)
+    else:
+        timestamp = int(time.time())
+        is_dst = time.daylight and time.localtime().tm_isdst > 0
+        offset = time.altzone if is_dst else time.timezone
+    return '{name} <{email}> {timestamp} {timezone}'.format(
+        name=actor.name,
+        email=actor.email,
+        timestamp=timestamp,
+        timezone=altz_to_utctz_str(offset))
+
+
+def _parse_info(line):
+    """Return the SHA, type and size of an object info line of cat-file
+
+    :param line: the line, either <sha> <type> <size> or <name> missing
+    :returns: (hexsha, type, size) or None when the object doesn't exist
+
+    """
+    line = line.rstrip(b'\n')
+    if not line or line.endswith((b' missing', b' ambiguous')):
+        return None
+    hexsha, type_name, size = line.split(b' ')
+    return hexsha.decode('ascii'), type_name.decode('ascii'), int(size)
+
+
+class BatchBackend():
+    """Git access through long running git processes.
+
+    :param repo: the repository
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+
+    """
+
+    def __init__(self, repo, subcmd='bump'):
+        self.repo = repo
+        self.subcmd = subcmd
+        self._batch_check = None
+        self._batch = None
+        self._transaction = None
+        # the commit HEAD pointed to and the one it will point to on finish
+        self._head_update = None
+        # binary SHA of a tree to a dict of its names to (mode, binary SHA)
+        self._trees = {}
+
+    def _get_process(self, attribute, *args):
+        process = getattr(self, attribute)
+        if process is None or process.poll() is not None:
+            process = _start(self.repo, args)
+            setattr(self, attribute, process)
+        return process
+
+    def get_object_info(self, names):
+        """Return the SHA, type and size of objects
+
+        :param names: names of the objects, e.g. a SHA or <commit>:<path>
+        :returns: list of (hexsha, type, size) or None for objects that don't
+            exist, in the order of the names
+
+        """
+        process = self._get_process('_batch_check', 'cat-file',
+                                    '--batch-check')
+        infos = []
+        for start in range(0, len(names), MAX_PENDING_QUERIES):
+            chunk = names[start:start + MAX_PENDING_QUERIES]
+            process.stdin.write(b''.join(
+                name.encode('utf-8') + b'\n' for name in chunk))
+            process.stdin.flush()
+            for _ in chunk:
+                infos.append(_parse_info(process.stdout.readline()))
+        return infos
+
+    def read_object(self, name):
+        """Return the SHA, type and contents of an object
+
+        :param name: the name of the object
+        :raises KeyError: when the object doesn't exist
+
+        """
+        process = self._get_process('_batch', 'cat-file', '--batch')
+        process.stdin.write(name.encode('utf-8') + b'\n')
+        process.stdin.flush()
+        info = _parse_info(process.stdout.readline())
+        if info is None:
+            raise KeyError(name)
+        data = process.stdout.read(info[2] + 1)[:-1]
+        return info[0], info[1], data
+
+    def _read_data(self, binsha):
+        return self.read_object(binascii.hexlify(binsha).decode('ascii'))[2]
+
+    def _get_tree(self, binsha):
+        """Return the entries of a tree by name, trees are cached by SHA
+
+        :param binsha: the binary SHA of the tree
+
+        """
+        entries = self._trees.get(binsha)
+        if entries is None:
+            if len(self._trees) >= MAX_CACHED_TREES:
+                self._trees.clear()
+            entries = {
+                name: (mode, entry_binsha)
+                for mode, name, entry_binsha in commits.parse_tree(
+                    self._read_data(binsha))
+            }
+            self._trees[binsha] = entries
+        return entries
+
+    def _is_in_tree(self, tree_binsha, parts):
+        """Check if a file is in a tree
+
+        :param tree_binsha: the binary SHA of the tree
+        :param parts: the path of the file as returned by
+            commits.get_path_parts
+
+        """
+        for part in parts[:-1]:
+            mode, tree_binsha = self._get_tree(tree_binsha).get(
+                part, (None, None))
+            if mode != commits.TREE_MODE:
+                return False
+        mode, _ = self._get_tree(tree_binsha).get(parts[-1], (None, None))
+        return mode is not None and mode != commits.TREE_MODE
+
+    def get_head(self):
+        """Return the SHA of the commit HEAD points to or will point to on
+        finish, None when there are no commits."""
+        if self._head_update is not None:
+            return self._head_update[1]
+        info = self.get_object_info(['HEAD'])[0]
+        return info[0] if info else None
+
+    def is_tracked(self, a_file):
+        """Check if a file is in the HEAD commit
+
+        :param a_file: path to the file
+
+        """
+        return self.are_tracked([a_file])[0]
+
+    def are_tracked(self, files):
+        """Check if each of the files is in the HEAD commit
+
+        The trees along the paths of the files are read through cat-file, a
+        tree is only read once for all the files in it.
+
+        :param files: paths to the files
+        :returns: list of booleans in the order of the files
+
+        """
+        head = self.get_head()
+        if head is None:
+            return [False for _ in files]
+        tree_binsha = binascii.unhexlify(
+            self.get_object_info([head + '^{tree}'])[0][0])
+        return [
+            self._is_in_tree(tree_binsha,
+                             commits.get_path_parts(self.repo, a_file))
+            for a_file in files
+        ]
+
+    @staticmethod
+    def uses_index(commit_engine):  # pylint: disable=unused-argument
+        """Check if commits update the index
+
+        :param commit_engine: one of commits.COMMIT_ENGINES
+
+        """
+        return False
+
+    def commit_files(self, files, commit_message, commit_engine=None):
+        """Commit the current contents of files on top of HEAD, HEAD is moved
+        on finish.
+
+        :param files: paths to the files to commit, they have to be in HEAD
+        :param commit_message: the message of the commit
+        :param commit_engine: ignored, the index is never used (Default value
+            = None)
+        :returns: the SHA of the new commit
+
+        """
+        # pylint: disable=unused-argument
+        parent_hexsha = self.get_head()
+        tree_hexsha = self.get_object_info([parent_hexsha + '^{tree}'])[0][0]
+        blobs = {
+            commits.get_path_parts(self.repo, a_file):
+            commits.hash_file(self.repo, a_file)
+            for a_file in files
+        }
+        tree_binsha = commits.replace_blobs(
+            self.repo,
+            binascii.unhexlify(tree_hexsha),
+            blobs,
+            self.subcmd,
+            read_data=self._read_data)
+        config_reader = self.repo.config_reader()
+        data = ('tree {tree}\nparent {parent}\nauthor {author}\n'
+                'committer {committer}\n\n{message}').format(
+                    tree=binascii.hexlify(tree_binsha).decode('ascii'),
+                    parent=parent_hexsha,
+                    author=_get_signature(config_reader, 'author'),
+                    committer=_get_signature(config_reader, 'committer'),
+                    message=commit_message).encode('utf-8')
+        commit_hexsha = binascii.hexlify(
+            commits.write_object(self.repo, b'commit', io.BytesIO(data),
+                                 len(data))).decode('ascii')
+        old_hexsha = parent_hexsha
+        if self._head_update is not None:
+            old_hexsha = self._head_update[0]
+        self._head_update = (old_hexsha, commit_hexsha)
+        return commit_hexsha
+
+    def _update_refs(self, line):
+        """Add a command to the update-ref transaction
+
+        :param line: the update-ref --stdin command
+
+        """
+        if self._transaction is None:
+            self._transaction = _start(
+                self.repo, ['update-ref', '-m', REFLOG_MESSAGE, '--stdin'],
+                subprocess.PIPE)
+        try:
+            self._transaction.stdin.write(line.encode('utf-8') + b'\n')
+            self._transaction.stdin.flush()
+        except BrokenPipeError:  # occurs when update-ref rejected a command
+            pass  # finish reports why
+
+    def create_tag(self, name, message):
+        """Create an annotated tag of HEAD, the tag is created on finish
+
+        :param name: the name of the tag
+        :param message: the message of the tag
+
+        """
+        data = ('object {object}\ntype commit\ntag {name}\n'
+                'tagger {tagger}\n\n{message}\n').format(
+                    object=self.get_head(),
+                    name=name,
+                    tagger=_get_signature(self.repo.config_reader(),
+                                          'committer'),
+                    message=message).encode('utf-8')
+        tag_binsha = commits.write_object(self.repo, b'tag', io.BytesIO(data),
+                                          len(data))
+        self._update_refs('create refs/tags/{name} {sha}'.format(
+            name=name, sha=binascii.hexlify(tag_binsha).decode('ascii')))
+
+    def finish(self):
+        """Move HEAD and create the tags in one transaction
+
+        :raises VupErrorHeadChanged: when HEAD moved since it was read
+        :raises VupErrorRefUpdateFailed: when the references couldn't be
+            updated
+
+        """
+        head_update, self._head_update = self._head_update, None
+        if head_update is not None:
+            self._update_refs('update HEAD {new} {old}'.format(
+                new=head_update[1], old=head_update[0]))
+        if self._transaction is None:
+            return
+        transaction, self._transaction = self._transaction, None
+        try:
+            transaction.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = transaction.stderr.read()
+        transaction.stdout.close()
+        transaction.stderr.close()
+        if transaction.wait() != 0:
+            reason = stderr.decode('utf-8', 'replace').strip()
+            if head_update is not None and 'but expected' in reason:
+                raise error.VupErrorHeadChanged(self.subcmd, head_update[0])
+            raise error.VupErrorRefUpdateFailed(self.subcmd, reason)
+
+    def abort(self):
+        """Drop the changes to the references that aren't finished."""
+        self._head_update = None
+        if self._transaction is not None:
+            transaction, self._transaction = self._transaction, None
+            transaction.kill()
+            transaction.communicate()
+
+    def close(self):
+        """Abort and stop the git processes."""
+        self.abort()
+        for attribute in ('_batch_check', '_batch'):
+            process = getattr(self, attribute)
+            if process is not None:
+                process.stdin.close()
+                process.wait()
+                setattr(self, attribute, None)
@@ -0,0 +1,125 @@
+"""
+The subcommands that can be run from the command line or by the daemon.
+
+Each subcommand takes the options parsed from the command line as a dict, so a
+request forwarded to the daemon runs exactly what the command line would.
+"""
+
+import sys
+
+from . import apply
+from . import bump
+from . import check
+from . import clear_cache
+from . import plan
+from . import query
+from . import scan
+from . import scans
+from . import timings
+
+
+def run_bump(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    bump(options.get('version_files'), options['type'], options.get('prehook'),
+         options.get('posthook'), options.get('is_dry_run', False),
+         options.get('dirty_check'), options.get('package_names'), a_session)
+
+
+def run_check(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    check(options.get('version_files'), options.get('dirty_check'),
+          options.get('package_names'), a_session)
+
+
+def run_query(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    query(options.get('what', 'current'), options.get('version_files'),
+          options.get('package_names'), a_session, options.get('version'),
+          options.get('major'), options.get('minor'),
+          options.get('include_prereleases', False),
+          options.get('label', 'beta'))
+
+
+def run_plan(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    plan(options['type'], options['output'], options.get('version_files'),
+         options.get('prehook'), options.get('posthook'),
+         options.get('dirty_check'), options.get('package_names'), a_session)
+
+
+def run_apply(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    apply(options['plan_file'], options.get('is_dry_run', False), a_session)
+
+
+def run_cache(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    if options.get('action', 'clear') == 'clear':
+        clear_cache(a_session)
+
+
+def run_scan(options, a_session=None):
+    """
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+    """
+    scan(options.get('version_files'), options.get('package_names'),
+         options.get('propose', False),
+         options.get('max_size', scans.DEFAULT_MAX_SIZE), options.get('jobs'),
+         a_session)
+
+
+SUBCMD_MAP = {
+    'bump': run_bump,
+    'check': run_check,
+    'query': run_query,
+    'plan': run_plan,
+    'apply': run_apply,
+    'cache': run_cache,
+    'scan': run_scan,
+}
+
+
+def run(subcmd, options, a_session=None):
+    """Run a subcommand
+
+    The phases of the subcommand are timed when the options have 'timings',
+    which prints their table to stderr, or a 'trace_file' to write the trace
+    to.
+
+    :param subcmd: the name of the subcommand, a key of SUBCMD_MAP
+    :param options: the parsed command line options
+    :param a_session: the Session to reuse (Default value = None)
+
+    """
+    if not (options.get('timings') or options.get('trace_file')):
+        SUBCMD_MAP[subcmd](options, a_session)
+        return
+    recorder = timings.start()
+    try:
+        with timings.span(subcmd):
+            SUBCMD_MAP[subcmd](options, a_session)
+    finally:
+        timings.stop()
+        if options.get('timings'):
+            print(recorder.format_table(), file=sys.stderr)
+        if options.get('trace_file'):
+            recorder.write_trace(options['trace_file'])
@@ -0,0 +1,229 @@
+"""
+Committing version changes without going through the index.
+
+Adding files to the index and committing it reads and writes the whole index,
+which takes a while when a repository tracks many files. A bump only changes
+the version files, so the objects commit engine writes their blobs and new
+trees only along the paths to them, every other entry keeps the SHA it has in
+the tree of the parent commit. The commit object is written directly and HEAD
+is moved to it with ``git update-ref`` given the parent as the old value, so
+the update fails instead of overwriting a commit made in the meantime.
+
+The commit hooks of git are not run. Once the commits are made the index
+entries of the committed files are refreshed with ``git update-index``, the
+rest of the index is left as it is.
+"""
+
+import io
+import os
+
+from . import error
+from . import refs
+
+COMMIT_ENGINES = ('index', 'objects')
+DEFAULT_COMMIT_ENGINE = 'index'
+TREE_MODE = b'40000'
+
+
+def write_object(repo, type_name, stream, size):
+    """Write a loose object and return its binary SHA
+
+    The object is compressed and written in this process, the object database
+    of GitPython may start a git process for each object instead.
+
+    :param repo: the repository
+    :param type_name: the object type, e.g. b'blob'
+    :param stream: file object to read the contents from
+    :param size: the size of the contents in bytes
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from gitdb import LooseObjectDB
+    from gitdb.base import IStream
+    odb = LooseObjectDB(
+        os.path.join(refs.get_common_dir(repo.git_dir), 'objects'))
+    return odb.store(IStream(type_name, size, stream)).binsha
+
+
+def hash_file(repo, filename):
+    """Write the contents of a file as a blob and return its binary SHA
+
+    :param repo: the repository
+    :param filename: path to the file
+
+    """
+    with open(filename, 'rb') as a_file:
+        return write_object(repo, b'blob', a_file,
+                            os.fstat(a_file.fileno()).st_size)
+
+
+def parse_tree(data):
+    """Return the entries of a tree as [mode, name, binsha] lists of bytes
+
+    :param data: the contents of the tree object
+
+    """
+    entries = []
+    pos = 0
+    while pos < len(data):
+        name_start = data.index(b' ', pos) + 1
+        sha_start = data.index(b'\0', name_start) + 1
+        entries.append([
+            data[pos:name_start - 1], data[name_start:sha_start - 1],
+            data[sha_start:sha_start + 20]
+        ])
+        pos = sha_start + 20
+    return entries
+
+
+def _get_odb_reader(repo):
+    """Return a function reading objects from the object database of GitPython
+
+    :param repo: the repository
+
+    """
+
+    def read_data(binsha):
+        return repo.odb.stream(binsha).read()
+
+    return read_data
+
+
+def _write_tree(repo, entries):
+    """Write a tree and return its binary SHA
+
+    :param repo: the repository
+    :param entries: the [mode, name, binsha] entries in the order of git
+
+    """
+    data = b''.join(mode + b' ' + name + b'\0' + binsha
+                    for mode, name, binsha in entries)
+    return write_object(repo, b'tree', io.BytesIO(data), len(data))
+
+
+# pylint: disable=too-many-arguments
+def replace_blobs(repo,
+                  tree_binsha,
+                  blobs,
+                  subcmd='bump',
+                  prefix=b'',
+                  read_data=None):
+    """Write the trees needed to replace files in a tree
+
+    Only files that are already in the tree can be replaced, so the order of
+    the entries doesn't change.
+
+    :param repo: the repository
+    :param tree_binsha: the binary SHA of the tree
+    :param blobs: dict of the path of each file relative to the tree, as a
+        tuple of the bytes of each component, to the binary SHA of its blob
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :param prefix: the path of the tree for error messages (Default value =
+        b'')
+    :param read_data: function returning the contents of the object with a
+        binary SHA (Default value = None, which reads them with GitPython)
+    :returns: the binary SHA of the new tree
+    :raises VupErrorFileIsNotNotUnderRevisionControl: when a file is not in
+        the tree
+
+    """
+    read_data = read_data or _get_odb_reader(repo)
+    children = {}
+    for parts, blob_binsha in blobs.items():
+        children.setdefault(parts[0], {})[parts[1:]] = blob_binsha
+    entries = parse_tree(read_data(tree_binsha))
+    for entry in entries:
+        mode, name, binsha = entry
+        changes = children.get(name)
+        # a tree can't be replaced by a blob and a blob has no files in it
+        if changes is None or ((mode == TREE_MODE) == (() in changes)):
+            continue
+        del children[name]
+        if mode == TREE_MODE:
+            entry[2] = replace_blobs(repo, binsha, changes, subcmd,
+                                     prefix + name + b'/', read_data)
+        else:
+            entry[2] = changes[()]
+    if children:
+        raise error.VupErrorFileIsNotNotUnderRevisionControl(
+            subcmd, os.fsdecode(prefix + sorted(children)[0]))
+    return _write_tree(repo, entries)
+
+
+def resolve_files(repo, files):
+    """Return the paths of files with symlinks replaced by the files they
+    point to and without duplicates
+
+    A version file that is a symlink is rewritten at the file it points to,
+    so that file is what changed and has to be committed, the symlink itself
+    stays the same.
+
+    :param repo: the repository
+    :param files: paths to the files
+
+    """
+    work_tree = os.path.realpath(repo.working_tree_dir)
+    resolved_files = []
+    for a_file in files:
+        resolved_file = os.path.join(
+            repo.working_tree_dir,
+            os.path.relpath(os.path.realpath(a_file), work_tree))
+        if resolved_file not in resolved_files:
+            resolved_files.append(resolved_file)
+    return resolved_files
+
+
+def get_path_parts(repo, a_file):
+    """Return the path of a file relative to the work tree as used in trees
+
+    :param repo: the repository
+    :param a_file: path to the file
+
+    """
+    relative_file = os.path.relpath(
+        os.path.abspath(a_file), repo.working_tree_dir)
+    return tuple(os.fsencode(relative_file).split(os.fsencode(os.path.sep)))
+
+
+def commit_files(repo, files, commit_message, subcmd='bump'):
+    """Commit the current contents of files on top of HEAD without the index
+
+    :param repo: the repository
+    :param files: paths to the files to commit, they have to be in HEAD
+    :param commit_message: the message of the commit
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :returns: the new git.Commit
+    :raises VupErrorHeadChanged: when HEAD moved before it could be updated
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import git
+    from git.objects.commit import Commit
+    parent = repo.head.commit
+    blobs = {
+        get_path_parts(repo, a_file): hash_file(repo, a_file)
+        for a_file in files
+    }
+    tree_binsha = replace_blobs(repo, parent.tree.binsha, blobs, subcmd)
+    commit = Commit.create_from_tree(repo, git.Tree(repo, tree_binsha),
+                                     commit_message, [parent])
+    reflog_message = 'commit: ' + commit_message.split('\n', 1)[0]
+    try:
+        repo.git.update_ref('-m', reflog_message, 'HEAD', commit.hexsha,
+                            parent.hexsha)
+    except git.exc.GitCommandError:
+        raise error.VupErrorHeadChanged(subcmd, parent.hexsha)
+    return commit
+
+
+def update_index(repo, files):
+    """Refresh the index entries of files from the work tree
+
+    :param repo: the repository
+    :param files: paths to the files
+
+    """
+    repo.git.update_index('-q', '--', *[
+        os.fsdecode(b'/'.join(get_path_parts(repo, a_file)))
+        for a_file in files
+    ])
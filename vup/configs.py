@@ -0,0 +1,419 @@
+"""
+Finding, merging and caching the config files.
+
+The config is read from the .vup.yaml files of the current directory and of
+every directory above it up to the root of the work tree, so a package can
+keep its own config file next to its version files. The files are merged from
+the root down: a file closer to the current directory overrides the settings
+of the files above it, mappings like packages are merged key by key. Paths in
+a config file are relative to its directory, the version files are rebased to
+the current directory and the dirty_check_paths to the work tree, which is
+what the rest of vup expects.
+
+The files are parsed with the C YAML loader when PyYAML was built with it.
+The merged and validated config is cached in the vup directory of the git
+directory with the stat data and SHA-256 of each file, and which directories
+had no config file. When the stat data still matches, or a file whose stat
+data changed still has the same hash, the cached config is used as it is.
+Like the other caches, stat data in the timestamp granularity the cache was
+written in is not trusted.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+from . import error
+
+CONFIG_FILE = '.vup.yaml'
+CONFIG_CACHE_FILE = 'config'
+CONFIG_CACHE_FORMAT_VERSION = 1
+MAX_CACHED_DIRECTORIES = 16
+LIST_SETTINGS = ('version_files', 'dirty_check_paths', 'hook_cache_env')
+
+
+def get_git_dir(work_tree):
+    """Return the git directory of a work tree
+
+    :param work_tree: the directory containing .git
+
+    """
+    dot_git = os.path.join(work_tree, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git) as dot_git_file:
+            content = dot_git_file.read().strip()
+    except OSError:
+        return None
+    if not content.startswith('gitdir:'):
+        return None
+    return os.path.normpath(
+        os.path.join(work_tree, content[len('gitdir:'):].strip()))
+
+
+def find_config_files(directory='.', filename=CONFIG_FILE):
+    """Return the work tree and the paths the config files can be at
+
+    :param directory: the directory to start from (Default value = '.')
+    :param filename: the name of the config files (Default value =
+        CONFIG_FILE)
+    :returns: the work tree, or None outside of a work tree where only the
+        config file of the directory is used, and the paths from the root of
+        the work tree down to the directory
+
+    """
+    directory = os.path.abspath(directory)
+    paths = []
+    current = directory
+    while True:
+        paths.append(os.path.join(current, filename))
+        if os.path.lexists(os.path.join(current, '.git')):
+            paths.reverse()
+            return current, paths
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None, [os.path.join(directory, filename)]
+        current = parent
+
+
+def get_signature(paths):
+    """Return the stat data of the config files
+
+    :param paths: the paths the config files can be at
+    :returns: list of [path, mtime, size, inode], which are None when there is
+        no file
+
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append([path, None, None, None])
+        else:
+            signature.append(
+                [path, stat.st_mtime_ns, stat.st_size, stat.st_ino])
+    return signature
+
+
+def _get_hash(data):
+    """
+    :param data: the contents of a config file
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_hash(path):
+    """Return the SHA-256 of a file or None when it can't be read
+
+    :param path: the file
+
+    """
+    try:
+        with open(path, 'rb') as config_file:
+            return _get_hash(config_file.read())
+    except OSError:
+        return None
+
+
+def parse_config_file(path, subcmd='bump'):
+    """Parse and validate a config file
+
+    :param path: the config file
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :returns: the config and the SHA-256 of the file
+    :raises VupErrorConfigIsInvalid: when the file is not valid YAML or its
+        settings have the wrong type
+
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+    with open(path, 'rb') as config_file:
+        data = config_file.read()
+    try:
+        config = yaml.load(
+            data, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    except yaml.YAMLError as exception:
+        raise error.VupErrorConfigIsInvalid(subcmd, path, exception)
+    config = config or {}
+    validate(config, path, subcmd)
+    return config, _get_hash(data)
+
+
+def validate(config, path, subcmd='bump'):
+    """Check the types of the settings that the merge relies on
+
+    :param config: the parsed config file
+    :param path: the config file for error messages
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :raises VupErrorConfigIsInvalid: when a setting has the wrong type
+
+    """
+    if not isinstance(config, dict):
+        raise error.VupErrorConfigIsInvalid(subcmd, path,
+                                            'the file is not a mapping')
+    packages = config.get('packages', {})
+    if not isinstance(packages, dict):
+        raise error.VupErrorConfigIsInvalid(subcmd, path,
+                                            'packages is not a mapping')
+    settings = [(name, config) for name in LIST_SETTINGS]
+    for name, package in packages.items():
+        if not isinstance(package, dict):
+            raise error.VupErrorConfigIsInvalid(
+                subcmd, path, 'package {} is not a mapping'.format(name))
+        settings.append(('version_files', package))
+    for name, settings_config in settings:
+        if not isinstance(settings_config.get(name, []), list):
+            raise error.VupErrorConfigIsInvalid(
+                subcmd, path, '{} is not a list'.format(name))
+
+
+def _rebase_path(path, config_dir, directory):
+    """
+    :param path: a path relative to the directory of the config file
+    :param config_dir: the directory of the config file
+    :param directory: the directory vup runs in
+    """
+    if os.path.isabs(path):
+        return path
+    return os.path.relpath(os.path.join(config_dir, path), directory)
+
+
+def _rebase_version_files(version_files, config_dir, directory):
+    """
+    :param version_files: version file paths or mappings with a 'path'
+    :param config_dir: the directory of the config file
+    :param directory: the directory vup runs in
+    """
+    rebased = []
+    for entry in version_files:
+        if isinstance(entry, dict) and isinstance(entry.get('path'), str):
+            entry = dict(entry,
+                         path=_rebase_path(entry['path'], config_dir,
+                                           directory))
+        elif isinstance(entry, str):
+            entry = _rebase_path(entry, config_dir, directory)
+        rebased.append(entry)
+    return rebased
+
+
+def rebase(config, config_dir, directory, work_tree):
+    """Return a config with its paths relative to where they are used
+
+    :param config: the parsed config file
+    :param config_dir: the directory of the config file
+    :param directory: the directory vup runs in
+    :param work_tree: the work tree of the repository or None
+
+    """
+    if config_dir == directory:
+        return config
+    config = dict(config)
+    if 'version_files' in config:
+        config['version_files'] = _rebase_version_files(
+            config['version_files'], config_dir, directory)
+    if 'packages' in config:
+        config['packages'] = {
+            name: dict(package,
+                       version_files=_rebase_version_files(
+                           package['version_files'], config_dir,
+                           directory))
+            if 'version_files' in package else package
+            for name, package in config['packages'].items()
+        }
+    if ('dirty_check_paths' in config and work_tree is not None
+            and config_dir != work_tree):
+        work_tree_prefix = os.path.relpath(config_dir, work_tree)
+        config['dirty_check_paths'] = [
+            '/'.join(work_tree_prefix.split(os.path.sep) + [pattern])
+            for pattern in config['dirty_check_paths']
+        ]
+    return config
+
+
+def merge(base, override):
+    """Return the settings of base overridden by the ones of override
+
+    :param base: the config of a directory higher up
+    :param override: the config of a directory below it
+
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def build_config(signature, directory, work_tree, subcmd='bump'):
+    """Parse, validate and merge the config files
+
+    :param signature: see get_signature
+    :param directory: the directory vup runs in
+    :param work_tree: the work tree of the repository or None
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :returns: the merged config and the SHA-256 of each file
+
+    """
+    config = {}
+    hashes = []
+    for path, mtime, _, _ in signature:
+        if mtime is None:
+            hashes.append(None)
+            continue
+        file_config, file_hash = parse_config_file(path, subcmd)
+        config = merge(
+            config,
+            rebase(file_config, os.path.dirname(path), directory, work_tree))
+        hashes.append(file_hash)
+    return config, hashes
+
+
+class ConfigLoader():
+    """Loads the merged config of a directory.
+
+    The last config loaded is kept in memory until the stat data of the
+    config files changes, the on disk cache is only used when it did.
+
+    :param directory: the directory vup runs in (Default value = '.')
+    :param filename: the name of the config files (Default value =
+        CONFIG_FILE)
+    :param use_cache: if the config is cached in the git directory (Default
+        value = True)
+
+    """
+
+    def __init__(self, directory='.', filename=CONFIG_FILE, use_cache=True):
+        self.directory = directory
+        self.filename = filename
+        self.use_cache = use_cache
+        self._config = None
+        self._signature = None
+
+    def load(self, subcmd='bump'):
+        """Return the merged config, an empty dict when there are no config
+        files
+
+        :param subcmd: the subcommand for error messages (Default value =
+            'bump')
+        :raises VupErrorConfigIsInvalid: when a config file is not valid
+
+        """
+        directory = os.path.abspath(self.directory)
+        work_tree, paths = find_config_files(directory, self.filename)
+        signature = get_signature(paths)
+        if self._config is not None and signature == self._signature:
+            return self._config
+        cache_path = None
+        if self.use_cache and work_tree is not None:
+            git_dir = get_git_dir(work_tree)
+            if git_dir is not None:
+                cache_path = os.path.join(git_dir, 'vup', CONFIG_CACHE_FILE)
+        config = None
+        if cache_path:
+            config = _load_cache(cache_path, directory, signature)
+        if config is None:
+            config, hashes = build_config(signature, directory, work_tree,
+                                          subcmd)
+            if cache_path:
+                _save_cache(cache_path, directory, signature, hashes, config)
+        self._config = config
+        self._signature = signature
+        return config
+
+
+def _read_cache(cache_path):
+    """Return the cache entries by directory and when they were written
+
+    :param cache_path: the cache file
+
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            written_ns = os.fstat(cache_file.fileno()).st_mtime_ns
+            data = pickle.load(cache_file)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return {}, 0
+    if (not isinstance(data, dict)
+            or data.get('format') != CONFIG_CACHE_FORMAT_VERSION):
+        return {}, 0
+    return data['entries'], written_ns
+
+
+def _is_unchanged(entry, signature, written_ns):
+    """Check if the config files of a cache entry are still the same
+
+    :param entry: the cache entry
+    :param signature: the current signature of the config files
+    :param written_ns: when the cache was written
+
+    """
+    if len(entry['signature']) != len(signature):
+        return False
+    for cached, current, file_hash in zip(entry['signature'], signature,
+                                          entry['hashes']):
+        if cached[0] != current[0] or (cached[1] is None) != (current[1] is
+                                                              None):
+            return False
+        if current[1] is None:
+            continue
+        if cached == current and current[1] < written_ns:
+            continue
+        if _read_hash(current[0]) != file_hash:
+            return False
+    return True
+
+
+def _load_cache(cache_path, directory, signature):
+    """Return the cached config or None when it is missing or out of date
+
+    :param cache_path: the cache file
+    :param directory: the directory vup runs in
+    :param signature: the current signature of the config files
+
+    """
+    entries, written_ns = _read_cache(cache_path)
+    entry = entries.get(directory)
+    if entry is None or not _is_unchanged(entry, signature, written_ns):
+        return None
+    if entry['signature'] != signature:
+        # only the stat data changed, record it so the hashes aren't needed
+        _save_cache(cache_path, directory, signature, entry['hashes'],
+                    entry['config'])
+    return entry['config']
+
+
+def _save_cache(cache_path, directory, signature, hashes, config):
+    """
+    :param cache_path: the cache file
+    :param directory: the directory vup runs in
+    :param signature: the signature of the config files
+    :param hashes: the SHA-256 of each config file
+    :param config: the merged config
+    """
+    entries, _ = _read_cache(cache_path)
+    entries.pop(directory, None)
+    while len(entries) >= MAX_CACHED_DIRECTORIES:
+        del entries[next(iter(entries))]
+    entries[directory] = {
+        'signature': signature,
+        'hashes': hashes,
+        'config': config,
+    }
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_fd, temp_name = tempfile.mkstemp(prefix='.config-', dir=cache_dir)
+    try:
+        with os.fdopen(temp_fd, 'wb') as cache_file:
+            pickle.dump({
+                'format': CONFIG_CACHE_FORMAT_VERSION,
+                'entries': entries
+            }, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, cache_path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
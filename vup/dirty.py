@@ -0,0 +1,103 @@
+"""
+Checks for uncommited changes in a repository.
+
+The modes trade how much of the work tree is looked at for speed:
+
+``full``
+    GitPython's is_dirty(), diffs the whole index and work tree
+``paths``
+    only the version files and the configured dirty_check_paths globs in the
+    work tree, staged changes to any file are still rejected since the
+    release commit is made from the index
+``index-stat``
+    git status of the tracked files, which compares the stat data in the index
+    and only reads files whose stat data changed, and uses the fsmonitor and
+    untracked cache when they are enabled in the repository
+"""
+
+import os
+import time
+import collections
+
+from . import error
+
+DIRTY_CHECK_MODES = ('full', 'paths', 'index-stat')
+DEFAULT_DIRTY_CHECK_MODE = 'full'
+
+DirtyCheckResult = collections.namedtuple('DirtyCheckResult',
+                                          ['mode', 'is_dirty', 'duration'])
+DirtyCheckResult.__doc__ = """The outcome of a dirty check.
+
+:param mode: the mode the check ran in
+:param is_dirty: True if there are uncommited changes
+:param duration: how long the check took in seconds
+"""
+
+
+def _get_pathspecs(repo, version_files, dirty_check_paths):
+    """Return the pathspecs for the paths mode relative to the work tree
+
+    :param repo: the repository to check
+    :param version_files: paths to the version files
+    :param dirty_check_paths: glob patterns relative to the work tree
+
+    """
+    pathspecs = []
+    for a_file in version_files:
+        relative_file = os.path.relpath(
+            os.path.abspath(a_file), repo.working_tree_dir)
+        pathspecs.append(':(literal)' + relative_file)
+    pathspecs.extend(':(glob)' + pattern for pattern in dirty_check_paths)
+    return pathspecs
+
+
+def _has_status(repo, *args):
+    """
+    :param repo: the repository to check
+    :param args: extra arguments for git status
+    """
+    return bool(
+        repo.git.status('--porcelain', '--untracked-files=no', '--no-renames',
+                        *args))
+
+
+def _has_staged_changes(repo):
+    """Check if the index differs from HEAD, which only compares the index
+    to the tree of HEAD without looking at the work tree
+
+    :param repo: the repository to check
+
+    """
+    status, _, _ = repo.git.diff('--cached', '--quiet', '--no-ext-diff',
+                                 with_extended_output=True,
+                                 with_exceptions=False)
+    return status != 0
+
+
+def check_dirty(repo, mode=DEFAULT_DIRTY_CHECK_MODE, version_files=(),
+                dirty_check_paths=()):
+    """Check a repository for uncommited changes
+
+    :param repo: the repository to check
+    :param mode: one of DIRTY_CHECK_MODES (Default value =
+        DEFAULT_DIRTY_CHECK_MODE)
+    :param version_files: paths to the version files, used by the paths mode
+        (Default value = ())
+    :param dirty_check_paths: extra glob patterns relative to the work tree,
+        used by the paths mode (Default value = ())
+    :returns: a DirtyCheckResult
+    :raises VupErrorDirtyCheckModeIsInvalid: when the mode is not valid
+
+    """
+    start = time.perf_counter()
+    if mode == 'full':
+        is_dirty = repo.is_dirty()
+    elif mode == 'paths':
+        pathspecs = _get_pathspecs(repo, version_files, dirty_check_paths)
+        is_dirty = _has_staged_changes(repo) or (
+            bool(pathspecs) and _has_status(repo, '--', *pathspecs))
+    elif mode == 'index-stat':
+        is_dirty = _has_status(repo)
+    else:
+        raise error.VupErrorDirtyCheckModeIsInvalid('bump', mode)
+    return DirtyCheckResult(mode, is_dirty, time.perf_counter() - start)
@@ -50,6 +50,15 @@ class VupErrorVersionFileDoesNotExist(VupError):
         super().__init__(msg)
 
 
+class VupErrorPatternMatchesNoFiles(VupError):
+    """Thrown when a version file pattern matches no tracked file"""
+
+    def __init__(self, subcmd, pattern):
+        msg = ERROR_HEAD + "pattern {pattern} matches no tracked files"
+        msg = msg.format(subcmd=subcmd, pattern=pattern)
+        super().__init__(msg)
+
+
 class VupErrorFileIsNotNotUnderRevisionControl(VupError):
     """Thrown when the file specified is not under any supported version control"""
 
@@ -113,6 +122,16 @@ class VupErrorPosthookFailed(VupError):
         super().__init__(msg)
 
 
+class VupErrorHookIsInvalid(VupError):
+    """Thrown when an entry of a hook list is not a command or a mapping with
+    a cmd"""
+
+    def __init__(self, subcmd, hook):
+        msg = ERROR_HEAD + "hook {hook} is invalid"
+        msg = msg.format(subcmd=subcmd, hook=hook)
+        super().__init__(msg)
+
+
 class VupErrorVersionTagAlreadyExists(VupError):
     """Thrown when version tag already exists"""
 
@@ -120,3 +139,163 @@ class VupErrorVersionTagAlreadyExists(VupError):
         msg = ERROR_HEAD + "tag version {tag} already exists"
         msg = msg.format(subcmd=subcmd, tag=tag)
         super().__init__(msg)
+
+
+class VupErrorInvalidLocator(VupError):
+    """Thrown when the locator of a version file is not valid"""
+
+    def __init__(self, subcmd, locator):
+        msg = ERROR_HEAD + "version file locator {locator} is not valid"
+        msg = msg.format(subcmd=subcmd, locator=locator)
+        super().__init__(msg)
+
+
+class VupErrorDirtyCheckModeIsInvalid(VupError):
+    """Thrown when the dirty check mode specified is not valid"""
+
+    def __init__(self, subcmd, mode):
+        msg = ERROR_HEAD + "dirty check mode {mode} is invalid"
+        msg = msg.format(subcmd=subcmd, mode=mode)
+        super().__init__(msg)
+
+
+class VupErrorCommitEngineIsInvalid(VupError):
+    """Thrown when the commit engine specified is not valid"""
+
+    def __init__(self, subcmd, engine):
+        msg = ERROR_HEAD + "commit engine {engine} is invalid"
+        msg = msg.format(subcmd=subcmd, engine=engine)
+        super().__init__(msg)
+
+
+class VupErrorHeadChanged(VupError):
+    """Thrown when HEAD moved while the version changes were committed"""
+
+    def __init__(self, subcmd, expected):
+        msg = ERROR_HEAD + "HEAD moved away from {expected} while committing"
+        msg = msg.format(subcmd=subcmd, expected=expected)
+        super().__init__(msg)
+
+
+class VupErrorGitBackendIsInvalid(VupError):
+    """Thrown when the git backend specified is not valid"""
+
+    def __init__(self, subcmd, backend):
+        msg = ERROR_HEAD + "git backend {backend} is invalid"
+        msg = msg.format(subcmd=subcmd, backend=backend)
+        super().__init__(msg)
+
+
+class VupErrorRefUpdateFailed(VupError):
+    """Thrown when git refused to update the references of a bump"""
+
+    def __init__(self, subcmd, reason):
+        msg = ERROR_HEAD + "updating the references failed: {reason}"
+        msg = msg.format(subcmd=subcmd, reason=reason)
+        super().__init__(msg)
+
+
+class VupErrorConfigIsInvalid(VupError):
+    """Thrown when a config file can't be parsed or a setting has the wrong
+    type"""
+
+    def __init__(self, subcmd, filename, reason):
+        msg = ERROR_HEAD + "config file {filename} is invalid: {reason}"
+        msg = msg.format(subcmd=subcmd, filename=filename, reason=reason)
+        super().__init__(msg)
+
+
+class VupErrorPackageDoesNotExist(VupError):
+    """Thrown when a package is not in the config file"""
+
+    def __init__(self, subcmd, package):
+        msg = ERROR_HEAD + "package {package} does not exist"
+        msg = msg.format(subcmd=subcmd, package=package)
+        super().__init__(msg)
+
+
+class VupErrorQueryIsInvalid(VupError):
+    """Thrown when the query specified is not valid"""
+
+    def __init__(self, subcmd, query):
+        msg = ERROR_HEAD + "query {query} is invalid"
+        msg = msg.format(subcmd=subcmd, query=query)
+        super().__init__(msg)
+
+
+class VupErrorQueryNeedsAVersion(VupError):
+    """Thrown when a query that is about a version is not given one"""
+
+    def __init__(self, subcmd, query):
+        msg = ERROR_HEAD + "query {query} needs a version"
+        msg = msg.format(subcmd=subcmd, query=query)
+        super().__init__(msg)
+
+
+class VupErrorVersionIsInvalid(VupError):
+    """Thrown when a version given on the command line is not a semantic
+    version"""
+
+    def __init__(self, subcmd, version):
+        msg = ERROR_HEAD + "version {version} is invalid"
+        msg = msg.format(subcmd=subcmd, version=version)
+        super().__init__(msg)
+
+
+class VupErrorNoVersionTagFound(VupError):
+    """Thrown when no version tag matches a query"""
+
+    def __init__(self, subcmd, tag_prefix):
+        msg = ERROR_HEAD + "no version tag{prefix} matches the query"
+        msg = msg.format(
+            subcmd=subcmd,
+            prefix=' with prefix ' + tag_prefix if tag_prefix else '')
+        super().__init__(msg)
+
+
+class VupErrorPlanIsInvalid(VupError):
+    """Thrown when a plan file can't be read or is not a plan"""
+
+    def __init__(self, subcmd, plan_file):
+        msg = ERROR_HEAD + "{plan_file} is not a valid plan"
+        msg = msg.format(subcmd=subcmd, plan_file=plan_file)
+        super().__init__(msg)
+
+
+class VupErrorPlanIsStale(VupError):
+    """Thrown when the repository changed since a plan was made"""
+
+    def __init__(self, subcmd, what):
+        msg = ERROR_HEAD + "{what} changed since the plan was made"
+        msg = msg.format(subcmd=subcmd, what=what)
+        super().__init__(msg)
+
+
+class VupErrorNoReleasableCommits(VupError):
+    """Thrown when no commit since the last release calls for a bump"""
+
+    def __init__(self, subcmd, tag_name):
+        msg = ERROR_HEAD + ("no feat, fix, perf or breaking change commit "
+                            "since {since}")
+        msg = msg.format(
+            subcmd=subcmd,
+            since=tag_name if tag_name else 'the first commit')
+        super().__init__(msg)
+
+
+class VupErrorDaemonIsNotSupported(VupError):
+    """Thrown when the daemon can't run on this platform"""
+
+    def __init__(self, subcmd):
+        msg = ERROR_HEAD + "the daemon needs Unix domain sockets"
+        msg = msg.format(subcmd=subcmd)
+        super().__init__(msg)
+
+
+class VupErrorDaemonIsAlreadyRunning(VupError):
+    """Thrown when a daemon is already serving the repository"""
+
+    def __init__(self, subcmd, socket_path):
+        msg = ERROR_HEAD + "a daemon is already listening on {socket_path}"
+        msg = msg.format(subcmd=subcmd, socket_path=socket_path)
+        super().__init__(msg)
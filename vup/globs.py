@@ -0,0 +1,161 @@
+"""
+Expanding glob patterns in the version files against the tracked paths.
+
+A version file entry with a glob character in its path is matched against the
+paths tracked in the HEAD commit, the same list the version files are checked
+against, instead of walking the work tree. Ignored and untracked files, like
+build directories, are never looked at and every match is a tracked file.
+
+The patterns follow the glob pathspec magic of git, which the
+dirty_check_paths use as well: ``*``, ``?`` and ``[...]`` don't match a
+``/``, a ``**/`` component matches any number of directories and a trailing
+``/**`` everything inside a directory. Patterns are relative to the current
+directory like the other version file paths.
+"""
+
+import os
+import re
+
+from . import error
+
+MAGIC_CHARACTERS = frozenset('*?[')
+
+
+def has_magic(path):
+    """Check if a path is a glob pattern
+
+    :param path: the path of a version file entry
+
+    """
+    return not MAGIC_CHARACTERS.isdisjoint(path)
+
+
+def _translate_bracket(pattern, pos):
+    """Return the regex of the bracket expression at pos and where it ends
+
+    :param pattern: the glob pattern
+    :param pos: the position of the '['
+
+    """
+    end = pos + 1
+    if end < len(pattern) and pattern[end] in '!^':
+        end += 1
+    if end < len(pattern) and pattern[end] == ']':
+        end += 1
+    end = pattern.find(']', end)
+    if end == -1:
+        return re.escape('['), pos + 1
+    content = pattern[pos + 1:end].replace('\\', '\\\\')
+    if content[0] in '!^':
+        content = '^' + content[1:]
+    return '(?!/)[' + content + ']', end + 1
+
+
+def compile_pattern(pattern):
+    """Return the compiled regex of a glob pattern relative to the work tree
+
+    :param pattern: the glob pattern with / as the separator
+
+    """
+    regex = []
+    pos = 0
+    while pos < len(pattern):
+        at_component_start = pos == 0 or pattern[pos - 1] == '/'
+        if at_component_start and pattern.startswith('**/', pos):
+            regex.append('(?:.*/)?')
+            pos += 3
+        elif at_component_start and pattern[pos:] == '**':
+            regex.append('.*')
+            pos += 2
+        elif pattern[pos] == '*':
+            regex.append('[^/]*')
+            pos += 1
+        elif pattern[pos] == '?':
+            regex.append('[^/]')
+            pos += 1
+        elif pattern[pos] == '[':
+            bracket, pos = _translate_bracket(pattern, pos)
+            regex.append(bracket)
+        else:
+            regex.append(re.escape(pattern[pos]))
+            pos += 1
+    return re.compile(''.join(regex) + r'\Z')
+
+
+def _get_work_tree_pattern(pattern, work_tree, directory):
+    """Return a pattern relative to the current directory relative to the
+    work tree, or None when it points outside of the work tree
+
+    :param pattern: the glob pattern
+    :param work_tree: the work tree of the repository
+    :param directory: the current directory
+
+    """
+    parts = pattern.replace(os.path.sep, '/').split('/')
+    for pos, part in enumerate(parts):
+        if has_magic(part):
+            break
+    base = os.path.relpath(
+        os.path.normpath(os.path.join(directory, *parts[:pos])), work_tree)
+    if base == os.pardir or base.startswith(os.pardir + os.path.sep):
+        return None
+    prefix = ''
+    if base != os.curdir:
+        prefix = re.sub(r'([*?[])', r'[\1]', base.replace(os.path.sep,
+                                                          '/')) + '/'
+    return prefix + '/'.join(parts[pos:])
+
+
+def match(pattern, tracked_paths, work_tree, directory=None):
+    """Return the tracked files a glob pattern matches in sorted order
+
+    :param pattern: the glob pattern relative to the current directory
+    :param tracked_paths: the paths relative to the work tree of the tracked
+        files
+    :param work_tree: the work tree of the repository
+    :param directory: the current directory (Default value = None, which is
+        the current working directory)
+    :returns: the paths of the files relative to the current directory
+
+    """
+    directory = os.path.abspath(directory or os.curdir)
+    work_tree_pattern = _get_work_tree_pattern(pattern, work_tree, directory)
+    if work_tree_pattern is None:
+        return []
+    regex = compile_pattern(work_tree_pattern)
+    return [
+        os.path.relpath(os.path.join(work_tree, path), directory)
+        for path in sorted(filter(regex.match, tracked_paths))
+    ]
+
+
+def expand(version_file_entries, tracked_paths, work_tree, subcmd='bump'):
+    """Replace the entries with a glob pattern by one for each file matched
+
+    Each match keeps the locator of its pattern, files matched more than once
+    are only kept the first time.
+
+    :param version_file_entries: (path, locator) tuples
+    :param tracked_paths: the paths relative to the work tree of the tracked
+        files
+    :param work_tree: the work tree of the repository
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :raises VupErrorPatternMatchesNoFiles: when a pattern matches no tracked
+        file
+
+    """
+    expanded = []
+    seen_files = set()
+    for a_file, locator in version_file_entries:
+        if has_magic(a_file):
+            files = match(a_file, tracked_paths, work_tree)
+            if not files:
+                raise error.VupErrorPatternMatchesNoFiles(subcmd, a_file)
+        else:
+            files = [a_file]
+        for matched_file in files:
+            key = os.path.normcase(os.path.abspath(matched_file))
+            if key not in seen_files:
+                seen_files.add(key)
+                expanded.append((matched_file, locator))
+    return expanded
@@ -0,0 +1,268 @@
+"""
+Inferring the bump type from the commit messages since the last release.
+
+The messages are read as conventional commits: a ``feat`` is a minor bump, a
+``fix`` or ``perf`` is a patch bump, and a ``!`` after the type or scope or a
+``BREAKING CHANGE:`` footer is a major bump. Other commits don't release
+anything.
+
+The commits are streamed from one ``git log`` process, newest first, and
+reading stops at the first breaking change since nothing older can change
+the result. The result is cached in the vup directory of the git directory
+with the HEAD it was computed at, keyed by the tag of the last release. When
+that HEAD is still an ancestor of the current one, only the commits made
+since are read and their bump type is combined with the cached one. After a
+rebase or a reset the whole range is read again.
+"""
+
+import os
+import re
+import json
+import time
+import tempfile
+import subprocess
+
+from . import index
+
+AUTO = 'auto'
+
+HISTORY_CACHE_FORMAT_VERSION = 1
+HISTORY_CACHE_FILE = 'history'
+DEFAULT_MAX_ENTRIES = 16
+
+# from least to most significant
+BUMP_TYPES = ('patch', 'minor', 'major')
+COMMIT_TYPES = {'feat': 'minor', 'fix': 'patch', 'perf': 'patch'}
+
+HEADER_PATTERN = re.compile(r'(\w+)(?:\([^)\n]*\))?(!?): ', re.ASCII)
+BREAKING_CHANGE_PATTERN = re.compile(r'^BREAKING[ -]CHANGE: ', re.MULTILINE)
+
+READ_SIZE = 64 * 1024
+
+
+def get_history_cache_path(repo):
+    """Return the path of the history cache of a repository
+
+    :param repo: the repository
+
+    """
+    return os.path.join(index.get_vup_dir(repo), HISTORY_CACHE_FILE)
+
+
+def get_commit_bump_type(message):
+    """Return the bump type of a conventional commit message
+
+    :param message: the commit message
+    :returns: 'major', 'minor', 'patch' or None when the commit doesn't
+        release anything
+
+    """
+    match = HEADER_PATTERN.match(message)
+    if match is None:
+        return None
+    if match.group(2) or BREAKING_CHANGE_PATTERN.search(message):
+        return 'major'
+    return COMMIT_TYPES.get(match.group(1).lower())
+
+
+def combine(bump_type, other_bump_type):
+    """Return the more significant of two bump types
+
+    :param bump_type: a bump type or None
+    :param other_bump_type: a bump type or None
+
+    """
+    if bump_type is None or other_bump_type is None:
+        return bump_type or other_bump_type
+    return max(bump_type, other_bump_type, key=BUMP_TYPES.index)
+
+
+def iter_commits(git_dir, revisions):
+    """Yield the SHA and message of commits, newest first, as git log outputs
+    them
+
+    Closing the generator stops git log.
+
+    :param git_dir: the git directory of the repository
+    :param revisions: the revisions to pass to git log, e.g. ['HEAD',
+        '^v1.0.0']
+
+    """
+    process = subprocess.Popen(
+        ['git', '--git-dir', git_dir, 'log', '-z', '--format=%H%n%B',
+         '--no-color'] + list(revisions) + ['--'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL)
+    try:
+        pending = b''
+        while True:
+            chunk = process.stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            records = (pending + chunk).split(b'\0')
+            pending = records.pop()
+            for record in records:
+                sha, _, message = record.partition(b'\n')
+                yield sha.decode('ascii'), message.decode('utf-8', 'replace')
+        if pending.strip():
+            sha, _, message = pending.partition(b'\n')
+            yield sha.decode('ascii'), message.decode('utf-8', 'replace')
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def analyse(git_dir, revisions):
+    """Return the bump type of the commits of a range and how many commits
+    were read
+
+    :param git_dir: the git directory of the repository
+    :param revisions: the revisions to pass to git log
+
+    """
+    bump_type = None
+    count = 0
+    commits = iter_commits(git_dir, revisions)
+    try:
+        for _, message in commits:
+            count += 1
+            bump_type = combine(bump_type, get_commit_bump_type(message))
+            if bump_type == 'major':
+                break
+    finally:
+        commits.close()
+    return bump_type, count
+
+
+def get_commit_sha(git_dir, revision):
+    """Return the SHA of the commit a revision points to
+
+    :param git_dir: the git directory of the repository
+    :param revision: e.g. a tag name
+
+    """
+    return subprocess.check_output(
+        ['git', '--git-dir', git_dir, 'rev-parse', '--verify', '--quiet',
+         revision + '^{commit}'],
+        stdin=subprocess.DEVNULL).decode('ascii').strip()
+
+
+def is_ancestor(git_dir, ancestor, commit):
+    """Check if a commit is an ancestor of another one
+
+    :param git_dir: the git directory of the repository
+    :param ancestor: the SHA of the possible ancestor
+    :param commit: the SHA of the commit
+
+    """
+    return subprocess.call(
+        ['git', '--git-dir', git_dir, 'merge-base', '--is-ancestor', ancestor,
+         commit],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL) == 0
+
+
+class HistoryCache():
+    """The bump types computed for the releases of a repository.
+
+    :param path: the cache file
+    :param max_entries: the number of releases to keep (Default value =
+        DEFAULT_MAX_ENTRIES)
+
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = {}
+        self.is_modified = False
+        self._load()
+
+    @classmethod
+    def for_repo(cls, repo, max_entries=DEFAULT_MAX_ENTRIES):
+        """Return the history cache of a repository
+
+        :param repo: the repository
+        :param max_entries: the number of releases to keep (Default value =
+            DEFAULT_MAX_ENTRIES)
+
+        """
+        return cls(get_history_cache_path(repo), max_entries)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and \
+                data.get('format') == HISTORY_CACHE_FORMAT_VERSION:
+            self.entries = data.get('entries', {})
+
+    def get_bump_type(self, git_dir, head_sha, tag_sha=None):
+        """Return the bump type of the commits since a release and how many
+        commits were read to compute it
+
+        :param git_dir: the git directory of the repository
+        :param head_sha: the SHA of the HEAD commit
+        :param tag_sha: the SHA of the commit of the last release tag
+            (Default value = None, which reads the whole history)
+
+        """
+        key = tag_sha or ''
+        entry = self.entries.get(key)
+        revisions = [head_sha] + (['^' + tag_sha] if tag_sha else [])
+        if entry is not None and entry['head'] == head_sha:
+            bump_type, count = entry['bump_type'], 0
+        elif entry is not None and is_ancestor(git_dir, entry['head'],
+                                               head_sha):
+            # the new commits can't make a breaking change more significant
+            bump_type, count = entry['bump_type'], 0
+            if bump_type != 'major':
+                new_bump_type, count = analyse(
+                    git_dir, revisions + ['^' + entry['head']])
+                bump_type = combine(bump_type, new_bump_type)
+        else:
+            bump_type, count = analyse(git_dir, revisions)
+        self.entries[key] = {
+            'head': head_sha,
+            'bump_type': bump_type,
+            'last_used': time.time(),
+        }
+        self.is_modified = True
+        return bump_type, count
+
+    def save(self):
+        """Evict the least recently used releases over max_entries and write
+        the cache to disk if it has been modified."""
+        if not self.is_modified:
+            return
+        if len(self.entries) > self.max_entries:
+            keys = sorted(
+                self.entries,
+                key=lambda key: self.entries[key]['last_used'],
+                reverse=True)
+            self.entries = {
+                key: self.entries[key]
+                for key in keys[:self.max_entries]
+            }
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        temp_fd, temp_name = tempfile.mkstemp(
+            prefix='.history-', dir=directory)
+        try:
+            with os.fdopen(temp_fd, 'w') as cache_file:
+                json.dump({
+                    'format': HISTORY_CACHE_FORMAT_VERSION,
+                    'entries': self.entries
+                }, cache_file)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+        self.is_modified = False
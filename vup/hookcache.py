@@ -0,0 +1,177 @@
+"""
+A cache of the hooks that passed for a tree.
+
+A bump only starts when the work tree has no uncommited changes, so the tree
+of the HEAD commit is what the prehook runs on. A hook that passed for a tree
+passes again as long as its command and the environment variables it depends
+on are the same, so the cache records the key of each passed hook: a SHA-256
+of the command, the tree SHA and the names and values of the configured
+environment variables. Hooks whose key is in the cache are skipped.
+
+The cache is stored in the vup directory of the git directory. It holds at
+most max_entries keys, the least recently used ones are evicted first.
+``vup cache clear`` removes all of them.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from . import index
+
+HOOK_CACHE_FORMAT_VERSION = 1
+HOOK_CACHE_FILE = 'hook-cache'
+DEFAULT_MAX_ENTRIES = 256
+
+
+def get_hook_cache_path(repo):
+    """Return the path of the hook cache of a repository
+
+    :param repo: the repository
+
+    """
+    return os.path.join(index.get_vup_dir(repo), HOOK_CACHE_FILE)
+
+
+class HookCache():
+    """The hooks that passed, for the hooks run on one tree.
+
+    :param path: the cache file
+    :param tree_sha: the SHA of the tree the hooks run on
+    :param env_names: names of the environment variables the hooks depend on
+        (Default value = ())
+    :param max_entries: the number of keys to keep (Default value =
+        DEFAULT_MAX_ENTRIES)
+
+    """
+
+    def __init__(self,
+                 path,
+                 tree_sha,
+                 env_names=(),
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.tree_sha = tree_sha
+        self.env = sorted(
+            (name, os.environ.get(name)) for name in set(env_names))
+        self.max_entries = max_entries
+        self.entries = {}
+        self.is_modified = False
+        self._load()
+
+    @classmethod
+    def for_repo(cls,
+                 repo,
+                 tree_sha,
+                 env_names=(),
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        """Return the hook cache of a repository
+
+        :param repo: the repository
+        :param tree_sha: the SHA of the tree the hooks run on
+        :param env_names: names of the environment variables the hooks
+            depend on (Default value = ())
+        :param max_entries: the number of keys to keep (Default value =
+            DEFAULT_MAX_ENTRIES)
+
+        """
+        return cls(get_hook_cache_path(repo), tree_sha, env_names,
+                   max_entries)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if data.get('format') == HOOK_CACHE_FORMAT_VERSION:
+            self.entries = data.get('entries', {})
+
+    def get_key(self, hook):
+        """Return the cache key of a hook
+
+        :param hook: the hooks.Hook
+
+        """
+        key_data = json.dumps([hook.cmd, self.tree_sha, self.env])
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def has_passed(self, hook):
+        """Check if a hook already passed for the tree
+
+        :param hook: the hooks.Hook
+
+        """
+        entry = self.entries.get(self.get_key(hook))
+        if entry is None:
+            return False
+        entry['last_used'] = time.time()
+        self.is_modified = True
+        return True
+
+    def record(self, hook, duration):
+        """Record that a hook passed for the tree
+
+        :param hook: the hooks.Hook
+        :param duration: how long the hook took in seconds
+
+        """
+        self.entries[self.get_key(hook)] = {
+            'cmd': hook.cmd,
+            'tree': self.tree_sha,
+            'duration': duration,
+            'last_used': time.time(),
+        }
+        self.is_modified = True
+
+    def save(self):
+        """Evict the least recently used keys over max_entries and write the
+        cache to disk if it has been modified."""
+        if not self.is_modified:
+            return
+        if len(self.entries) > self.max_entries:
+            keys = sorted(
+                self.entries,
+                key=lambda key: self.entries[key]['last_used'],
+                reverse=True)
+            self.entries = {
+                key: self.entries[key]
+                for key in keys[:self.max_entries]
+            }
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        temp_fd, temp_name = tempfile.mkstemp(
+            prefix='.hook-cache-', dir=directory)
+        try:
+            with os.fdopen(temp_fd, 'w') as cache_file:
+                json.dump({
+                    'format': HOOK_CACHE_FORMAT_VERSION,
+                    'entries': self.entries
+                }, cache_file)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+        self.is_modified = False
+
+
+def clear(path):
+    """Remove all the keys of a hook cache
+
+    :param path: the cache file
+    :returns: the number of keys removed
+
+    """
+    try:
+        with open(path, 'r') as cache_file:
+            count = len(json.load(cache_file).get('entries', {}))
+    except (OSError, ValueError, AttributeError):
+        count = 0
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return count
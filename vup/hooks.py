@@ -0,0 +1,398 @@
+"""
+Running the prehook and posthook commands.
+
+A hook setting is either a single shell command or a list of hooks, each
+either a shell command or a mapping with the command under ``cmd`` and an
+optional ``name`` and ``timeout`` in seconds. The hooks of a list are
+independent of each other and run at the same time, at most ``jobs`` of them
+at once. The first hook that fails or times out stops the hooks still running
+and the ones that haven't started yet.
+
+The output of each hook is read line by line by a thread and passed through a
+bounded queue to the thread running the hooks, which prints it as it arrives
+so it can be redirected like any other output. When more than one hook runs
+each line is prefixed with the name of its hook. The last lines of each hook
+are kept in a ring buffer for its HookResult.
+"""
+
+import os
+import time
+import collections
+
+from . import error
+from . import timings
+
+OUTPUT_LINES = 100
+QUEUE_LINES = 1000
+MAX_LINE_LENGTH = 64 * 1024
+POLL_INTERVAL = 0.05
+KILL_GRACE_PERIOD = 2
+
+Hook = collections.namedtuple('Hook', ['cmd', 'name', 'timeout'])
+Hook.__doc__ = """A command to run as a hook.
+
+:param cmd: the shell command
+:param name: the name to prefix its output with and report failures by
+:param timeout: seconds after which the hook is stopped or None
+"""
+
+HookResult = collections.namedtuple('HookResult', [
+    'hook', 'returncode', 'duration', 'output', 'is_timed_out', 'is_cancelled'
+])
+HookResult.__doc__ = """The outcome of running a hook.
+
+:param hook: the Hook
+:param returncode: the exit code of the command, None if it didn't start
+:param duration: how long the hook ran in seconds
+:param output: the last OUTPUT_LINES lines of the output of the hook
+:param is_timed_out: True if the hook was stopped by its timeout
+:param is_cancelled: True if the hook was stopped or not started because
+    another hook failed
+"""
+
+
+def get_hooks(hook_setting, default_timeout=None, subcmd='bump'):
+    """Return the hooks of a prehook or posthook setting
+
+    :param hook_setting: a shell command, or a list of shell commands and
+        mappings with a 'cmd' and an optional 'name' and 'timeout'
+    :param default_timeout: the timeout of the hooks that don't have one
+        (Default value = None)
+    :param subcmd: the subcommand for error messages (Default value = 'bump')
+    :raises VupErrorHookIsInvalid: when an entry isn't a command or a mapping
+        with one
+
+    """
+    if not hook_setting:
+        return []
+    if not isinstance(hook_setting, list):
+        hook_setting = [hook_setting]
+    hooks = []
+    for entry in hook_setting:
+        if isinstance(entry, str):
+            hooks.append(Hook(entry, entry, default_timeout))
+        elif isinstance(entry, dict) and isinstance(entry.get('cmd'), str):
+            hooks.append(
+                Hook(entry['cmd'], str(entry.get('name', entry['cmd'])),
+                     entry.get('timeout', default_timeout)))
+        else:
+            raise error.VupErrorHookIsInvalid(subcmd, entry)
+    return hooks
+
+
+def describe_failure(result):
+    """Return the name of a failed hook and why it failed
+
+    :param result: the HookResult of the hook
+
+    """
+    if result.is_timed_out:
+        reason = 'timed out after {}s'.format(result.hook.timeout)
+    else:
+        reason = 'exit code {}'.format(result.returncode)
+    return '{name} ({reason})'.format(name=result.hook.name, reason=reason)
+
+
+def _read_lines(stream, position, lines, stop):
+    """Put the lines of a stream on a queue, followed by None at the end
+
+    :param stream: the binary stdout of a hook
+    :param position: the position of the hook, put with each line
+    :param lines: the bounded queue.Queue to put the lines on
+    :param stop: threading.Event set when nobody reads the queue any more
+
+    """
+    import queue  # pylint: disable=import-outside-toplevel
+    with stream:
+        for line in iter(lambda: stream.readline(MAX_LINE_LENGTH), b''):
+            item = (position, line.decode('utf-8', 'replace').rstrip('\r\n'))
+            while not stop.is_set():
+                try:
+                    lines.put(item, timeout=POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    pass
+    while not stop.is_set():
+        try:
+            lines.put((position, None), timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            pass
+
+
+def _stop(process):
+    """Stop a hook and everything it started
+
+    :param process: the subprocess.Popen of the hook
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import signal
+    import subprocess
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except OSError:  # occurs when the process group already exited
+            pass
+        try:
+            process.wait(KILL_GRACE_PERIOD)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    else:
+        process.kill()
+    process.wait()
+
+
+class _RunningHook():
+    """A hook that has been started."""
+
+    def __init__(self, hook, position, lines, stop):
+        # pylint: disable=import-outside-toplevel
+        import subprocess
+        import threading
+        self.hook = hook
+        self.start = time.monotonic()
+        self.deadline = None
+        if hook.timeout is not None:
+            self.deadline = self.start + hook.timeout
+        self.output = collections.deque(maxlen=OUTPUT_LINES)
+        self.span = timings.span('hook', hook=hook.name, cmd=hook.cmd)
+        self.process = subprocess.Popen(
+            hook.cmd,
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=os.name == 'posix')
+        self.reader = threading.Thread(
+            target=_read_lines,
+            args=(self.process.stdout, position, lines, stop),
+            daemon=True)
+        self.reader.start()
+
+    def get_result(self, is_timed_out=False, is_cancelled=False):
+        """Wait for the hook to exit and return its HookResult
+
+        :param is_timed_out: if the hook was stopped by its timeout (Default
+            value = False)
+        :param is_cancelled: if the hook was stopped because another failed
+            (Default value = False)
+
+        """
+        if is_timed_out or is_cancelled:
+            _stop(self.process)
+        returncode = self.process.wait()
+        self.span.end(pid=self.process.pid,
+                      returncode=returncode,
+                      is_timed_out=is_timed_out,
+                      is_cancelled=is_cancelled)
+        return HookResult(self.hook, returncode,
+                          time.monotonic() - self.start, list(self.output),
+                          is_timed_out, is_cancelled)
+
+
+def _is_failure(result):
+    """
+    :param result: a HookResult
+    """
+    return ((result.returncode != 0 or result.is_timed_out)
+            and not result.is_cancelled)
+
+
+def run_hooks(hooks, jobs=None, is_dry_run=False, cancel=None):
+    """Run hooks at the same time and print their output as it arrives
+
+    :param hooks: list of Hook
+    :param jobs: the maximum number of hooks running at once (Default value =
+        None, which runs all of them at once)
+    :param is_dry_run: only print the commands (Default value = False)
+    :param cancel: threading.Event that stops the hooks when it is set
+        (Default value = None)
+    :returns: list of HookResult in the order of the hooks
+
+    """
+    for hook in hooks:
+        print(hook.cmd)
+    if is_dry_run:
+        return [HookResult(hook, 0, 0.0, [], False, False) for hook in hooks]
+
+    # pylint: disable=import-outside-toplevel
+    import queue
+    import threading
+    lines = queue.Queue(QUEUE_LINES)
+    stop = threading.Event()
+    jobs = max(1, jobs or len(hooks))
+    prefix_format = '[{}] ' if len(hooks) > 1 else ''
+    pending = collections.deque(enumerate(hooks))
+    running = {}
+    results = [None] * len(hooks)
+    try:
+        while pending or running:
+            is_stopped = any(result and _is_failure(result)
+                             for result in results)
+            is_stopped = is_stopped or (cancel is not None
+                                        and cancel.is_set())
+            while pending and len(running) < jobs and not is_stopped:
+                position, hook = pending.popleft()
+                running[position] = _RunningHook(hook, position, lines, stop)
+            if is_stopped:
+                for position, hook in pending:
+                    results[position] = HookResult(hook, None, 0.0, [], False,
+                                                   True)
+                pending.clear()
+                for position in list(running):
+                    results[position] = running.pop(position).get_result(
+                        is_cancelled=True)
+                break
+
+            try:
+                position, line = lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                position, line = None, None
+            if position in running:
+                if line is None:
+                    results[position] = running.pop(position).get_result()
+                else:
+                    running[position].output.append(line)
+                    print(prefix_format.format(hooks[position].name) + line)
+
+            now = time.monotonic()
+            for position in list(running):
+                deadline = running[position].deadline
+                if deadline is not None and now >= deadline:
+                    results[position] = running.pop(position).get_result(
+                        is_timed_out=True)
+    finally:
+        for position in list(running):
+            results[position] = running.pop(position).get_result(
+                is_cancelled=True)
+        stop.set()
+    return results
+
+
+def _skip_passed(hooks, hook_cache):
+    """Return the hooks that haven't passed before
+
+    :param hooks: list of Hook
+    :param hook_cache: the hookcache.HookCache or None
+
+    """
+    if hook_cache is None:
+        return hooks
+    hooks_to_run = []
+    for hook in hooks:
+        if hook_cache.has_passed(hook):
+            print('{} (passed before, skipped)'.format(hook.cmd))
+        else:
+            hooks_to_run.append(hook)
+    return hooks_to_run
+
+
+def _get_failure(results, hook_cache):
+    """Record the hooks that passed and return the first one that failed
+
+    :param results: list of HookResult
+    :param hook_cache: the hookcache.HookCache or None
+
+    """
+    if hook_cache is not None:
+        for result in results:
+            if result.returncode == 0 and not (result.is_timed_out
+                                               or result.is_cancelled):
+                hook_cache.record(result.hook, result.duration)
+        hook_cache.save()
+    for result in results:
+        if _is_failure(result):
+            return result
+    return None
+
+
+def run_hook_setting(hook_setting,
+                     is_dry_run,
+                     jobs=None,
+                     default_timeout=None,
+                     hook_cache=None):
+    """Run the hooks of a prehook or posthook setting
+
+    :param hook_setting: see get_hooks
+    :param is_dry_run: only print the commands
+    :param jobs: the maximum number of hooks running at once (Default value =
+        None)
+    :param default_timeout: the timeout of the hooks that don't have one
+        (Default value = None)
+    :param hook_cache: the hookcache.HookCache to skip the hooks that already
+        passed with and record the ones that pass in (Default value = None)
+    :returns: the HookResult of the hook that failed or None
+
+    """
+    hooks = _skip_passed(get_hooks(hook_setting, default_timeout), hook_cache)
+    return _get_failure(run_hooks(hooks, jobs, is_dry_run), hook_cache)
+
+
+class BackgroundHooks():
+    """Runs the hooks of a prehook or posthook setting in a thread.
+
+    The hooks can be cancelled while they run, the hooks that passed are only
+    recorded in the hook cache once wait returns.
+
+    :param hook_setting: see get_hooks
+    :param is_dry_run: only print the commands
+    :param jobs: the maximum number of hooks running at once (Default value =
+        None)
+    :param default_timeout: the timeout of the hooks that don't have one
+        (Default value = None)
+    :param hook_cache: the hookcache.HookCache to skip the hooks that already
+        passed with and record the ones that pass in (Default value = None)
+
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 hook_setting,
+                 is_dry_run,
+                 jobs=None,
+                 default_timeout=None,
+                 hook_cache=None):
+        import threading  # pylint: disable=import-outside-toplevel
+        self.hooks = get_hooks(hook_setting, default_timeout)
+        self.is_dry_run = is_dry_run
+        self.jobs = jobs
+        self.hook_cache = hook_cache
+        self.results = None
+        self.exception = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            self.results = run_hooks(self.hooks, self.jobs, self.is_dry_run,
+                                     self._cancel)
+        except BaseException as exception:  # pylint: disable=broad-except
+            self.exception = exception
+
+    def start(self):
+        """Start running the hooks that haven't passed before."""
+        self.hooks = _skip_passed(self.hooks, self.hook_cache)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop the hooks and wait until they have exited."""
+        self._cancel.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def wait(self):
+        """Wait for the hooks to finish
+
+        :returns: the HookResult of the hook that failed or None
+
+        """
+        self._thread.join()
+        if self.exception is not None:
+            raise self.exception
+        return _get_failure(self.results, self.hook_cache)
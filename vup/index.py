@@ -0,0 +1,139 @@
+"""
+A cache of where the version numbers of the version files are.
+
+The index is stored in the git directory and records for each version file its
+stat data, the locator that found the version number and the span of the
+version number. When the stat data of a file still matches, the span is read
+back from the recorded offset instead of searching the file again.
+
+Like the git index, entries for files modified in the same timestamp
+granularity as the index was written are not trusted since a later
+modification might not have changed the stat data.
+"""
+
+import os
+import json
+import tempfile
+import threading
+
+from . import scanner
+
+INDEX_FORMAT_VERSION = 1
+
+
+def get_vup_dir(repo):
+    """Return the directory vup keeps its state in for a repository
+
+    :param repo: the repository
+
+    """
+    return os.path.join(repo.git_dir, 'vup')
+
+
+def _get_stat_key(stat):
+    """
+    :param stat: os.stat_result of a version file
+    """
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+class VersionIndex():
+    """The on disk cache of version number locations."""
+
+    def __init__(self, path, work_tree):
+        self.path = path
+        self.work_tree = work_tree
+        self.entries = {}
+        self.is_modified = False
+        self.written_ns = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_repo(cls, repo):
+        """Return the index of a repository
+
+        :param repo: the repository
+
+        """
+        return cls(os.path.join(get_vup_dir(repo), 'index'),
+                   repo.working_tree_dir)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as index_file:
+                self.written_ns = os.fstat(index_file.fileno()).st_mtime_ns
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return
+        if data.get('format') == INDEX_FORMAT_VERSION:
+            self.entries = data.get('entries', {})
+
+    def _get_key(self, filename):
+        return os.path.relpath(os.path.abspath(filename), self.work_tree)
+
+    def lookup(self, filename, locator):
+        """Return the recorded span of a version file if it's still valid
+
+        :param filename: the version file
+        :param locator: the locator string the file is searched with
+        :returns: a VersionMatch or None when the file has to be searched
+
+        """
+        entry = self.entries.get(self._get_key(filename))
+        if entry is None or entry['locator'] != locator:
+            return None
+        try:
+            with open(filename, 'rb') as a_file:
+                stat = os.fstat(a_file.fileno())
+                if (_get_stat_key(stat) != entry['stat']
+                        or stat.st_mtime_ns >= self.written_ns):
+                    return None
+                a_file.seek(entry['start'])
+                text = a_file.read(entry['end'] - entry['start'])
+        except OSError:
+            return None
+        if text != entry['version'].encode('ascii'):
+            return None
+        return scanner.VersionMatch(entry['start'], entry['end'],
+                                    entry['version'])
+
+    def update(self, filename, locator, span):
+        """Record the span of the version number of a version file
+
+        :param filename: the version file
+        :param locator: the locator string the file was searched with
+        :param span: the VersionMatch of the version number
+
+        """
+        entry = {
+            'locator': locator,
+            'stat': _get_stat_key(os.stat(filename)),
+            'start': span.start,
+            'end': span.end,
+            'version': span.text,
+        }
+        with self._lock:
+            self.entries[self._get_key(filename)] = entry
+            self.is_modified = True
+
+    def save(self):
+        """Write the index to disk if it has been modified."""
+        if not self.is_modified:
+            return
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        temp_fd, temp_name = tempfile.mkstemp(prefix='.index-', dir=directory)
+        try:
+            with os.fdopen(temp_fd, 'w') as index_file:
+                json.dump({
+                    'format': INDEX_FORMAT_VERSION,
+                    'entries': self.entries
+                }, index_file)
+            os.replace(temp_name, self.path)
+            self.written_ns = os.stat(self.path).st_mtime_ns
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+        self.is_modified = False
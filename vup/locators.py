@@ -0,0 +1,365 @@
+"""
+Strategies for locating the version number in a version file.
+
+A locator is a callable that takes a filename and returns a list of
+scanner.VersionMatch objects, an empty list when the file has no version
+number and more than one match when the version number is ambiguous. They are
+created from the locator strings used in the config file:
+
+``scan`` (the default)
+    scan the whole file for the only version number in it
+``line:<number>``
+    the only version number on the given line, counting from 1
+``regex:<pattern>``
+    the first match of a multi line regex, the named group ``version`` is used
+    if there is one otherwise the whole match
+``json:<path>``
+    the string at a key path such as ``$.version`` or ``$.packages[0].version``
+``toml:<path>``
+    the string at a dotted key path such as ``project.version``
+``yaml:<path>``
+    the scalar at a dotted key path in nested block mappings
+
+The structured locators read the file through a memory map and stop as soon as
+the key is found so the rest of the document is never looked at. Only the
+subset of TOML and YAML used for simple key value pairs is understood.
+"""
+
+import re
+import mmap
+import json
+import contextlib
+
+from . import error
+from . import scanner
+
+LOCATOR_SEPARATOR = ':'
+
+JSON_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+JSON_SCALAR = re.compile(rb'[^,\]}\s]+')
+JSON_UNINTERESTING = re.compile(rb'[^"\[\]{}]*')
+
+JSON_PATH_ELEMENT = re.compile(r'\.([^.\[\]]+)|\[(\d+)\]')
+
+TOML_TABLE = re.compile(rb'\s*\[([^\[\]]+)\]\s*(#.*)?$')
+TOML_ARRAY_TABLE = re.compile(rb'\s*\[\[')
+TOML_KEY_VALUE = re.compile(
+    rb'\s*(?P<key>[A-Za-z0-9_.\-"\' ]+?)\s*=\s*'
+    rb'(?P<quote>["\'])(?P<value>[^"\'\r\n]*)(?P=quote)')
+
+YAML_KEY_VALUE = re.compile(
+    rb'(?P<indent> *)(?P<key>[^\s#:\-][^#:]*?|"[^"]*"|\'[^\']*\')\s*:'
+    rb'(?:[ \t]+(?P<value>[^\r\n]*?))?[ \t]*(?:[ \t]#[^\r\n]*)?\r?$')
+
+
+@contextlib.contextmanager
+def _mapped_file(filename):
+    """Memory map a file for reading, empty files are mapped to b''
+
+    :param filename: the file to map
+
+    """
+    with open(filename, 'rb') as a_file:
+        try:
+            buf = mmap.mmap(a_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # occurs when mapping an empty file
+            yield b''
+            return
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def _make_match(pattern, buf, start, end):
+    """Return a list with the match of buf[start:end] if it's a version number
+
+    :param pattern: compiled bytes regex matching a version number
+    :param buf: the bytes containing the version number
+    :param start: offset of the version number in buf
+    :param end: offset one past the end of the version number in buf
+
+    """
+    if pattern.fullmatch(buf, start, end) is None:
+        return []
+    return [scanner.VersionMatch(start, end, buf[start:end].decode('ascii'))]
+
+
+def _iter_lines(buf):
+    """Yield the offset and contents of each line in buf
+
+    :param buf: the bytes or memory map to split into lines
+
+    """
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b'\n', pos)
+        end = size if end < 0 else end + 1
+        yield pos, buf[pos:end]
+        pos = end
+
+
+def _split_key_path(path):
+    """Split a dotted key path, quoted parts may contain dots
+
+    :param path: the key path to split
+
+    """
+    return [
+        part.strip('"\'')
+        for part in re.findall(r'"[^"]*"|\'[^\']*\'|[^.]+', path)
+    ]
+
+
+class ScanLocator():
+    """Scan the whole file for the only version number in it."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def __call__(self, filename):
+        return scanner.scan_version(filename, self.pattern)
+
+
+class LineLocator():
+    """Find the version number on a specific line."""
+
+    def __init__(self, pattern, line_number):
+        self.pattern = pattern
+        self.line_number = line_number
+
+    def __call__(self, filename):
+        offset = 0
+        with open(filename, 'rb') as a_file:
+            for number, line in enumerate(a_file, 1):
+                if number == self.line_number:
+                    return [
+                        scanner.VersionMatch(offset + match.start(),
+                                             offset + match.end(),
+                                             match.group(0).decode('ascii'))
+                        for match in self.pattern.finditer(line)
+                    ][:2]
+                offset += len(line)
+        return []
+
+
+class RegexLocator():
+    """Find the version number with a custom regex."""
+
+    def __init__(self, pattern, regex):
+        self.pattern = pattern
+        self.regex = re.compile(regex.encode('utf-8'), re.MULTILINE)
+        self.group = 'version' if 'version' in self.regex.groupindex else 0
+
+    def __call__(self, filename):
+        with _mapped_file(filename) as buf:
+            match = self.regex.search(buf)
+            if match is None or match.start(self.group) < 0:
+                return []
+            return _make_match(self.pattern, buf, match.start(self.group),
+                               match.end(self.group))
+
+
+class JsonLocator():
+    """Find the version number at a key path of a JSON document."""
+
+    def __init__(self, pattern, path):
+        self.pattern = pattern
+        if not path.startswith('$'):
+            path = '$.' + path
+        self.keys = [
+            int(index) if index else key
+            for key, index in JSON_PATH_ELEMENT.findall(path[1:])
+        ]
+        if JSON_PATH_ELEMENT.sub('', path[1:]):
+            raise ValueError(path)
+
+    def __call__(self, filename):
+        with _mapped_file(filename) as buf:
+            pos = self._find_value(buf)
+            if pos is None:
+                return []
+            match = JSON_STRING.match(buf, pos)
+            if match is None:
+                return []
+            return _make_match(self.pattern, buf, match.start() + 1,
+                               match.end() - 1)
+
+    @staticmethod
+    def _skip_whitespace(buf, pos):
+        return JSON_WHITESPACE.match(buf, pos).end()
+
+    @staticmethod
+    def _skip_value(buf, pos):
+        """Return the position after the JSON value starting at pos
+
+        :param buf: the JSON document
+        :param pos: the start of the value
+
+        """
+        if buf[pos:pos + 1] == b'"':
+            return JSON_STRING.match(buf, pos).end()
+        if buf[pos:pos + 1] not in (b'{', b'['):
+            return JSON_SCALAR.match(buf, pos).end()
+        depth = 0
+        while True:
+            char = buf[pos:pos + 1]
+            if not char:
+                raise ValueError('unterminated JSON value')
+            if char == b'"':
+                pos = JSON_STRING.match(buf, pos).end()
+                continue
+            if char in (b'{', b'['):
+                depth += 1
+            elif char in (b'}', b']'):
+                depth -= 1
+                if not depth:
+                    return pos + 1
+            pos = JSON_UNINTERESTING.match(buf, pos + 1).end()
+
+    def _find_value(self, buf):
+        """Return the position of the value at the key path or None
+
+        :param buf: the JSON document
+
+        """
+        pos = self._skip_whitespace(buf, 0)
+        try:
+            for key in self.keys:
+                pos = self._find_element(buf, pos, key)
+                if pos is None:
+                    return None
+        except (ValueError, AttributeError):  # malformed JSON
+            return None
+        return pos
+
+    def _find_element(self, buf, pos, key):
+        """Return the position of the value of key in the container at pos
+
+        :param buf: the JSON document
+        :param pos: the start of the object or array
+        :param key: the string key of an object or the integer index of an
+            array
+
+        """
+        is_index = isinstance(key, int)
+        if buf[pos:pos + 1] != (b'[' if is_index else b'{'):
+            return None
+        pos = self._skip_whitespace(buf, pos + 1)
+        index = 0
+        while buf[pos:pos + 1] not in (b'}', b']', b''):
+            if is_index:
+                found = index == key
+            else:
+                match = JSON_STRING.match(buf, pos)
+                raw_key = match.group(0)
+                if b'\\' in raw_key:
+                    found = json.loads(raw_key.decode('utf-8')) == key
+                else:
+                    found = raw_key[1:-1] == key.encode('utf-8')
+                pos = self._skip_whitespace(buf, match.end())
+                if buf[pos:pos + 1] != b':':
+                    return None
+                pos = self._skip_whitespace(buf, pos + 1)
+            if found:
+                return pos
+            pos = self._skip_whitespace(buf, self._skip_value(buf, pos))
+            if buf[pos:pos + 1] == b',':
+                pos = self._skip_whitespace(buf, pos + 1)
+            index += 1
+        return None
+
+
+class TomlLocator():
+    """Find the version number at a dotted key path of a TOML document."""
+
+    def __init__(self, pattern, path):
+        self.pattern = pattern
+        self.keys = _split_key_path(path)
+
+    def __call__(self, filename):
+        with _mapped_file(filename) as buf:
+            table = []
+            for offset, line in _iter_lines(buf):
+                if TOML_ARRAY_TABLE.match(line):
+                    table = None
+                    continue
+                match = TOML_TABLE.match(line)
+                if match:
+                    table = _split_key_path(
+                        match.group(1).decode('utf-8').strip())
+                    continue
+                match = TOML_KEY_VALUE.match(line)
+                if match and table is not None:
+                    key = _split_key_path(match.group('key').decode('utf-8'))
+                    if table + key == self.keys:
+                        return _make_match(self.pattern, buf,
+                                           offset + match.start('value'),
+                                           offset + match.end('value'))
+        return []
+
+
+class YamlLocator():
+    """Find the version number at a dotted key path of a YAML document."""
+
+    def __init__(self, pattern, path):
+        self.pattern = pattern
+        self.keys = _split_key_path(path)
+
+    def __call__(self, filename):
+        with _mapped_file(filename) as buf:
+            parents = []
+            for offset, line in _iter_lines(buf):
+                match = YAML_KEY_VALUE.match(line)
+                if not match:
+                    continue
+                indent = len(match.group('indent'))
+                while parents and parents[-1][0] >= indent:
+                    parents.pop()
+                key = match.group('key').decode('utf-8').strip('"\'')
+                path = [parent[1] for parent in parents] + [key]
+                if path == self.keys:
+                    return self._value_match(buf, offset, match)
+                if not match.group('value'):
+                    parents.append((indent, key))
+        return []
+
+    def _value_match(self, buf, offset, match):
+        if match.start('value') < 0:
+            return []
+        start = offset + match.start('value')
+        end = offset + match.end('value')
+        if end - start >= 2 and buf[start:start + 1] in (b'"', b"'") and \
+                buf[end - 1:end] == buf[start:start + 1]:
+            start += 1
+            end -= 1
+        return _make_match(self.pattern, buf, start, end)
+
+
+LOCATOR_TYPES = {
+    'line': lambda pattern, arg: LineLocator(pattern, int(arg)),
+    'regex': RegexLocator,
+    'json': JsonLocator,
+    'toml': TomlLocator,
+    'yaml': YamlLocator,
+}
+
+
+def get_locator(spec, pattern):
+    """Create the locator described by a locator string
+
+    :param spec: the locator string, None or 'scan' for the default scan of
+        the whole file
+    :param pattern: compiled bytes regex matching a version number
+    :raises VupErrorInvalidLocator: when the locator string is not valid
+
+    """
+    if spec is None or spec == 'scan':
+        return ScanLocator(pattern)
+    kind, _, arg = str(spec).partition(LOCATOR_SEPARATOR)
+    try:
+        return LOCATOR_TYPES[kind.strip()](pattern, arg.strip())
+    except (KeyError, ValueError, re.error):
+        raise error.VupErrorInvalidLocator('bump', spec)
@@ -0,0 +1,235 @@
+"""
+A bump computed ahead of time that can be written as JSON and applied later.
+
+A plan has everything a bump decides before it changes anything: the versions
+of each package, the position of the version number in each version file,
+the commit messages, the tags and the hooks. It also records the state of the
+repository it was made for, the SHA of the HEAD commit, of its tree and of the
+tree of the index as ``git write-tree`` computes it. Unlike a checksum of the
+index file itself the tree of the index is the same in every clone, so a plan
+made on one machine can be applied on another.
+
+Applying a plan only checks that state and that the contents of each version
+file still have the SHA-256 recorded in the plan, so the version number is
+still at the recorded position and nothing else in the file changed. It
+doesn't search the files again.
+"""
+
+import os
+import json
+import hashlib
+import collections
+
+from . import error
+from .scanner import CHUNK_SIZE
+
+PLAN_FORMAT_VERSION = 2
+
+FileEdit = collections.namedtuple(
+    'FileEdit',
+    ['path', 'locator', 'start', 'end', 'size', 'version', 'sha256'])
+FileEdit.__doc__ = """Where the version number of a version file is.
+
+:param path: the path of the file relative to the work tree, separated by /
+:param locator: the locator string the file was searched with
+:param start: byte offset of the first character of the version number
+:param end: byte offset one past the last character of the version number
+:param size: the size of the file in bytes
+:param version: the version number in the file
+:param sha256: the SHA-256 of the contents of the file as a hex string, or
+    None until the plan is written
+"""
+
+PackagePlan = collections.namedtuple('PackagePlan', [
+    'name', 'tag_prefix', 'current_version', 'release_version',
+    'prerelease_version', 'files'
+])
+PackagePlan.__doc__ = """The version change of a package.
+
+:param name: the name of the package or None
+:param tag_prefix: the prefix of the tag name
+:param current_version: the version in the version files
+:param release_version: the version to commit and tag
+:param prerelease_version: the version to commit after the tag
+:param files: list of FileEdit of the version files
+"""
+
+
+def hash_file(filename, chunk_size=CHUNK_SIZE):
+    """Return the SHA-256 of the contents of a file as a hex string
+
+    :param filename: the file to hash
+    :param chunk_size: number of bytes to read at a time (Default value =
+        CHUNK_SIZE)
+
+    """
+    sha256 = hashlib.sha256()
+    with open(filename, 'rb') as a_file:
+        for chunk in iter(lambda: a_file.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_repo_state(repo):
+    """Return the SHAs a plan is made for
+
+    :param repo: the repository
+    :returns: dict with the 'head' commit, its 'tree' and the tree of the
+        'index', the SHAs are None when there is no commit
+
+    """
+    try:
+        head_commit = repo.head.commit
+    except ValueError:  # occurs when there are no commits in a repository
+        return {'head': None, 'tree': None, 'index': None}
+    return {
+        'head': head_commit.hexsha,
+        'tree': head_commit.tree.hexsha,
+        'index': repo.git.write_tree(),
+    }
+
+
+class Plan():
+    """A bump that can be written as JSON and applied later.
+
+    :param packages: list of PackagePlan
+    :param release_commit_message: the message of the release commit
+    :param prerelease_commit_message: the message of the pre-release commit
+    :param repo_state: the SHAs of the repository the plan is for, see
+        get_repo_state (Default value = None)
+    :param hook_settings: dict of the 'prehook', 'posthook', 'hook_jobs' and
+        'hook_timeout' settings (Default value = None)
+
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 packages,
+                 release_commit_message,
+                 prerelease_commit_message,
+                 repo_state=None,
+                 hook_settings=None):
+        self.packages = packages
+        self.release_commit_message = release_commit_message
+        self.prerelease_commit_message = prerelease_commit_message
+        self.repo_state = repo_state
+        self.hook_settings = hook_settings or {}
+
+    @property
+    def tag_names(self):
+        """The names of the tags of the release versions."""
+        return [
+            package.tag_prefix + package.release_version
+            for package in self.packages
+        ]
+
+    @property
+    def file_paths(self):
+        """The paths of all the version files relative to the work tree."""
+        return [
+            edit.path for package in self.packages for edit in package.files
+        ]
+
+    def record_hashes(self, work_tree):
+        """Record the SHA-256 of each version file, which is only needed for
+        a plan that is written to be applied later
+
+        :param work_tree: the work tree of the repository
+
+        """
+        self.packages = [
+            package._replace(files=[
+                edit._replace(
+                    sha256=hash_file(os.path.join(work_tree, edit.path)))
+                for edit in package.files
+            ]) for package in self.packages
+        ]
+
+    def to_dict(self):
+        """Return the plan as JSON serializable data."""
+        return {
+            'format': PLAN_FORMAT_VERSION,
+            'repo_state': self.repo_state,
+            'hooks': self.hook_settings,
+            'release_commit_message': self.release_commit_message,
+            'prerelease_commit_message': self.prerelease_commit_message,
+            'tags': self.tag_names,
+            'packages': [
+                dict(package._asdict(),
+                     files=[edit._asdict() for edit in package.files])
+                for package in self.packages
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, filename='plan'):
+        """Create a plan from the data of to_dict
+
+        :param data: the data
+        :param filename: the file the data was read from, for the error
+            message (Default value = 'plan')
+        :raises VupErrorPlanIsInvalid: when the data isn't a plan of this
+            version of vup
+
+        """
+        try:
+            if data['format'] != PLAN_FORMAT_VERSION:
+                raise error.VupErrorPlanIsInvalid('apply', filename)
+            packages = [
+                PackagePlan(**dict(
+                    package,
+                    files=[FileEdit(**edit) for edit in package['files']]))
+                for package in data['packages']
+            ]
+            return cls(packages, data['release_commit_message'],
+                       data['prerelease_commit_message'], data['repo_state'],
+                       data['hooks'])
+        except (KeyError, TypeError):
+            raise error.VupErrorPlanIsInvalid('apply', filename)
+
+    def save(self, filename):
+        """Write the plan to a JSON file
+
+        :param filename: the file to write
+
+        """
+        with open(filename, 'w') as plan_file:
+            json.dump(self.to_dict(), plan_file, indent=2)
+            plan_file.write('\n')
+
+    @classmethod
+    def load(cls, filename):
+        """Read a plan from a JSON file
+
+        :param filename: the file to read
+        :raises VupErrorPlanIsInvalid: when the file is not a plan
+
+        """
+        try:
+            with open(filename, 'r') as plan_file:
+                data = json.load(plan_file)
+        except (OSError, ValueError):
+            raise error.VupErrorPlanIsInvalid('apply', filename)
+        return cls.from_dict(data, filename)
+
+    def check(self, repo):
+        """Check that the repository is still in the state the plan is for
+
+        :param repo: the repository
+        :raises VupErrorPlanIsStale: when a SHA or the contents of a version
+            file changed
+
+        """
+        repo_state = get_repo_state(repo)
+        for key in ('head', 'tree', 'index'):
+            if repo_state[key] != self.repo_state.get(key):
+                raise error.VupErrorPlanIsStale('apply', key)
+        for package in self.packages:
+            for edit in package.files:
+                filename = os.path.join(repo.working_tree_dir, edit.path)
+                try:
+                    sha256 = hash_file(filename)
+                except OSError:
+                    raise error.VupErrorPlanIsStale('apply', edit.path)
+                if sha256 != edit.sha256:
+                    raise error.VupErrorPlanIsStale('apply', edit.path)
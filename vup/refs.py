@@ -0,0 +1,140 @@
+"""
+Direct lookup of git references without listing all of them.
+
+A reference either exists as a loose file under the refs directory or as a
+line in the packed-refs file. Git writes packed-refs sorted by reference name
+and says so in its header, so it can be binary searched through a memory map
+instead of being parsed in full. Files without the sorted trait in their
+header are searched line by line.
+"""
+
+import os
+import mmap
+
+PACKED_REFS_HEADER = b'# pack-refs with:'
+SORTED_TRAIT = b' sorted '
+
+
+def get_common_dir(git_dir):
+    """Return the git directory shared by all the work trees of a repository
+
+    :param git_dir: the git directory of a work tree
+
+    """
+    try:
+        with open(os.path.join(git_dir, 'commondir')) as commondir_file:
+            common_dir = commondir_file.read().strip()
+    except OSError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, common_dir))
+
+
+def _get_record_start(buf, low, pos):
+    """Return the start of the record containing pos, skipping peeled lines
+
+    :param buf: the packed-refs contents
+    :param low: offset before which no record starts
+    :param pos: an offset inside the record
+
+    """
+    pos = buf.rfind(b'\n', low, pos) + 1 or low
+    while buf[pos:pos + 1] == b'^' and pos > low:
+        pos = buf.rfind(b'\n', low, pos - 1) + 1 or low
+    return pos
+
+
+def _get_next_record(buf, pos):
+    """Return the start of the record after the one at pos
+
+    :param buf: the packed-refs contents
+    :param pos: the start of a record
+
+    """
+    pos = buf.find(b'\n', pos) + 1 or len(buf)
+    while buf[pos:pos + 1] == b'^':
+        pos = buf.find(b'\n', pos) + 1 or len(buf)
+    return pos
+
+
+def _get_refname(buf, pos):
+    """Return the reference name of the record at pos
+
+    :param buf: the packed-refs contents
+    :param pos: the start of a record
+
+    """
+    end = buf.find(b'\n', pos)
+    line = buf[pos:end if end >= 0 else len(buf)]
+    return line.partition(b' ')[2].rstrip(b'\r')
+
+
+def _search_packed_refs(buf, refname):
+    """
+    :param buf: the packed-refs contents
+    :param refname: the reference name to find as bytes
+    """
+    header_end = 0
+    if buf[:len(PACKED_REFS_HEADER)] == PACKED_REFS_HEADER:
+        header_end = buf.find(b'\n') + 1 or len(buf)
+    header = buf[:header_end].rstrip(b'\r\n') + b' '
+    if SORTED_TRAIT not in header:
+        return any(
+            _get_refname(line, 0) == refname
+            for line in buf[header_end:].split(b'\n'))
+    low = header_end
+    high = len(buf)
+    while low < high:
+        pos = _get_record_start(buf, low, low + (high - low) // 2)
+        record_refname = _get_refname(buf, pos)
+        if record_refname == refname:
+            return True
+        if record_refname < refname:
+            low = _get_next_record(buf, pos)
+        else:
+            high = pos
+    return False
+
+
+def packed_ref_exists(packed_refs, refname):
+    """Check if a reference is in a packed-refs file
+
+    :param packed_refs: path to the packed-refs file
+    :param refname: full name of the reference, e.g. refs/tags/1.0.0
+
+    """
+    try:
+        with open(packed_refs, 'rb') as packed_refs_file:
+            try:
+                buf = mmap.mmap(
+                    packed_refs_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # occurs when mapping an empty file
+                return False
+    except OSError:
+        return False
+    try:
+        return _search_packed_refs(buf, refname.encode('utf-8'))
+    finally:
+        buf.close()
+
+
+def ref_exists(git_dir, refname):
+    """Check if a reference exists, either loose or packed
+
+    :param git_dir: the git directory of the repository
+    :param refname: full name of the reference, e.g. refs/tags/1.0.0
+
+    """
+    common_dir = get_common_dir(git_dir)
+    if os.path.isfile(os.path.join(common_dir, *refname.split('/'))):
+        return True
+    return packed_ref_exists(os.path.join(common_dir, 'packed-refs'), refname)
+
+
+def tag_exists(git_dir, name):
+    """Check if a tag exists
+
+    :param git_dir: the git directory of the repository
+    :param name: the name of the tag
+
+    """
+    return ref_exists(git_dir, 'refs/tags/' + str(name))
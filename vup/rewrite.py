@@ -0,0 +1,144 @@
+"""
+Rewriting of version numbers at the offsets found when the file was scanned.
+
+When the new version number has the same length as the old one the bytes are
+patched in place, otherwise the file is copied once to a temporary file with
+the replacement spliced in, which is then renamed over the original. A
+symlinked version file is rewritten at the file it points to, so the link
+and the mode of the file are kept. Neither path flushes to disk, that is
+done for all the modified files at once by sync_files.
+"""
+
+import os
+import shutil
+import tempfile
+
+from .scanner import CHUNK_SIZE
+
+
+def _copy_bytes(src, dst, count, chunk_size):
+    """Copy count bytes from src to dst
+
+    :param src: file object to read from
+    :param dst: file object to write to
+    :param count: number of bytes to copy
+    :param chunk_size: number of bytes to copy at a time
+
+    """
+    while count > 0:
+        chunk = src.read(min(count, chunk_size))
+        if not chunk:
+            break
+        dst.write(chunk)
+        count -= len(chunk)
+
+
+def replace_span(filename, span, replacement, chunk_size=CHUNK_SIZE):
+    """Replace the bytes of a file between span.start and span.end
+
+    :param filename: the file to modify
+    :param span: the VersionMatch to replace
+    :param replacement: the bytes to put in place of the span
+    :param chunk_size: number of bytes to copy at a time when the file has to
+        be rewritten (Default value = CHUNK_SIZE)
+    :returns: the VersionMatch of the replacement
+
+    """
+    return replace_spans(filename, [(span, replacement)], chunk_size)[0]
+
+
+def replace_spans(filename, replacements, chunk_size=CHUNK_SIZE):
+    """Replace several spans of a file at once
+
+    The offsets of all the spans are those of the file before any of them is
+    replaced, replacements of the same span are only made once.
+
+    :param filename: the file to modify
+    :param replacements: list of (VersionMatch, bytes) tuples, the spans
+        must not overlap unless they are the same
+    :param chunk_size: number of bytes to copy at a time when the file has to
+        be rewritten (Default value = CHUNK_SIZE)
+    :returns: list of the VersionMatch of each replacement in the modified
+        file, in the order of the replacements
+
+    """
+    replacements = list(replacements)
+    ordered = sorted(set(replacements), key=lambda item: item[0].start)
+    for (span, _), (next_span, _) in zip(ordered, ordered[1:]):
+        if next_span.start < span.end:
+            raise ValueError('overlapping spans {} and {}'.format(
+                span, next_span))
+
+    if all(len(replacement) == span.end - span.start
+           for span, replacement in ordered):
+        with open(filename, 'r+b') as a_file:
+            for span, replacement in ordered:
+                a_file.seek(span.start)
+                a_file.write(replacement)
+    else:
+        _rewrite(filename, ordered, chunk_size)
+
+    new_spans = {}
+    shift = 0
+    for span, replacement in ordered:
+        new_spans[span, replacement] = span._replace(
+            start=span.start + shift,
+            end=span.start + shift + len(replacement),
+            text=replacement.decode('ascii'))
+        shift += len(replacement) - (span.end - span.start)
+    return [new_spans[item] for item in replacements]
+
+
+def _rewrite(filename, replacements, chunk_size):
+    """Copy a file to a temporary file with the replacements spliced in and
+    rename it over the file
+
+    :param filename: the file to modify
+    :param replacements: list of (VersionMatch, bytes) tuples sorted by
+        offset
+    :param chunk_size: number of bytes to copy at a time
+
+    """
+    # the rename would replace a symlink with a regular file
+    filename = os.path.realpath(filename)
+    directory = os.path.dirname(filename)
+    temp_fd, temp_name = tempfile.mkstemp(prefix='.vup-', dir=directory)
+    try:
+        with open(filename, 'rb') as src, os.fdopen(temp_fd, 'wb') as dst:
+            position = 0
+            for span, replacement in replacements:
+                _copy_bytes(src, dst, span.start - position, chunk_size)
+                dst.write(replacement)
+                src.seek(span.end)
+                position = span.end
+            shutil.copyfileobj(src, dst, chunk_size)
+        shutil.copymode(filename, temp_name)
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def sync_files(filenames):
+    """Flush the given files and the directories containing them to disk
+
+    :param filenames: the files to flush
+
+    """
+    directories = set()
+    for a_file in filenames:
+        with open(a_file, 'rb') as file_handle:
+            os.fsync(file_handle.fileno())
+        directories.add(os.path.dirname(os.path.realpath(a_file)))
+
+    # directories can't be opened for fsync on Windows, the renames are
+    # flushed along with the files there
+    if os.name == 'nt':
+        return
+    for directory in sorted(directories):
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
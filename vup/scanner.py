@@ -0,0 +1,111 @@
+"""
+Bounded memory scanning of files for version numbers.
+
+Files are read as bytes in fixed size chunks. A version number can only
+consist of the characters in ``TOKEN_CHARS`` so each chunk is split after the
+last character that is not one of them, anything after that point could be
+the start of a version number that continues in the next chunk and is carried
+over. Only the positions and text of the matches are kept.
+
+A run of token characters longer than ``MAX_TOKEN_SIZE`` bytes, e.g. a line of
+base64 or minified code, is too long to be a version number and nothing in it
+is reported, wherever the chunk boundaries fall. So the carried over part is
+at most that long, a longer one is dropped and the rest of its run skipped,
+and memory use stays bounded by the chunk size for any file.
+"""
+
+import collections
+
+CHUNK_SIZE = 1024 * 1024
+MAX_TOKEN_SIZE = 1024
+
+TOKEN_CHARS = (b'0123456789'
+               b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+               b'abcdefghijklmnopqrstuvwxyz'
+               b'.+-')
+
+VersionMatch = collections.namedtuple('VersionMatch', ['start', 'end', 'text'])
+VersionMatch.__doc__ = """A version number found in a file.
+
+:param start: byte offset of the first character of the version number
+:param end: byte offset one past the last character of the version number
+:param text: the version number as a string
+"""
+
+
+def _get_run_size(buf, match, max_token_size):
+    """Return the size of the run of token characters a match is part of, or
+    a size over max_token_size when the run is longer than that
+
+    Only max_token_size bytes on either side of the match are looked at, the
+    run has to be in buf completely.
+
+    :param buf: the bytes the match was found in
+    :param match: the match of the version pattern
+    :param max_token_size: runs of token characters longer than this are
+        skipped
+
+    """
+    before = buf[max(0, match.start() - max_token_size):match.start()]
+    after = buf[match.end():match.end() + max_token_size]
+    return (len(before) - len(before.rstrip(TOKEN_CHARS))
+            + match.end() - match.start()
+            + len(after) - len(after.lstrip(TOKEN_CHARS)))
+
+
+def scan_version(filename,
+                 pattern,
+                 limit=2,
+                 chunk_size=CHUNK_SIZE,
+                 max_token_size=MAX_TOKEN_SIZE):
+    """Find the version numbers in a file without reading all of it at once.
+
+    :param filename: the file to scan
+    :param pattern: compiled bytes regex matching a version number
+    :param limit: stop scanning once this many matches have been found
+        (Default value = 2)
+    :param chunk_size: number of bytes to read at a time (Default value =
+        CHUNK_SIZE)
+    :param max_token_size: runs of token characters longer than this are
+        skipped (Default value = MAX_TOKEN_SIZE)
+    :returns: list of at most limit VersionMatch objects in file order
+
+    """
+    found_versions = []
+    with open(filename, 'rb') as a_file:
+        base = 0
+        buf = b''
+        is_skipping = False
+        while True:
+            chunk = a_file.read(chunk_size)
+            at_eof = not chunk
+            if is_skipping:
+                rest = chunk.lstrip(TOKEN_CHARS)
+                base += len(chunk) - len(rest)
+                chunk = rest
+                is_skipping = not chunk and not at_eof
+                if is_skipping:
+                    continue
+            buf += chunk
+            if at_eof:
+                cut = len(buf)
+            else:
+                cut = len(buf.rstrip(TOKEN_CHARS))
+            for match in pattern.finditer(buf, 0, cut):
+                if _get_run_size(buf, match, max_token_size) > max_token_size:
+                    continue
+                found_versions.append(
+                    VersionMatch(base + match.start(), base + match.end(),
+                                 match.group(0).decode('ascii')))
+                if len(found_versions) >= limit:
+                    return found_versions
+            if at_eof:
+                return found_versions
+            base += cut
+            buf = buf[cut:]
+            if len(buf) > max_token_size:
+                # the run of token characters is too long to be a version
+                # number, drop it and the rest of it in the next chunks
+                base += len(buf)
+                buf = b''
+                is_skipping = True
@@ -0,0 +1,239 @@
+"""
+Searching the tracked files for stray copies of the current version.
+
+The files of HEAD are first filtered with a literal search for the versions by
+``git grep -F``, which reads the blobs of the tree in bulk without checking
+out or opening any file, and skips binary files by the same NUL byte
+heuristic git uses everywhere else. Only the files it lists are looked at
+again: their sizes are read with one ``git cat-file --batch-check`` so that
+files larger than the maximum size are skipped, and the rest are split into
+batches searched on a process pool. Each batch reads its blobs with a single
+``git cat-file --batch`` and searches them with the version regex, which makes
+sure e.g. 11.0.0 or 1.0.0-beta are not reported for 1.0.0.
+
+The committed contents are searched, like the rest of vup the scan expects a
+clean work tree.
+"""
+
+import os
+import tempfile
+import subprocess
+import collections
+
+DEFAULT_MAX_SIZE = 1024 * 1024
+BINARY_CHECK_SIZE = 8000
+BATCH_SIZE = 1000
+BATCH_BYTES = 16 * 1024 * 1024
+
+ScanHit = collections.namedtuple('ScanHit', ['path', 'line', 'version'])
+ScanHit.__doc__ = """A version found in a tracked file.
+
+:param path: the path of the file relative to the work tree
+:param line: the number of the line, counting from 1
+:param version: the version as a string
+"""
+
+
+def _run_git(git_dir, args, input_lines=()):
+    """Run git and return its output and exit code
+
+    The input is passed as a file, so the output can be read in one go
+    instead of polling two pipes.
+
+    :param git_dir: the git directory of the repository
+    :param args: the arguments of git
+    :param input_lines: the lines of the input as bytes (Default value = ())
+
+    """
+    with tempfile.TemporaryFile() as input_file:
+        input_file.write(b''.join(line + b'\n' for line in input_lines))
+        input_file.seek(0)
+        process = subprocess.Popen(['git', '--git-dir', git_dir] + list(args),
+                                   stdin=input_file,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL)
+        with process.stdout:
+            output = process.stdout.read()
+        return output, process.wait()
+
+
+def find_candidates(git_dir, commit, versions):
+    """Return the text files of a commit containing one of the versions
+
+    :param git_dir: the git directory of the repository
+    :param commit: the SHA of the commit
+    :param versions: the versions to find as bytes
+    :returns: the paths of the files relative to the work tree
+
+    """
+    args = ['grep', '-I', '-l', '-z', '-F', '--full-name', '--no-color']
+    for version in sorted(versions):
+        args.extend(['-e', os.fsdecode(version)])
+    output, exit_code = _run_git(git_dir, args + [commit, '--'])
+    # git grep exits with 1 when nothing matched
+    if exit_code not in (0, 1):
+        raise subprocess.CalledProcessError(exit_code, ['git'] + args)
+    prefix = commit.encode('ascii') + b':'
+    return [
+        os.fsdecode(entry[len(prefix):]) for entry in output.split(b'\0')
+        if entry
+    ]
+
+
+def get_blobs(git_dir, commit, paths, max_size=DEFAULT_MAX_SIZE):
+    """Return the SHA and size of the files that are small enough to search
+
+    :param git_dir: the git directory of the repository
+    :param commit: the SHA of the commit
+    :param paths: the paths of the files relative to the work tree
+    :param max_size: files larger than this many bytes are skipped (Default
+        value = DEFAULT_MAX_SIZE)
+    :returns: list of (path, SHA, size) tuples
+
+    """
+    # a path with a newline can't be given to git cat-file
+    paths = [path for path in paths if '\n' not in path]
+    output, _ = _run_git(git_dir, ['cat-file', '--batch-check'], [
+        commit.encode('ascii') + b':' + os.fsencode(path) for path in paths
+    ])
+    blobs = []
+    for path, line in zip(paths, output.split(b'\n')):
+        fields = line.split(b' ')
+        if len(fields) == 3 and fields[1] == b'blob' and \
+                int(fields[2]) <= max_size:
+            blobs.append((path, fields[0].decode('ascii'), int(fields[2])))
+    return blobs
+
+
+def get_batches(blobs, batch_size=BATCH_SIZE, batch_bytes=BATCH_BYTES):
+    """Split the blobs into batches of at most batch_size files and about
+    batch_bytes bytes
+
+    :param blobs: list of (path, SHA, size) tuples
+    :param batch_size: the most files in a batch (Default value = BATCH_SIZE)
+    :param batch_bytes: the size of the files in a batch after which no file
+        is added (Default value = BATCH_BYTES)
+
+    """
+    batch = []
+    total = 0
+    for blob in blobs:
+        batch.append(blob)
+        total += blob[2]
+        if len(batch) >= batch_size or total >= batch_bytes:
+            yield batch
+            batch = []
+            total = 0
+    if batch:
+        yield batch
+
+
+def _split_batch(output, count):
+    """Return the contents of the blobs in the output of git cat-file --batch
+
+    :param output: the output of git cat-file --batch
+    :param count: the number of blobs in it
+
+    """
+    contents = []
+    pos = 0
+    for _ in range(count):
+        header_end = output.index(b'\n', pos)
+        size = int(output[output.rindex(b' ', pos, header_end) + 1:header_end])
+        contents.append(output[header_end + 1:header_end + 1 + size])
+        pos = header_end + 2 + size
+    return contents
+
+
+def search_data(data, versions, pattern):
+    """Return the line and text of the versions in the contents of a file
+
+    :param data: the contents of the file
+    :param versions: the versions to find as bytes
+    :param pattern: compiled bytes regex matching a version number
+    :returns: list of (line, version) tuples
+
+    """
+    if b'\0' in data[:BINARY_CHECK_SIZE]:
+        return []
+    if not any(version in data for version in versions):
+        return []
+    found = []
+    line = 1
+    line_start = 0
+    for match in pattern.finditer(data):
+        if match.group(0) not in versions:
+            continue
+        line += data.count(b'\n', line_start, match.start())
+        line_start = match.start()
+        found.append((line, match.group(0).decode('ascii')))
+    return found
+
+
+def search_batch(git_dir, batch, versions, pattern):
+    """Search a batch of blobs, run on the process pool
+
+    :param git_dir: the git directory of the repository
+    :param batch: list of (path, SHA, size) tuples
+    :param versions: the versions to find as bytes
+    :param pattern: compiled bytes regex matching a version number
+    :returns: list of ScanHit
+
+    """
+    output, _ = _run_git(git_dir, ['cat-file', '--batch'],
+                         [sha.encode('ascii') for _, sha, _ in batch])
+    hits = []
+    for (path, _, _), data in zip(batch, _split_batch(output, len(batch))):
+        for line, version in search_data(data, versions, pattern):
+            hits.append(ScanHit(path, line, version))
+    return hits
+
+
+def search(repo, commit, versions, pattern, max_size=DEFAULT_MAX_SIZE,
+           jobs=None):
+    """Search the tracked files of a commit for versions
+
+    :param repo: the repository
+    :param commit: the SHA of the commit
+    :param versions: the version strings to find
+    :param pattern: compiled bytes regex matching a version number
+    :param max_size: files larger than this many bytes are skipped (Default
+        value = DEFAULT_MAX_SIZE)
+    :param jobs: the number of processes (Default value = None, which is the
+        number of CPUs)
+    :returns: list of ScanHit sorted by path and line
+
+    """
+    versions = frozenset(version.encode('ascii') for version in versions)
+    git_dir = repo.git_dir
+    blobs = get_blobs(git_dir, commit,
+                      find_candidates(git_dir, commit, versions), max_size)
+    batches = list(get_batches(blobs))
+    if len(batches) <= 1 or jobs == 1:
+        results = [
+            search_batch(git_dir, batch, versions, pattern)
+            for batch in batches
+        ]
+    else:
+        import concurrent.futures  # pylint: disable=import-outside-toplevel
+        with concurrent.futures.ProcessPoolExecutor(
+                min(jobs or os.cpu_count() or 1, len(batches))) as executor:
+            results = list(
+                executor.map(search_batch, [git_dir] * len(batches), batches,
+                             [versions] * len(batches),
+                             [pattern] * len(batches)))
+    return sorted(hit for hits in results for hit in hits)
+
+
+def propose_version_files(hits):
+    """Return version file entries for the files with one hit
+
+    :param hits: list of ScanHit
+    :returns: list of mappings with a 'path' and a 'line:' 'locator'
+
+    """
+    counts = collections.Counter(hit.path for hit in hits)
+    return [{
+        'path': hit.path,
+        'locator': 'line:{}'.format(hit.line)
+    } for hit in hits if counts[hit.path] == 1]
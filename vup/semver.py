@@ -0,0 +1,219 @@
+"""
+An immutable semantic version number.
+
+Versions are compared through a sort key that is computed once when the
+version is created, so sorting many versions does not call back into Python
+for every comparison when the key is used directly:
+
+    sorted(versions, key=operator.attrgetter('sort_key'))
+
+Parsing is cached, parsing the same string again returns the same object.
+"""
+
+import re
+import functools
+
+NUMBER_REGEX = r'(?:0|[1-9]\d*)'
+PRERELEASE_IDENTIFIER_REGEX = r'(?:0|[1-9]\d*|\d*[A-Za-z-][\dA-Za-z-]*)'
+BUILD_IDENTIFIER_REGEX = r'[\dA-Za-z-]+'
+
+VERSION_PATTERN = re.compile(
+    r'({number})\.({number})\.({number})'
+    r'(?:-({prerelease}(?:\.{prerelease})*))?'
+    r'(?:\+({build}(?:\.{build})*))?'.format(
+        number=NUMBER_REGEX,
+        prerelease=PRERELEASE_IDENTIFIER_REGEX,
+        build=BUILD_IDENTIFIER_REGEX), re.ASCII)
+
+PARSE_CACHE_SIZE = 4096
+
+
+def _get_prerelease_key(prerelease):
+    """Return the precedence of a pre-release
+
+    A version without a pre-release has a higher precedence than one with a
+    pre-release, numeric identifiers have a lower precedence than alphanumeric
+    ones.
+
+    :param prerelease: tuple of pre-release identifiers
+
+    """
+    if not prerelease:
+        return (1, )
+    return (0, ) + tuple((0, int(identifier),
+                          '') if identifier.isdigit() else (1, 0, identifier)
+                         for identifier in prerelease)
+
+
+class Version():
+    """A semantic version number.
+
+    :param major: the major version number
+    :param minor: the minor version number
+    :param patch: the patch version number
+    :param prerelease: tuple of pre-release identifiers (Default value = ())
+    :param build: tuple of build metadata identifiers (Default value = ())
+
+    """
+
+    __slots__ = ('major', 'minor', 'patch', 'prerelease', 'build', 'sort_key')
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, major, minor, patch, prerelease=(), build=()):
+        prerelease = tuple(prerelease)
+        build = tuple(build)
+        set_slot = object.__setattr__
+        set_slot(self, 'major', major)
+        set_slot(self, 'minor', minor)
+        set_slot(self, 'patch', patch)
+        set_slot(self, 'prerelease', prerelease)
+        set_slot(self, 'build', build)
+        # build metadata has no precedence, it only keeps the order total
+        set_slot(self, 'sort_key', (major, minor, patch,
+                                    _get_prerelease_key(prerelease), build))
+
+    @property
+    def parts(self):
+        """The tuple of major, minor, patch, prerelease and build."""
+        return (self.major, self.minor, self.patch, self.prerelease,
+                self.build)
+
+    @property
+    def precedence_key(self):
+        """The sort key without the build metadata."""
+        return self.sort_key[:4]
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Version is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Version is immutable')
+
+    def __reduce__(self):
+        return (Version, self.parts)
+
+    def __str__(self):
+        text = '{}.{}.{}'.format(self.major, self.minor, self.patch)
+        if self.prerelease:
+            text += '-' + '.'.join(self.prerelease)
+        if self.build:
+            text += '+' + '.'.join(self.build)
+        return text
+
+    def __repr__(self):
+        return 'Version({!r})'.format(str(self))
+
+    def __hash__(self):
+        return hash(self.sort_key)
+
+    def __eq__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key == other.sort_key
+
+    def __ne__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key != other.sort_key
+
+    def __lt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
+
+    def replace(self, **changes):
+        """Return a copy of the version with some of the parts changed
+
+        :param changes: new values of major, minor, patch, prerelease or build
+
+        """
+        parts = dict(
+            zip(('major', 'minor', 'patch', 'prerelease', 'build'),
+                self.parts))
+        parts.update(changes)
+        return Version(**parts)
+
+    def next_major(self):
+        """Return the next major version without pre-release or build.
+
+        The next major version of a pre-release of a major version, such as
+        2.0.0-beta, is that major version.
+        """
+        if self.prerelease and self.minor == 0 and self.patch == 0:
+            return Version(self.major, 0, 0)
+        return Version(self.major + 1, 0, 0)
+
+    def next_minor(self):
+        """Return the next minor version without pre-release or build.
+
+        The next minor version of a pre-release of a minor version, such as
+        1.2.0-beta, is that minor version.
+        """
+        if self.prerelease and self.patch == 0:
+            return Version(self.major, self.minor, 0)
+        return Version(self.major, self.minor + 1, 0)
+
+    def next_patch(self):
+        """Return the next patch version without pre-release or build.
+
+        The next patch version of a pre-release, such as 1.2.3-beta, is the
+        version without the pre-release.
+        """
+        if self.prerelease:
+            return Version(self.major, self.minor, self.patch)
+        return Version(self.major, self.minor, self.patch + 1)
+
+    def to_semantic_version(self):
+        """Return the version as a semantic_version.Version."""
+        import semantic_version  # pylint: disable=import-outside-toplevel
+        try:
+            return semantic_version.Version(
+                major=self.major,
+                minor=self.minor,
+                patch=self.patch,
+                prerelease=self.prerelease,
+                build=self.build)
+        except TypeError:  # semantic_version before 2.7 only parses strings
+            return semantic_version.Version(str(self))
+
+    @classmethod
+    def from_semantic_version(cls, version):
+        """Return the Version of a semantic_version.Version
+
+        :param version: a semantic_version.Version
+
+        """
+        return cls(version.major, version.minor, version.patch,
+                   version.prerelease or (), version.build or ())
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(text):
+    """Return the Version of a version string
+
+    :param text: the version string, such as 1.2.3-beta.1+build.5
+    :raises ValueError: when the string is not a semantic version
+
+    """
+    match = VERSION_PATTERN.fullmatch(text)
+    if match is None:
+        raise ValueError('Invalid version string: {!r}'.format(text))
+    major, minor, patch, prerelease, build = match.groups()
+    return Version(int(major), int(minor), int(patch),
+                   tuple(prerelease.split('.')) if prerelease else (),
+                   tuple(build.split('.')) if build else ())
@@ -0,0 +1,235 @@
+"""
+A daemon that keeps the state of a repository loaded between invocations.
+
+``vup serve`` listens on a Unix socket in the git directory of the repository.
+When the socket exists the command line forwards the subcommands in
+commands.SUBCMD_MAP to the daemon instead of running them itself, so each
+request skips interpreter start up, imports and opening the repository. The
+daemon handles one request at a time with a single Session, whose cached state
+is checked against the stat data of the config file, the version files and the
+HEAD commit on every request.
+
+Requests and responses are single lines of JSON. A request has the subcommand,
+its options and the current directory of the client, which the daemon changes
+to while handling the request so relative paths and config files are found as
+they would be without the daemon. A response has the output of the subcommand
+and its exit code.
+"""
+
+import io
+import os
+import sys
+import json
+import signal
+import socket
+import threading
+import contextlib
+
+from . import commands
+from . import error
+from . import session
+
+SOCKET_FILE = 'daemon.sock'
+BUFFER_SIZE = 64 * 1024
+
+
+def get_socket_path(git_dir='.git'):
+    """Return the path of the daemon socket of a repository
+
+    :param git_dir: the git directory of the repository (Default value =
+        '.git')
+
+    """
+    return os.path.join(git_dir, 'vup', SOCKET_FILE)
+
+
+def _receive_line(connection):
+    """Read one newline terminated message from a socket
+
+    :param connection: the connected socket
+
+    """
+    chunks = []
+    while True:
+        chunk = connection.recv(BUFFER_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return b''.join(chunks)
+
+
+def _send_line(connection, message):
+    """
+    :param connection: the connected socket
+    :param message: the JSON serializable message to send
+    """
+    connection.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+@contextlib.contextmanager
+def _working_directory(directory):
+    """Change the current directory for the duration of a with block
+
+    :param directory: the directory to change to, None to stay in the current
+        one
+
+    """
+    if directory is None:
+        yield
+        return
+    old_directory = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(old_directory)
+
+
+def handle_request(request, a_session):
+    """Run the subcommand of a request and return the response
+
+    :param request: dict with the 'subcmd', its 'options' and optionally the
+        'cwd' of the client to run it in
+    :param a_session: the Session of the daemon
+
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), \
+            contextlib.redirect_stderr(stderr):
+        try:
+            with _working_directory(request.get('cwd')):
+                commands.run(request['subcmd'], request['options'],
+                             a_session)
+        except error.VupError as err:
+            print(err, file=sys.stderr)
+            exit_code = 1
+        # the daemon has to keep running whatever a request does
+        except Exception as err:  # pylint: disable=broad-except
+            print('vup daemon error: {err}'.format(err=err), file=sys.stderr)
+            exit_code = 1
+    return {
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'exit_code': exit_code,
+    }
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    """Stop the daemon the same way on SIGTERM as on Ctrl-C"""
+    raise KeyboardInterrupt()
+
+
+def _is_daemon_running(socket_path):
+    """
+    :param socket_path: path of the daemon socket
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        client.close()
+    return True
+
+
+def serve(socket_path=None):
+    """Serve requests for the repository in the current directory until
+    interrupted
+
+    :param socket_path: path of the socket to listen on (Default value = None,
+        the socket in the git directory)
+    :raises VupErrorDaemonIsNotSupported: when Unix sockets are not available
+    :raises VupErrorDaemonIsAlreadyRunning: when a daemon is already serving
+        the socket
+
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise error.VupErrorDaemonIsNotSupported('serve')
+    a_session = session.Session()
+    repo = a_session.get_repo()
+    socket_path = socket_path or get_socket_path(repo.git_dir)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        if _is_daemon_running(socket_path):
+            raise error.VupErrorDaemonIsAlreadyRunning('serve', socket_path)
+        os.remove(socket_path)
+
+    server = bind(socket_path)
+    server.listen()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    print('Serving {work_tree} on {socket_path}'.format(
+        work_tree=repo.working_tree_dir, socket_path=socket_path))
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    request = json.loads(_receive_line(connection).decode())
+                except ValueError:
+                    continue
+                _send_line(connection, handle_request(request, a_session))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.remove(socket_path)
+
+
+def bind(socket_path):
+    """Return a Unix socket bound to a path that only the current user can
+    connect to
+
+    Anyone who can connect to the socket can bump the repository as the user
+    running the daemon, so the socket is created without any permissions for
+    the group and others.
+
+    :param socket_path: the path to bind the socket to
+
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(socket_path)
+    except BaseException:
+        server.close()
+        raise
+    finally:
+        os.umask(old_umask)
+    return server
+
+
+def send_request(subcmd, options, socket_path=None):
+    """Forward a subcommand to the daemon if one is running
+
+    :param subcmd: the name of the subcommand
+    :param options: the parsed command line options
+    :param socket_path: path of the daemon socket (Default value = None, the
+        socket in the git directory of the current directory)
+    :returns: the response or None when no daemon is running
+
+    """
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:  # a socket left behind by a daemon that didn't stop
+        client.close()
+        return None
+    with client:
+        _send_line(client, {
+            'subcmd': subcmd,
+            'options': options,
+            'cwd': os.getcwd()
+        })
+        response = _receive_line(client)
+    if not response:
+        return None
+    return json.loads(response.decode('utf-8'))
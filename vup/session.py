@@ -0,0 +1,115 @@
+"""
+Repository state that is kept between subcommands run by the same process.
+
+A one-off invocation of vup creates a Session per subcommand, the daemon keeps
+one for its whole lifetime so the repository stays open and the config files,
+tracked paths, version locations and tags are only loaded again when they
+change. Changes are detected by checking the stat data of the config files,
+the commit HEAD points to and the signature of the tags on every use.
+"""
+
+from . import backends
+from . import configs
+from . import error
+from . import index
+from . import refs
+from . import snapshot
+from . import tags
+from . import timings
+
+CONFIG_FILE = configs.CONFIG_FILE
+
+
+def load_yaml_config(filename=CONFIG_FILE):
+    """Return the merged config files of the current directory and the
+    directories above it, or an empty dict if there are none
+
+    :param filename: the name of the config files (Default value =
+        CONFIG_FILE)
+    :raises VupErrorConfigIsInvalid: when a config file is not valid
+
+    """
+    return configs.ConfigLoader(filename=filename).load()
+
+
+class Session():
+    """Caches the repository of the current directory and its state."""
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self._config_loader = configs.ConfigLoader(filename=config_file)
+        self._repo = None
+        self._snapshot = None
+        self._version_index = None
+        self._tag_index = None
+        self._tag_signature = None
+        self._backends = {}
+
+    def get_yaml_config(self):
+        """Return the merged config files, loading them again if one changed.
+
+        :raises VupErrorConfigIsInvalid: when a config file is not valid
+
+        """
+        with timings.span('config_load'):
+            return self._config_loader.load()
+
+    def get_repo(self):
+        """Return the repo of the current directory.
+
+        :raises VupErrorCurrentDirectoryIsNotAGitRepository: when the current
+            directory is not a git repository
+
+        """
+        if self._repo is None:
+            import git  # pylint: disable=import-outside-toplevel
+            try:
+                with timings.span('repo_open'):
+                    self._repo = git.Repo('.', search_parent_directories=True)
+            except git.exc.InvalidGitRepositoryError:
+                raise error.VupErrorCurrentDirectoryIsNotAGitRepository('bump')
+        return self._repo
+
+    def get_snapshot(self):
+        """Return the RepoSnapshot of the commit HEAD currently points to."""
+        repo = self.get_repo()
+        try:
+            head = repo.head.commit.hexsha
+        except ValueError:  # occurs when there are no commits in a repository
+            head = None
+        if self._snapshot is None or self._snapshot.head_hexsha != head:
+            self._snapshot = snapshot.RepoSnapshot(repo)
+        return self._snapshot
+
+    def get_version_index(self):
+        """Return the VersionIndex of the repository."""
+        if self._version_index is None:
+            self._version_index = index.VersionIndex.for_repo(self.get_repo())
+        return self._version_index
+
+    def get_tag_index(self):
+        """Return the TagIndex of the repository, loading it again if a tag
+        was created or deleted."""
+        repo = self.get_repo()
+        signature = tags.get_signature(refs.get_common_dir(repo.git_dir))
+        if self._tag_index is None or signature != self._tag_signature:
+            with timings.span('tag_index'):
+                self._tag_index = tags.TagIndex.for_repo(repo)
+            self._tag_signature = signature
+        return self._tag_index
+
+    def get_backend(self, name=backends.DEFAULT_BACKEND):
+        """Return a git backend of the repository, a batch backend and its git
+        processes are kept for as long as the session.
+
+        :param name: one of backends.BACKENDS (Default value =
+            backends.DEFAULT_BACKEND)
+        :raises VupErrorGitBackendIsInvalid: when the name is not a backend
+
+        """
+        if name == 'gitpython':
+            return backends.GitPythonBackend(self.get_repo(),
+                                             self.get_snapshot())
+        if name not in self._backends:
+            self._backends[name] = backends.get_backend(name, self.get_repo())
+        return self._backends[name]
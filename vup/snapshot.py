@@ -0,0 +1,79 @@
+"""
+A snapshot of the state of a repository that is loaded once and shared.
+"""
+
+import os
+
+
+class RepoSnapshot():
+    """The HEAD commit of a repository and the paths tracked in it.
+
+    The HEAD commit is resolved and the tracked paths are listed with a single
+    recursive ls-tree the first time they are needed, after that checking if
+    a file is tracked is a set lookup.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.work_tree = repo.working_tree_dir
+        self._head_commit = None
+        self._has_head_commit = None
+        self._tracked_paths = None
+
+    @property
+    def head_commit(self):
+        """The commit HEAD points to or None when there are no commits."""
+        if self._has_head_commit is None:
+            try:
+                self._head_commit = self.repo.head.commit
+                self._has_head_commit = True
+            except ValueError:  # occurs when there are no commits
+                self._has_head_commit = False
+        return self._head_commit
+
+    @property
+    def head_hexsha(self):
+        """The SHA of the commit HEAD points to or None."""
+        if self.head_commit is None:
+            return None
+        return self.head_commit.hexsha
+
+    @property
+    def tracked_paths(self):
+        """The set of paths, relative to the work tree, in the HEAD commit."""
+        if self._tracked_paths is None:
+            if self.head_commit is None:
+                self._tracked_paths = frozenset()
+            else:
+                output = self.repo.git.ls_tree('-r', '--name-only', '-z',
+                                               self.head_commit.hexsha)
+                self._tracked_paths = frozenset(
+                    path for path in output.split('\0') if path)
+        return self._tracked_paths
+
+    def get_relative_path(self, a_file):
+        """Return the path of a file relative to the work tree as used by git
+
+        :param a_file: path to the file
+
+        """
+        relative_file = os.path.relpath(
+            os.path.abspath(a_file), self.work_tree)
+        return relative_file.replace(os.path.sep, '/')
+
+    def is_tracked(self, a_file):
+        """Check if a file is in the HEAD commit
+
+        :param a_file: path to the file
+
+        """
+        return self.get_relative_path(a_file) in self.tracked_paths
+
+    def are_tracked(self, files):
+        """Check if each of the files is in the HEAD commit
+
+        :param files: paths to the files
+        :returns: list of booleans in the order of the files
+
+        """
+        return [self.is_tracked(a_file) for a_file in files]
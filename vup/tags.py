@@ -0,0 +1,355 @@
+"""
+A sorted index of the tags of a repository that are semantic versions.
+
+Tags are grouped by the prefix in front of their version number, e.g. the
+``pkg@`` of ``pkg@1.2.3``. The versions of each group are kept sorted by
+precedence as a list of version strings and three parallel arrays of their
+major, minor and patch numbers, so the tags of a major line, a minor line or
+a single release are found by binary search without creating a Version for
+every tag.
+
+Building the index reads every tag name from the loose refs and packed-refs
+files, the result is cached in the vup directory of the git directory. The
+cache is used as long as the stat data of packed-refs and the modification
+times of the directories under refs/tags are unchanged, which is the case
+until a tag is created or deleted.
+"""
+
+import os
+import re
+import array
+import bisect
+import pickle
+import tempfile
+
+from . import index
+from . import refs
+from . import semver
+
+TAGS_CACHE_FORMAT_VERSION = 1
+
+TAG_PATTERN = re.compile(r'(.*?)' + semver.VERSION_PATTERN.pattern, re.ASCII)
+
+# the type of the arrays of major, minor and patch numbers, versions with
+# numbers that don't fit in it are left out of the index
+NUMBER_TYPECODE = 'Q'
+
+
+def _iter_packed_tags(packed_refs):
+    """Yield the names of the tags in a packed-refs file
+
+    :param packed_refs: path to the packed-refs file
+
+    """
+    try:
+        with open(packed_refs, 'rb') as packed_refs_file:
+            contents = packed_refs_file.read()
+    except OSError:
+        return
+    for line in contents.split(b'\n'):
+        refname = line.partition(b' ')[2].rstrip(b'\r')
+        if refname.startswith(b'refs/tags/') and line[:1] not in b'#^':
+            yield refname[len(b'refs/tags/'):].decode('utf-8', 'replace')
+
+
+def _iter_loose_tags(tags_dir):
+    """Yield the names of the loose tags
+
+    :param tags_dir: the refs/tags directory
+
+    """
+    for dirpath, _, filenames in os.walk(tags_dir):
+        relative_dir = os.path.relpath(dirpath, tags_dir)
+        for filename in filenames:
+            if relative_dir == os.curdir:
+                yield filename
+            else:
+                yield os.path.join(relative_dir, filename).replace(
+                    os.path.sep, '/')
+
+
+def get_signature(common_dir):
+    """Return what changes when a tag is created or deleted
+
+    :param common_dir: the common git directory of the repository
+    :returns: list of the path and modification time of packed-refs, with its
+        size and inode, and of each directory under refs/tags
+
+    """
+    signature = []
+    try:
+        stat = os.stat(os.path.join(common_dir, 'packed-refs'))
+        signature.append(
+            ['packed-refs', stat.st_mtime_ns, stat.st_size, stat.st_ino])
+    except OSError:
+        signature.append(['packed-refs', None])
+    for dirpath, _, _ in os.walk(os.path.join(common_dir, 'refs', 'tags')):
+        path = os.path.relpath(dirpath, common_dir)
+        try:
+            signature.append([path, os.stat(dirpath).st_mtime_ns])
+        except OSError:  # occurs when the directory was just deleted
+            signature.append([path, None])
+    return signature
+
+
+class TagGroup():
+    """The versions of the tags with the same prefix sorted by precedence.
+
+    :param texts: the version strings sorted by precedence
+    :param majors: array of the major number of each version
+    :param minors: array of the minor number of each version
+    :param patches: array of the patch number of each version
+
+    """
+
+    def __init__(self, texts=(), majors=None, minors=None, patches=None):
+        self.texts = list(texts)
+        self.majors = majors or array.array(NUMBER_TYPECODE)
+        self.minors = minors or array.array(NUMBER_TYPECODE)
+        self.patches = patches or array.array(NUMBER_TYPECODE)
+
+    @classmethod
+    def from_versions(cls, versions):
+        """Create a group from semver.Version objects in any order
+
+        :param versions: the versions of the tags
+
+        """
+        versions = sorted(set(versions), key=lambda version: version.sort_key)
+        return cls([str(version) for version in versions],
+                   array.array(NUMBER_TYPECODE,
+                               [version.major for version in versions]),
+                   array.array(NUMBER_TYPECODE,
+                               [version.minor for version in versions]),
+                   array.array(NUMBER_TYPECODE,
+                               [version.patch for version in versions]))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return (semver.parse(text) for text in self.texts)
+
+    def get_range(self, major=None, minor=None, patch=None):
+        """Return the positions of the versions starting with some numbers
+
+        :param major: the major number or None for all versions (Default value
+            = None)
+        :param minor: the minor number, only used with major (Default value =
+            None)
+        :param patch: the patch number, only used with minor (Default value =
+            None)
+        :returns: (start, end) positions in texts
+
+        """
+        low, high = 0, len(self.texts)
+        for numbers, number in ((self.majors, major), (self.minors, minor),
+                                (self.patches, patch)):
+            if number is None:
+                break
+            low, high = (bisect.bisect_left(numbers, number, low, high),
+                         bisect.bisect_right(numbers, number, low, high))
+        return low, high
+
+    def latest(self, major=None, minor=None, include_prereleases=False):
+        """Return the version with the highest precedence
+
+        :param major: only look at this major line (Default value = None)
+        :param minor: only look at this minor line of the major line (Default
+            value = None)
+        :param include_prereleases: also return pre-releases (Default value =
+            False)
+        :returns: a semver.Version or None when there are no matching tags
+
+        """
+        low, high = self.get_range(major, minor)
+        for position in range(high - 1, low - 1, -1):
+            version = semver.parse(self.texts[position])
+            if include_prereleases or not version.prerelease:
+                return version
+        return None
+
+    def latest_prerelease(self, base):
+        """Return the pre-release of a version with the highest precedence
+
+        :param base: the version to find the pre-releases of, its pre-release
+            and build are ignored
+        :returns: a semver.Version or None when there are no pre-release tags
+
+        """
+        low, high = self.get_range(base.major, base.minor, base.patch)
+        for position in range(high - 1, low - 1, -1):
+            version = semver.parse(self.texts[position])
+            if version.prerelease:
+                return version
+        return None
+
+    def exists(self, version):
+        """Check if a version has a tag
+
+        :param version: the semver.Version to look for
+
+        """
+        low, high = self.get_range(version.major, version.minor,
+                                   version.patch)
+        return str(version) in self.texts[low:high]
+
+    def next_prerelease(self, base, label='beta'):
+        """Return the next numbered pre-release of a version
+
+        The pre-releases are numbered label.1, label.2 and so on, the number
+        is one more than the highest numbered pre-release with the label that
+        has a tag.
+
+        :param base: the version to get the pre-release of, its pre-release and
+            build are ignored
+        :param label: the pre-release label (Default value = 'beta')
+        :returns: a semver.Version
+
+        """
+        low, high = self.get_range(base.major, base.minor, base.patch)
+        number = 0
+        for position in range(low, high):
+            prerelease = semver.parse(self.texts[position]).prerelease
+            if (len(prerelease) == 2 and prerelease[0] == label
+                    and prerelease[1].isdigit()):
+                number = max(number, int(prerelease[1]))
+        return semver.Version(base.major, base.minor, base.patch,
+                              (label, str(number + 1)))
+
+
+class TagIndex():
+    """The tags of a repository that are semantic versions by prefix.
+
+    :param groups: dict of tag prefix to TagGroup
+
+    """
+
+    def __init__(self, groups=None):
+        self.groups = groups or {}
+
+    @classmethod
+    def from_tag_names(cls, names):
+        """Create the index from tag names, names that aren't versions are
+        skipped
+
+        :param names: the tag names without refs/tags/
+
+        """
+        versions = {}
+        for name in names:
+            match = TAG_PATTERN.fullmatch(name)
+            if match is None:
+                continue
+            prefix = match.group(1)
+            version = semver.parse(name[len(prefix):])
+            if max(version.major, version.minor, version.patch) >= 2**64:
+                continue
+            versions.setdefault(prefix, []).append(version)
+        return cls({
+            prefix: TagGroup.from_versions(prefix_versions)
+            for prefix, prefix_versions in versions.items()
+        })
+
+    @classmethod
+    def load(cls, git_dir, cache_path=None):
+        """Return the tag index of a repository
+
+        :param git_dir: the git directory of the repository
+        :param cache_path: file to cache the index in (Default value = None,
+            which doesn't cache it)
+
+        """
+        common_dir = refs.get_common_dir(git_dir)
+        signature = get_signature(common_dir)
+        tag_index = _load_cache(cache_path, signature) if cache_path else None
+        if tag_index is None:
+            names = set(
+                _iter_packed_tags(os.path.join(common_dir, 'packed-refs')))
+            names.update(_iter_loose_tags(os.path.join(common_dir, 'refs',
+                                                       'tags')))
+            tag_index = cls.from_tag_names(names)
+            if cache_path:
+                _save_cache(cache_path, signature, tag_index)
+        return tag_index
+
+    @classmethod
+    def for_repo(cls, repo):
+        """Return the tag index of a repository cached in its vup directory
+
+        :param repo: the repository
+
+        """
+        return cls.load(repo.git_dir,
+                        os.path.join(index.get_vup_dir(repo), 'tags'))
+
+    def get_group(self, tag_prefix=''):
+        """Return the TagGroup of a tag prefix
+
+        :param tag_prefix: the text in front of the version in the tag names
+            (Default value = '')
+
+        """
+        return self.groups.get(tag_prefix) or TagGroup()
+
+
+def _load_cache(cache_path, signature):
+    """Return the cached TagIndex or None when it is missing or out of date
+
+    :param cache_path: the cache file
+    :param signature: the current signature of the tags
+
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            written_ns = os.fstat(cache_file.fileno()).st_mtime_ns
+            data = pickle.load(cache_file)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+    if (not isinstance(data, dict)
+            or data.get('format') != TAGS_CACHE_FORMAT_VERSION
+            or data.get('signature') != signature):
+        return None
+    # like the version index a change in the same timestamp granularity as
+    # the cache was written might not have changed the signature
+    if any(entry[1] is not None and entry[1] >= written_ns
+           for entry in signature):
+        return None
+    groups = {}
+    for prefix, (texts, majors, minors, patches) in data['groups'].items():
+        numbers = []
+        for buf in (majors, minors, patches):
+            number_array = array.array(NUMBER_TYPECODE)
+            number_array.frombytes(buf)
+            numbers.append(number_array)
+        groups[prefix] = TagGroup(texts.split('\n') if texts else [],
+                                  *numbers)
+    return TagIndex(groups)
+
+
+def _save_cache(cache_path, signature, tag_index):
+    """
+    :param cache_path: the cache file
+    :param signature: the signature of the tags the index was built from
+    :param tag_index: the TagIndex to cache
+    """
+    data = {
+        'format': TAGS_CACHE_FORMAT_VERSION,
+        'signature': signature,
+        'groups': {
+            prefix: ('\n'.join(group.texts), group.majors.tobytes(),
+                     group.minors.tobytes(), group.patches.tobytes())
+            for prefix, group in tag_index.groups.items()
+        },
+    }
+    directory = os.path.dirname(cache_path)
+    os.makedirs(directory, exist_ok=True)
+    temp_fd, temp_name = tempfile.mkstemp(prefix='.tags-', dir=directory)
+    try:
+        with os.fdopen(temp_fd, 'wb') as cache_file:
+            pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, cache_path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
@@ -0,0 +1,203 @@
+"""
+Timing the phases of a subcommand.
+
+The phases are wrapped in spans. While no recording is running a span is a
+shared object whose enter and exit do nothing, so the only cost of the
+instrumentation is a global lookup and a function call per span. A recording
+is started for a subcommand by ``--timings``, which prints the total time of
+each phase, or ``--trace-file``, which writes the spans as complete events of
+the Chrome trace event format, viewable in chrome://tracing or Perfetto. The
+events of the hook processes carry their exit code, and after every span the
+peak resident set size of vup and of its largest child process is recorded as
+a counter event.
+"""
+
+import os
+import sys
+import time
+import json
+import threading
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+_RECORDER = None
+
+
+def get_time_ns():
+    """Return the time of the performance counter in integer nanoseconds"""
+    # time.perf_counter_ns is only available from Python 3.7 on
+    return int(time.perf_counter() * 1e9)
+
+
+class Recorder():
+    """Collects the spans of one subcommand."""
+
+    def __init__(self):
+        self.origin = get_time_ns()
+        # list.append is atomic, spans can end on any thread
+        self.events = []
+
+    def add(self, name, start, end, args):
+        """Record a span that ended
+
+        :param name: the name of the phase
+        :param start: the get_time_ns when the span started
+        :param end: the get_time_ns when the span ended
+        :param args: dict of details about the span
+
+        """
+        self.events.append((name, start, end, threading.get_ident(), args,
+                            get_peak_rss()))
+
+    def get_phases(self):
+        """Return (name, calls, seconds) of each phase in the order the phases
+        first started"""
+        phases = {}
+        for name, start, end, _, _, _ in sorted(self.events,
+                                                key=lambda event: event[1]):
+            calls, total = phases.get(name, (0, 0))
+            phases[name] = (calls + 1, total + end - start)
+        return [(name, calls, total / 1e9)
+                for name, (calls, total) in phases.items()]
+
+    def format_table(self):
+        """Return the table of the phases printed by --timings"""
+        lines = ['{:<20} {:>6} {:>10}'.format('Phase', 'Calls', 'Seconds')]
+        for name, calls, seconds in self.get_phases():
+            lines.append('{:<20} {:>6} {:>10.4f}'.format(name, calls, seconds))
+        peak_rss = [event[5] for event in self.events if event[5][0]]
+        if peak_rss:
+            lines.append(
+                'Peak RSS: {:.1f} MiB, child processes: {:.1f} MiB'.format(
+                    max(rss for rss, _ in peak_rss) / 1024,
+                    max(rss for _, rss in peak_rss) / 1024))
+        return '\n'.join(lines)
+
+    def get_trace(self):
+        """Return the spans as a Chrome trace"""
+        pid = os.getpid()
+        trace_events = [{
+            'name': 'process_name',
+            'ph': 'M',
+            'pid': pid,
+            'args': {
+                'name': 'vup'
+            }
+        }]
+        for name, start, end, thread_id, args, peak_rss in self.events:
+            trace_events.append({
+                'name': name,
+                'cat': 'vup',
+                'ph': 'X',
+                'ts': (start - self.origin) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': pid,
+                'tid': thread_id,
+                'args': args
+            })
+            if peak_rss[0] is not None:
+                trace_events.append({
+                    'name': 'peak_rss_kib',
+                    'ph': 'C',
+                    'ts': (end - self.origin) / 1000,
+                    'pid': pid,
+                    'args': {
+                        'vup': peak_rss[0],
+                        'children': peak_rss[1]
+                    }
+                })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, filename):
+        """Write the spans as a Chrome trace
+
+        :param filename: the file to write to
+
+        """
+        with open(filename, 'w') as trace_file:
+            json.dump(self.get_trace(), trace_file)
+
+
+def get_peak_rss():
+    """Return the peak resident set size of this process and of its largest
+    child process that exited in KiB, or Nones when it is not known"""
+    if resource is None:
+        return None, None
+    # macOS reports bytes instead of KiB
+    factor = 1024 if sys.platform == 'darwin' else 1
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // factor,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // factor)
+
+
+class _Span():
+    """A span of a running recording."""
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.start = get_time_ns()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end()
+        return False
+
+    def end(self, **args):
+        """End the span
+
+        :param args: more details about the span
+
+        """
+        self.args.update(args)
+        self.recorder.add(self.name, self.start, get_time_ns(),
+                          self.args)
+
+
+class _NullSpan():
+    """The span used while nothing is recorded."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def end(self, **args):
+        """
+        :param args: ignored
+        """
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """Return a span timing a phase, used as a context manager or ended with
+    its end method
+
+    :param name: the name of the phase
+    :param args: details about the span for the trace
+
+    """
+    if _RECORDER is None:
+        return NULL_SPAN
+    return _Span(_RECORDER, name, args)
+
+
+def start():
+    """Start recording the spans and return the Recorder"""
+    global _RECORDER  # pylint: disable=global-statement
+    _RECORDER = Recorder()
+    return _RECORDER
+
+
+def stop():
+    """Stop recording the spans"""
+    global _RECORDER  # pylint: disable=global-statement
+    _RECORDER = None